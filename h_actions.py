@@ -1,5 +1,14 @@
 import random
+import types
+import h_behaviours
 import h_encounter
+import h_state
+import h_effects
+import h_events
+import h_features
+import h_rng
+import h_replay
+import h_search
 
 SPELLS = {
     "inferno": {
@@ -39,9 +48,9 @@ SPELLS = {
     }
 } 
 
-def stat_test (adder, difficulty):
+def stat_test (adder, difficulty, rng=random):
 
-    roll = random.randint(1,20)
+    roll = rng.randint(1,20)
     
     # higher thresholds should be checked first (critical > success)
     total = adder + roll
@@ -52,167 +61,116 @@ def stat_test (adder, difficulty):
     else:
         result = "failure"
 
-    h_encounter.report(f"{result} - {total} ({difficulty + 10})")
+    h_events.emit("roll", result=result, total=total, target=difficulty + 10)
     return result
 
-def choose_options (dictionary):
+def choose_options (dictionary, point="option"):
 
     options_index = {}
     options_counter = 0
+    menu = []
 
     for key in dictionary:
         options_counter += 1
         text1 = f"{options_counter}.\t"
         text2 = f"{key}"
         text3 = getattr(dictionary[key], "description", "")
-        print (text1+text2.center(19)+text3)
+        menu.append(text1+text2.center(19)+text3)
         options_index [options_counter] = key
     if options_counter == 0:
         return None
 
-    try:
-        choice_index = int(input("choose option."))
-    except ValueError:
-        choice_index = 1
-
-    if choice_index > options_counter:
-        choice_index = options_counter
-    elif choice_index < 1:
-        choice_index = 1
+    choice_index = h_replay.choose(point, options_counter, "choose option.", menu)
 
     choice = options_index[choice_index]
 
     return dictionary[choice]
 
 
-def enemy_action_logic(actor, encounter_state, possible_actions):
-    if not possible_actions:
-        return None
-
-    logic = getattr(actor, "logic", None)
-    actor_state = encounter_state["actors"][actor]
-    targets = {
-        k: v
-        for k, v in encounter_state["actors"].items()
-        if v["KO"] == False and v["party"] != actor_state["party"]
-    }
-
-    low_stamina_targets = [
-        t for t in targets if t.current_stamina <= max(1, t.stamina // 2)
-    ]
-    high_stamina_targets = [
-        t for t in targets if t.current_stamina > max(1, t.stamina // 2)
-    ]
-    not_in_melee_targets = [t for t, v in targets.items() if v.get("melee") == False]
-    guard_block_targets = [
-        t for t, v in targets.items() if v.get("guard") == True or v.get("block") == True
-    ]
-    soft_targets = [
-        t
-        for t, v in targets.items()
-        if v.get("daze") == True or v.get("vulnerable") == True
-    ]
-
-    actor_melee = actor_state.get("melee") == True
-    actor_momentum = actor_state.get("momentum") == True
-    allies = [
-        k
-        for k, v in encounter_state["actors"].items()
-        if v["KO"] == False
-        and v["party"] == actor_state["party"]
-        and k != actor
-    ]
-    allies_need_help = [
-        a
-        for a in allies
-        if encounter_state["actors"][a].get("vulnerable") == True
-        or encounter_state["actors"][a].get("daze") == True
-        or encounter_state["actors"][a].get("pin") == True
-        or encounter_state["actors"][a].get("disable") == True
-    ]
-    allies_in_melee = [
-        a for a in allies if encounter_state["actors"][a].get("melee") == True
-    ]
-
-    def pick_first(candidates):
-        for action_name in candidates:
-            if action_name in possible_actions:
-                return action_name
-        return None
-
-    def weighted_choice(primary, secondary, conditional, condition_met, fallback):
-        if condition_met:
-            conditional_pick = pick_first(conditional)
-            if conditional_pick:
-                return conditional_pick
+def actor_logic(actor, encounter_state=None):
+    # Headless simulations drive actors (party members included) through
+    # per-encounter logic overrides instead of mutating `actor.logic`.
+    if encounter_state is not None:
+        overrides = encounter_state.get("logic")
+        if overrides and actor in overrides:
+            return overrides[actor]
+    return getattr(actor, "logic", None)
+
+
+class TacticalView:
+    """What an actor driven by a logic profile knows about the fight on its
+    turn. Action choice, targeting and decisive orders all ask the same
+    view (see tactical_view), and each fact is worked out the first time it
+    is asked for."""
+
+    NEEDS_HELP = h_state.VULNERABLE | h_state.DAZE | h_state.PIN | h_state.DISABLE
+
+    def __init__(self, actor, encounter_state):
+        table = encounter_state["table"]
+        self.table = table
+        self.slot = table.slot[actor]
+        self.side = table.party[self.slot]
+        own = table.status[self.slot]
+        self.melee = own & h_state.MELEE != 0
+        self.momentum = own & h_state.MOMENTUM != 0
+        self._allies = None
+        self._allies_need_help = None
+        self._shares = {}
+
+    def allies(self):
+        """{ally: view} of the standing allies, in roster order."""
+        if self._allies is None:
+            self._allies = self.table.target_views(self.table.alive[self.side] - {self.slot})
+        return self._allies
+
+    def allies_need_help(self):
+        if self._allies_need_help is None:
+            status = self.table.status
+            self._allies_need_help = any(
+                status[j] & self.NEEDS_HELP for j in self.table.alive[self.side] if j != self.slot
+            )
+        return self._allies_need_help
 
-        roll = random.randint(1, 6)
-        if roll <= 4:
-            choice_name = pick_first(primary)
-        else:
-            choice_name = pick_first(secondary)
+    def stamina_share(self, target):
+        share = self._shares.get(target)
+        if share is None:
+            share = self._shares[target] = target.current_stamina / max(1, target.stamina)
+        return share
 
-        if choice_name is None:
-            choice_name = pick_first(fallback)
+    def exposed(self, target):
+        """Dazed, vulnerable or down to half stamina."""
+        status = self.table.status[self.table.slot[target]]
+        if status & (h_state.DAZE | h_state.VULNERABLE):
+            return True
+        return target.current_stamina <= max(1, target.stamina // 2)
 
-        return choice_name
+    def unengaged(self, target):
+        """Neither in melee nor pinned."""
+        return not self.table.status[self.table.slot[target]] & (h_state.MELEE | h_state.PIN)
 
-    if logic == "disruptive":
-        if actor_momentum and "fight" in possible_actions:
-            choice = "fight"
-        else:
-            choice = weighted_choice(
-                primary=["hide", "skirmish", "prowl"],
-                secondary=["trip", "smash", "fight"],
-                conditional=["dirty trick", "diablerie"],
-                condition_met=actor_momentum or actor_melee,
-                fallback=["retreat", "guard", "block", "fight"],
-            )
 
-    elif logic == "aggressive":
-        choice = weighted_choice(
-            primary=["fight", "hack and slash", "smash"],
-            secondary=["stab", "trip", "skirmish"],
-            conditional=["hack and slash"],
-            condition_met=actor_momentum,
-            fallback=["fight", "guard", "block"],
-        )
+def tactical_view(actor, encounter_state):
+    """The actor's TacticalView for this turn; views are dropped when a new
+    turn starts or an action has to be chosen again."""
+    tactics = encounter_state["table"].tactics
+    view = tactics.get(actor)
+    if view is None:
+        view = tactics[actor] = TacticalView(actor, encounter_state)
+    return view
 
-    elif logic == "defensive":
-        choice = weighted_choice(
-            primary=["guard", "block", "rally"],
-            secondary=["fight", "trip", "skirmish"],
-            conditional=["deliverance", "decisive order"],
-            condition_met=bool(allies_need_help),
-            fallback=["guard", "block", "retreat", "fight"],
-        )
 
-    elif logic == "reactive":
-        choice = weighted_choice(
-            primary=["skirmish", "trip", "guard"],
-            secondary=["retreat", "fight", "block"],
-            conditional=["dirty trick", "decisive order"],
-            condition_met=actor_momentum and actor_melee,
-            fallback=["guard", "retreat", "fight"],
-        )
+def enemy_action_logic(actor, encounter_state, possible_actions, logic=None):
+    if not possible_actions:
+        return None
 
-    elif logic == "sorcerer":
-        choice = weighted_choice(
-            primary=["diablerie", "skirmish"],
-            secondary=["guard", "retreat", "fight"],
-            conditional=["diablerie"],
-            condition_met=actor_momentum or not actor_melee,
-            fallback=["guard", "fight", "block"],
-        )
+    if logic is None:
+        logic = actor_logic(actor, encounter_state)
+    if logic == "mcts":
+        return h_search.mcts_action(actor, encounter_state, possible_actions)
 
-    else:
-        choice = weighted_choice(
-            primary=["fight", "skirmish", "guard"],
-            secondary=["trip", "block"],
-            conditional=["fight"],
-            condition_met=actor_momentum,
-            fallback=["guard", "fight"],
-        )
+    profile = h_behaviours.PROFILES.get(logic) or h_behaviours.PROFILES["default"]
+    view = tactical_view(actor, encounter_state)
+    choice = h_behaviours.decide(profile, view, possible_actions, h_rng.ai(encounter_state))
 
     if choice is None:
         return next(iter(possible_actions.values())) if possible_actions else None
@@ -231,11 +189,61 @@ MELEE_ENTRY_ACTIONS = {
 def is_melee_entry_action(action_name):
     return action_name in MELEE_ENTRY_ACTIONS
 
+class ActionTable(dict):
+    """Actions by name, in menu order, plus their legal subsets by status
+    mask as filter_actions meets them. Actor.action_table keeps one per
+    actor and remembers the special and arms actions it was merged from."""
+
+    __slots__ = ("legal", "special", "arms")
+
+    def __init__(self, actions, special=None, arms=None):
+        super().__init__(actions)
+        self.legal = {}
+        self.special = special
+        self.arms = arms
+
+    def __reduce__(self):
+        # copies and saves start with an empty cache
+        return ActionTable, (dict(self), self.special, self.arms)
+
+# Status flags that decide which actions are legal.
+LEGALITY_BITS = h_state.MELEE | h_state.DISABLE | h_state.PIN | h_state.HIDE_BLOCKED | h_state.ROOT
+
+# {legality mask: legal actions} for plain action dicts, by their items;
+# an ActionTable keeps its own. Emptied when it holds LEGAL_CACHE_SIZE dicts.
+LEGAL_CACHE_SIZE = 256
+_legal_actions = {}
+_no_actions = types.MappingProxyType({})
+
 def filter_actions (actor, encounter_state, action_dict):
+    """The actions in `action_dict` the actor may take right now, as a
+    read-only mapping cached per action table and status."""
+    if not action_dict:
+        return _no_actions
+
+    table = encounter_state["table"]
+    mask = table.status[table.slot[actor]] & LEGALITY_BITS
+
+    masks = getattr(action_dict, "legal", None)
+    if masks is None:
+        key = tuple(action_dict.items())
+        masks = _legal_actions.get(key)
+        if masks is None:
+            if len(_legal_actions) >= LEGAL_CACHE_SIZE:
+                _legal_actions.clear()
+            masks = _legal_actions[key] = {}
+    options = masks.get(mask)
+    if options is None:
+        options = masks[mask] = types.MappingProxyType(legal_actions(action_dict, mask))
+    return options
+
+def legal_actions (action_dict, actor_status):
     # work on a shallow copy to avoid mutating the original dict
-    action_options = dict(action_dict) if action_dict is not None else {}
+    action_options = dict(action_dict)
+
+    in_melee = actor_status & h_state.MELEE
 
-    if encounter_state["actors"][actor].get("disable") == True:
+    if actor_status & h_state.DISABLE:
         action_options.pop("skirmish", None)
         action_options.pop("fight", None)
         action_options.pop("smash", None)
@@ -243,14 +251,14 @@ def filter_actions (actor, encounter_state, action_dict):
         action_options.pop("stab", None)
         action_options.pop("hack and slash", None)
 
-    if encounter_state["actors"][actor].get("melee") == True:
+    if in_melee:
         action_options.pop("skirmish", None)
         action_options.pop("block", None)
         action_options.pop("hide", None)
 
-    if encounter_state["actors"][actor].get("melee") == False:
+    if not in_melee:
         action_options.pop("retreat", None)
-        if encounter_state["actors"][actor].get("pin") == True:
+        if actor_status & h_state.PIN:
             action_options.pop("fight", None)
             action_options.pop("smash", None)
             action_options.pop("trip", None)
@@ -258,19 +266,19 @@ def filter_actions (actor, encounter_state, action_dict):
             action_options.pop("block", None)
         action_options.pop("dirty trick", None)
 
-    if encounter_state["actors"][actor].get("melee") == True:
+    if in_melee:
         action_options.pop("prowl", None)
 
-    if encounter_state["actors"][actor].get("hide_blocked") == True:
+    if actor_status & h_state.HIDE_BLOCKED:
         action_options.pop("hide", None)
 
-    if encounter_state["actors"][actor].get("root") == True:
+    if actor_status & h_state.ROOT:
         action_options.pop("hide", None)
         action_options.pop("block", None)
         action_options.pop("retreat", None)
         action_options.pop("dirty trick", None)
 
-        if encounter_state["actors"][actor].get("melee") == False:
+        if not in_melee:
             for action_name in MELEE_ENTRY_ACTIONS:
                 action_options.pop(action_name, None)
 
@@ -316,40 +324,29 @@ def choose_target (dictionary, encounter_state=None):
 
     options_index = {}
     options_counter = 0
+    menu = []
 
     for key in dictionary:
         options_counter += 1
         text1 = f"{options_counter}.\t"
         text2 = f"{key.name}"
-        status_text = ""
-        for k, v in dictionary[key].items():
-            if v == True:
-                if k != "active":
-                    if k != "party":
-                        status_text += f"({k})"
-        print (text1+text2.center(19)+status_text)
+        status_text = dictionary[key].status_tags()
+        menu.append(text1+text2.center(19)+status_text)
         options_index [options_counter] = key
 
-    print("0.\tStart over")
+    menu.append("0.\tStart over")
 
     if options_counter == 0:
+        h_replay.show(menu)
         return None
 
-    try:
-        choice_index = int(input("choose option."))
-    except ValueError:
-        choice_index = 1
+    choice_index = h_replay.choose("target", options_counter, "choose option.", menu, allow_zero=True)
 
     if choice_index == 0:
         if encounter_state is not None:
             encounter_state["action_failed"] = True
         return None
 
-    if choice_index > options_counter:
-        choice_index = options_counter
-    elif choice_index < 1:
-        choice_index = 1
-
     choice = options_index[choice_index]
 
     return choice
@@ -360,70 +357,62 @@ def logic_target(dictionary, actor=None, encounter_state=None):
     if not options:
         return None
 
-    if actor is None or getattr(actor, "logic", None) is None:
-        return random.choice(options)
+    logic = actor_logic(actor, encounter_state) if actor is not None else None
+
+    if logic is None:
+        return h_rng.ai(encounter_state).choice(options)
 
-    logic = actor.logic
+    view = tactical_view(actor, encounter_state)
 
     if logic == "disruptive":
-        preferred = [
-            t for t in options if dictionary[t].get("melee") == False and dictionary[t].get("pin") == False
-        ]
+        preferred = [t for t in options if view.unengaged(t)]
         if preferred:
-            return random.choice(preferred)
+            return h_rng.ai(encounter_state).choice(preferred)
 
     elif logic == "aggressive":
-        return min(options, key=lambda t: t.current_stamina / max(1, t.stamina))
+        return min(options, key=view.stamina_share)
 
     elif logic == "defensive":
-        return max(options, key=lambda t: t.current_stamina / max(1, t.stamina))
+        return max(options, key=view.stamina_share)
 
     elif logic == "reactive":
-        preferred = [
-            t
-            for t in options
-            if dictionary[t].get("daze") == True
-            or dictionary[t].get("vulnerable") == True
-            or t.current_stamina <= max(1, t.stamina // 2)
-        ]
+        preferred = [t for t in options if view.exposed(t)]
         if preferred:
-            return random.choice(preferred)
+            return h_rng.ai(encounter_state).choice(preferred)
 
-    return random.choice(options)
+    return h_rng.ai(encounter_state).choice(options)
 
 def filter_targets (actor, encounter_state, ignore_block=False):
 
-    target_options = encounter_state["actors"]
+    table = encounter_state["table"]
 
-    target_options = {k:v for k, v in target_options.items() if v["KO"] == False}
-    
-    target_options = {k:v for k, v in target_options.items() if v["party"] != encounter_state["actors"][actor]["party"]}
+    i = table.slot[actor]
+    own = table.status[i]
+    other = not table.party[i]
 
     # Blind actors can only target enemies in melee
-    if encounter_state["actors"][actor].get("blind") == True:
-        if encounter_state["actors"][actor]["melee"] == True:
-            target_options = {k:v for k, v in target_options.items() if v["melee"] == True}
-        else:
+    if own & h_state.BLIND:
+        if not own & h_state.MELEE:
             # Blind and not in melee = cannot target anyone
             return {}
 
-    if encounter_state["actors"][actor]["melee"] == True:
-        target_options = {k:v for k, v in target_options.items() if v["melee"] == True}
+    candidates = table.alive[other]
+    in_melee = table.in_melee[other]
+
+    if own & h_state.MELEE:
+        candidates = candidates & in_melee
     else:
         if not ignore_block:
-            blocking_options = {k:v for k, v in target_options.items() if v["block"] == True}
-            if blocking_options != {}:
-                target_options = blocking_options
+            blocking = candidates & table.blocking[other]
+            if blocking:
+                candidates = blocking
 
-    if target_options:
-        non_melee_visible = [
-            k for k, v in target_options.items() if v.get("melee") == False and v.get("hide") == False
-        ]
-        if non_melee_visible:
-            target_options = {k: v for k, v in target_options.items() if v.get("hide") == False}
+    # hidden actors are only safe while someone else is exposed
+    hidden = candidates & table.hidden[other]
+    if hidden and candidates - in_melee - hidden:
+        candidates = candidates - hidden
 
-
-    return target_options
+    return table.target_views(candidates)
 
 def get_target (actor, encounter_state):
 
@@ -432,7 +421,7 @@ def get_target (actor, encounter_state):
     if not available_targets:
         return None
 
-    if actor.logic is not None:
+    if actor_logic(actor, encounter_state) is not None:
         target = choose_target(available_targets, encounter_state)
     else:
         target = next(iter(available_targets))
@@ -441,52 +430,59 @@ def get_target (actor, encounter_state):
 
 def check_combat_modifiers (actor, encounter_state, target):
 
-    adder = actor.fortune if "mystic aim" in actor.features else actor.skill
+    adder = actor.fortune if actor.features.mask & h_features.MYSTIC_AIM else actor.skill
     difficulty = target.defense
 
-    if encounter_state["actors"][actor]["momentum"] == True:
+    table = encounter_state["table"]
+    adder_change, difficulty_change = combat_modifiers (table.status[table.slot[actor]], table.status[table.slot[target]])
+
+    return adder + adder_change, difficulty + difficulty_change
+
+def combat_modifiers (actor_status, target_status):
+    # attack test changes for the attacker's and the target's status words
+
+    adder = 0
+    difficulty = 0
+
+    if actor_status & h_state.MOMENTUM:
         adder += 4
     
-    if encounter_state["actors"][actor]["daze"] == True:
+    if actor_status & h_state.DAZE:
         adder -= 4    
 
-    if encounter_state["actors"][target]["guard"] == True:
+    if target_status & h_state.GUARD:
         difficulty += 4    
 
-    if encounter_state["actors"][target]["daze"] == True:
+    if target_status & h_state.DAZE:
         difficulty -= 4    
 
-    if encounter_state["actors"][target]["vulnerable"] == True:
+    if target_status & h_state.VULNERABLE:
         difficulty -= 4
 
     return adder, difficulty
 
 def get_attack_mitigation(attacker, target, encounter_state, default_mitigation):
-    if encounter_state.get("diabolic_weapon_buffs", {}).get(attacker):
+    if h_effects.get_effect(encounter_state, "diabolic weapon", attacker):
         return target.current_insulation
     return default_mitigation
 
 
 def apply_barbed_halo(attacker, target, encounter_state):
-    buffs = encounter_state.get("barbed_halo_buffs")
-    if not buffs:
-        return encounter_state
-
-    halo = buffs.get(target)
+    halo = h_effects.get_effect(encounter_state, "barbed halo", target)
     if not halo:
         return encounter_state
 
-    if encounter_state["actors"].get(target, {}).get("KO") == True:
+    if is_ko(target, encounter_state):
         return encounter_state
 
-    if encounter_state["actors"].get(attacker, {}).get("KO") == True:
+    if is_ko(attacker, encounter_state):
         return encounter_state
 
     if not (encounter_state["actors"][attacker].get("melee") and encounter_state["actors"][target].get("melee")):
         return encounter_state
 
     damage_bonus = halo.get("damage_bonus", 0)
-    halo_damage = random.randint(1, 4) + damage_bonus
+    halo_damage = h_rng.combat(encounter_state).randint(1, 4) + damage_bonus
     if halo_damage <= 0:
         return encounter_state
 
@@ -501,7 +497,7 @@ def fight (actor, encounter_state):
 
     available_targets = filter_targets(actor, encounter_state)
 
-    if actor.logic != None:
+    if actor_logic(actor, encounter_state) != None:
         target = logic_target(available_targets, actor, encounter_state)
     else:
         target = choose_target(available_targets, encounter_state)
@@ -509,21 +505,22 @@ def fight (actor, encounter_state):
     if not target:
         return encounter_state
 
-    attack_damage = actor.current_power + random.randint (1, 4)
+    attack_damage = actor.current_power + h_rng.combat(encounter_state).randint (1, 4)
 
     attack_damage = charge_trigger (actor, encounter_state, target, attack_damage)
 
-    if "reach" not in actor.features:
+    if not actor.features.mask & h_features.REACH:
         encounter_state["actors"][actor]["melee"] = True
         encounter_state["actors"][target]["melee"] = True
 
-    h_encounter.report (f"{actor.name} attacks {target.name} in melee.")
+    h_events.emit("attack", actor=actor.name, target=target.name, action="fight")
 
-    actor.battlecry()
+    actor.battlecry(h_rng.events(encounter_state))
 
     adder, difficulty = check_combat_modifiers (actor, encounter_state, target)
 
-    result = stat_test (adder, difficulty)
+    result = stat_test (adder, difficulty, h_rng.combat(encounter_state))
+    h_events.emit("hit", actor=actor.name, target=target.name, action="fight", result=result)
 
     if result == "success":
         mitigation = get_attack_mitigation(actor, target, encounter_state, target.current_reduction)
@@ -538,7 +535,6 @@ def fight (actor, encounter_state):
         encounter_state["actors"][target]["momentum"] = False
 
     else:
-        h_encounter.report (f"{target.name} deflects the attack.")
         encounter_state["actors"][actor]["momentum"] = False
         if encounter_state["actors"][target].get("guard") == True:
             cause_vulnerable(actor, encounter_state)
@@ -554,7 +550,7 @@ def smash (actor, encounter_state):
 
     available_targets = filter_targets(actor, encounter_state)
 
-    if actor.logic != None:
+    if actor_logic(actor, encounter_state) != None:
         target = logic_target(available_targets, actor, encounter_state)
     else:
         target = choose_target(available_targets, encounter_state)
@@ -562,23 +558,24 @@ def smash (actor, encounter_state):
     if not target:
         return encounter_state
     
-    attack_damage = actor.current_power + random.randint (1, 4)
+    attack_damage = actor.current_power + h_rng.combat(encounter_state).randint (1, 4)
 
     attack_damage = charge_trigger (actor, encounter_state, target, attack_damage)
 
-    if "reach" not in actor.features:
+    if not actor.features.mask & h_features.REACH:
         encounter_state["actors"][actor]["melee"] = True
         encounter_state["actors"][target]["melee"] = True
 
-    h_encounter.report (f"{actor.name} winds up for a heavy attack against {target.name}.")
+    h_events.emit("attack", actor=actor.name, target=target.name, action="smash")
 
-    actor.battlecry()
+    actor.battlecry(h_rng.events(encounter_state))
 
     adder, difficulty = check_combat_modifiers (actor, encounter_state, target)
 
     adder -= 4
 
-    result = stat_test (adder, difficulty)
+    result = stat_test (adder, difficulty, h_rng.combat(encounter_state))
+    h_events.emit("hit", actor=actor.name, target=target.name, action="smash", result=result)
 
     if result == "success":
         mitigation = get_attack_mitigation(actor, target, encounter_state, target.current_reduction)
@@ -595,7 +592,6 @@ def smash (actor, encounter_state):
         cause_daze (target, encounter_state)
 
     else:
-        h_encounter.report (f"{target.name} deflects the attack.")
         encounter_state["actors"][actor]["momentum"] = False
         cause_vulnerable (actor, encounter_state)
         riposte_trigger (actor, encounter_state, target)
@@ -613,7 +609,7 @@ def hack_and_slash (actor, encounter_state):
     if blocking_targets:
         available_targets = blocking_targets
 
-    if actor.logic != None:
+    if actor_logic(actor, encounter_state) != None:
         target = logic_target(available_targets, actor, encounter_state)
     else:
         target = choose_target(available_targets, encounter_state)
@@ -621,23 +617,24 @@ def hack_and_slash (actor, encounter_state):
     if not target:
         return encounter_state
     
-    attack_damage = actor.current_power + random.randint (1, 4)
+    attack_damage = actor.current_power + h_rng.combat(encounter_state).randint (1, 4)
 
     attack_damage = charge_trigger (actor, encounter_state, target, attack_damage)
 
-    if "reach" not in actor.features:
+    if not actor.features.mask & h_features.REACH:
         encounter_state["actors"][actor]["melee"] = True
         encounter_state["actors"][target]["melee"] = True
 
-    h_encounter.report (f"{actor.name} attacks {target.name} with a flurry of blows.")
+    h_events.emit("attack", actor=actor.name, target=target.name, action="hack and slash")
 
-    actor.battlecry()
+    actor.battlecry(h_rng.events(encounter_state))
 
     adder, difficulty = check_combat_modifiers (actor, encounter_state, target)
 
     adder += 4
 
-    result = stat_test (adder, difficulty)
+    result = stat_test (adder, difficulty, h_rng.combat(encounter_state))
+    h_events.emit("hit", actor=actor.name, target=target.name, action="hack and slash", result=result)
 
     if result == "success":
         mitigation = get_attack_mitigation(actor, target, encounter_state, target.current_reduction)
@@ -654,7 +651,6 @@ def hack_and_slash (actor, encounter_state):
         cause_vulnerable (actor, encounter_state)
 
     else:
-        h_encounter.report (f"{target.name} deflects the attack.")
         encounter_state["actors"][actor]["momentum"] = False
         cause_vulnerable (actor, encounter_state)
         riposte_trigger (actor, encounter_state, target)
@@ -669,7 +665,7 @@ def trip (actor, encounter_state):
 
     available_targets = filter_targets(actor, encounter_state)
 
-    if actor.logic != None:
+    if actor_logic(actor, encounter_state) != None:
         target = logic_target(available_targets, actor, encounter_state)
     else:
         target = choose_target(available_targets, encounter_state)
@@ -677,19 +673,20 @@ def trip (actor, encounter_state):
     if not target:
         return encounter_state
 
-    if "reach" not in actor.features:
+    if not actor.features.mask & h_features.REACH:
         encounter_state["actors"][actor]["melee"] = True
         encounter_state["actors"][target]["melee"] = True
 
-    h_encounter.report (f"{actor.name} looks for an openning against {target.name}.")
+    h_events.emit("attack", actor=actor.name, target=target.name, action="trip")
 
-    actor.battlecry()
+    actor.battlecry(h_rng.events(encounter_state))
 
     adder, difficulty = check_combat_modifiers (actor, encounter_state, target)
 
     adder += 4
 
-    result = stat_test (adder, difficulty)
+    result = stat_test (adder, difficulty, h_rng.combat(encounter_state))
+    h_events.emit("hit", actor=actor.name, target=target.name, action="trip", result=result)
 
     if result == "success":
         encounter_state["actors"][actor]["momentum"] = True
@@ -703,7 +700,6 @@ def trip (actor, encounter_state):
         cause_disable (target, encounter_state)
 
     else:
-        h_encounter.report (f"{target.name} deflects the attack.")
         encounter_state["actors"][actor]["momentum"] = False
         if encounter_state["actors"][target].get("guard") == True:
             cause_vulnerable(actor, encounter_state)
@@ -729,7 +725,7 @@ def dirty_trick(actor, encounter_state):
 
     available_targets = filter_targets(actor, encounter_state)
 
-    if actor.logic != None:
+    if actor_logic(actor, encounter_state) != None:
         target = logic_target(available_targets, actor, encounter_state)
     else:
         target = choose_target(available_targets, encounter_state)
@@ -742,15 +738,16 @@ def dirty_trick(actor, encounter_state):
         h_encounter.report(f"{actor.name} cannot use dirty trick on non-melee target.")
         return encounter_state
 
-    h_encounter.report(f"{actor.name} attempts a dirty trick on {target.name}.")
+    h_events.emit("attack", actor=actor.name, target=target.name, action="dirty trick")
 
-    actor.battlecry()
+    actor.battlecry(h_rng.events(encounter_state))
 
     adder, difficulty = check_combat_modifiers (actor, encounter_state, target)
 
     adder += 4
 
-    result = stat_test (adder, difficulty)
+    result = stat_test (adder, difficulty, h_rng.combat(encounter_state))
+    h_events.emit("hit", actor=actor.name, target=target.name, action="dirty trick", result=result)
 
     # actor loses melee status when using dirty trick
     encounter_state["actors"][actor]["melee"] = False
@@ -767,7 +764,6 @@ def dirty_trick(actor, encounter_state):
         cause_disable (target, encounter_state)
 
     else:
-        h_encounter.report (f"{target.name} deflects the attack.")
         encounter_state["actors"][actor]["momentum"] = False
         if encounter_state["actors"][target].get("guard") == True:
             cause_vulnerable(actor, encounter_state)
@@ -788,43 +784,31 @@ def diablerie(actor, encounter_state):
     rank_values = [8, 11, 14]
 
     # choose a spell
-    if actor.logic != None:
-        spell_name = random.choice(list(SPELLS.keys()))
+    if actor_logic(actor, encounter_state) != None:
+        spell_name = h_rng.ai(encounter_state).choice(list(SPELLS.keys()))
     else:
         spells_list = list(SPELLS.items())
         options_index = {}
+        menu = []
         for i, (k, v) in enumerate(spells_list, start=1):
             text1 = f"{i}.\t"
             text2 = f"{k}"
             text3 = f"{v.get('description','')}"
-            print(text1 + text2.center(19) + text3)
+            menu.append(text1 + text2.center(19) + text3)
             options_index[i] = k
-        try:
-            choice_index = int(input("choose spell."))
-        except ValueError:
-            choice_index = 1
-        if choice_index > len(spells_list):
-            choice_index = len(spells_list)
-        elif choice_index < 1:
-            choice_index = 1
+        choice_index = h_replay.choose("spell", len(spells_list), "choose spell.", menu)
         spell_name = options_index[choice_index]
 
     # choose rank
-    if actor.logic != None:
-        rank = random.choice(rank_values)
+    if actor_logic(actor, encounter_state) != None:
+        rank = h_rng.ai(encounter_state).choice(rank_values)
     else:
         rank_index = {}
+        menu = []
         for i, rv in enumerate(rank_values, start=1):
-            print(f"{i}.\t{rank_names[rv]}")
+            menu.append(f"{i}.\t{rank_names[rv]}")
             rank_index[i] = rv
-        try:
-            rank_choice = int(input("choose rank for the summoning."))
-        except ValueError:
-            rank_choice = 1
-        if rank_choice > len(rank_values):
-            rank_choice = len(rank_values)
-        elif rank_choice < 1:
-            rank_choice = 1
+        rank_choice = h_replay.choose("rank", len(rank_values), "choose rank for the summoning.", menu)
         rank = rank_index[rank_choice]
 
     fortune_cost = rank_values.index(rank) + 1
@@ -834,14 +818,14 @@ def diablerie(actor, encounter_state):
     base_rank = SPELLS[spell_name]["rank"]
     rank_steps = max(0, (rank - base_rank) // 2)
 
-    h_encounter.report(f"{actor.name} summons a {rank_names[rank]} of hell to cast {spell_name}.")
+    h_events.emit("spell_cast", actor=actor.name, spell=spell_name, rank=rank, demon=rank_names[rank])
 
     # Fortune test: adder = actor.current_fortune, difficulty = spell rank
-    result = stat_test(actor.current_fortune, spell["rank"])
+    result = stat_test(actor.current_fortune, spell["rank"], h_rng.combat(encounter_state))
 
     if result == "failure":
         h_encounter.report(f"the {rank_names[rank]} resists the summons and lashes out at {actor.name}")
-        backlash = random.randint(1, 4) + 2
+        backlash = h_rng.combat(encounter_state).randint(1, 4) + 2
         # backlash reduced by caster insulation
         damage(actor, encounter_state, backlash, actor.current_insulation, spell.get("damage_type", "hellfire"))
         return encounter_state
@@ -855,13 +839,13 @@ def diablerie(actor, encounter_state):
     # On success, resolve the spell
     if spell_name == "inferno":
         available_targets = filter_targets(actor, encounter_state, ignore_block=True)
-        if actor.logic != None:
+        if actor_logic(actor, encounter_state) != None:
             target = logic_target(available_targets, actor, encounter_state)
         else:
             target = choose_target(available_targets, encounter_state)
         if not target:
             return encounter_state
-        power = random.randint(spell["min_damage"], spell["max_damage"]) + (3 * rank_steps)
+        power = h_rng.combat(encounter_state).randint(spell["min_damage"], spell["max_damage"]) + (3 * rank_steps)
         h_encounter.report(f"the {rank_names[rank]} unleashes inferno upon {target.name}!")
         # damage reduced by target insulation, damage type is hellfire
         damage(target, encounter_state, power, target.current_insulation, spell.get("damage_type", "hellfire"))
@@ -882,17 +866,16 @@ def diablerie(actor, encounter_state):
         base_difficulty = 15
         difficulty = base_difficulty + (2 * rank_steps)
 
+        table = encounter_state["table"]
         for t in targets:
             # Remove melee, momentum and guard
-            encounter_state["actors"][t]["melee"] = False
-            encounter_state["actors"][t]["momentum"] = False
-            encounter_state["actors"][t]["guard"] = False
+            h_state.clear_status(table, table.slot[t], h_state.MELEE | h_state.MOMENTUM | h_state.GUARD)
 
             # Apply pin (respects resist pin feature)
             cause_pin(t, encounter_state)
 
             # Each affected actor takes a fortune test
-            ft_result = stat_test(t.current_fortune, difficulty)
+            ft_result = stat_test(t.current_fortune, difficulty, h_rng.combat(encounter_state))
             if ft_result == "failure":
                 cause_daze(t, encounter_state)
 
@@ -913,8 +896,9 @@ def diablerie(actor, encounter_state):
         h_encounter.report(f"the {rank_names[rank]} unleashes a locust swarm!")
 
         # End melee for ALL actors
-        for actor_key in encounter_state["actors"]:
-            encounter_state["actors"][actor_key]["melee"] = False
+        table = encounter_state["table"]
+        for i in table.indexes:
+            h_state.clear_status(table, i, h_state.MELEE)
 
         # Difficulty increases by 2 per rank step above base
         base_difficulty = 15
@@ -922,11 +906,10 @@ def diablerie(actor, encounter_state):
 
         for t in targets:
             # Remove momentum and guard
-            encounter_state["actors"][t]["momentum"] = False
-            encounter_state["actors"][t]["guard"] = False
+            h_state.clear_status(table, table.slot[t], h_state.MOMENTUM | h_state.GUARD)
 
             # Each affected actor takes a fortune test
-            ft_result = stat_test(t.current_fortune, difficulty)
+            ft_result = stat_test(t.current_fortune, difficulty, h_rng.combat(encounter_state))
             if ft_result == "failure":
                 cause_blind(t, encounter_state)
 
@@ -946,27 +929,14 @@ def diablerie(actor, encounter_state):
         reduction_bonus += rank_steps
         power_bonus = rank_steps
         
-        # Apply bonuses temporarily
-        actor.current_reduction += reduction_bonus
-        actor.current_power += power_bonus
-        if "juggernaut" not in actor.features:
-            actor.features.append("juggernaut")
-        
+        h_effects.add_effect(
+            encounter_state, "stone skin", actor, 8,
+            reduction_bonus=reduction_bonus, power_bonus=power_bonus, juggernaut=True,
+        )
+
         h_encounter.report(
             f"{actor.name} gains +{reduction_bonus} reduction, +{power_bonus} power, and juggernaut for 8 turns."
         )
-        
-        # Track the buff duration in encounter_state (if not already initialized)
-        if "stone_skin_buffs" not in encounter_state:
-            encounter_state["stone_skin_buffs"] = {}
-        
-        # Set duration to 8 turns
-        encounter_state["stone_skin_buffs"][actor] = {
-            "duration": 8,
-            "reduction_bonus": reduction_bonus,
-            "power_bonus": power_bonus,
-            "juggernaut": True,
-        }
 
     elif spell_name == "diabolic weapon":
         available_targets = {
@@ -974,8 +944,8 @@ def diablerie(actor, encounter_state):
             for k, v in encounter_state["actors"].items()
             if v["KO"] == False and v["party"] == encounter_state["actors"][actor]["party"]
         }
-        if actor.logic != None:
-            target = random.choice(list(available_targets.keys())) if available_targets else None
+        if actor_logic(actor, encounter_state) != None:
+            target = h_rng.ai(encounter_state).choice(list(available_targets.keys())) if available_targets else None
         else:
             target = choose_target(available_targets, encounter_state)
 
@@ -984,18 +954,7 @@ def diablerie(actor, encounter_state):
 
         power_bonus = 2 + rank_steps
 
-        if "diabolic_weapon_buffs" not in encounter_state:
-            encounter_state["diabolic_weapon_buffs"] = {}
-
-        if target in encounter_state["diabolic_weapon_buffs"]:
-            previous = encounter_state["diabolic_weapon_buffs"][target]
-            target.current_power -= previous["power_bonus"]
-
-        target.current_power += power_bonus
-        encounter_state["diabolic_weapon_buffs"][target] = {
-            "duration": 8,
-            "power_bonus": power_bonus,
-        }
+        h_effects.add_effect(encounter_state, "diabolic weapon", target, 8, power_bonus=power_bonus)
 
         h_encounter.report(
             f"the {rank_names[rank]} binds a diabolic weapon to {target.name}, granting +{power_bonus} power for 8 turns."
@@ -1003,7 +962,7 @@ def diablerie(actor, encounter_state):
 
     elif spell_name == "misfortune":
         available_targets = filter_targets(actor, encounter_state, ignore_block=True)
-        if actor.logic != None:
+        if actor_logic(actor, encounter_state) != None:
             target = logic_target(available_targets, actor, encounter_state)
         else:
             target = choose_target(available_targets, encounter_state)
@@ -1013,22 +972,10 @@ def diablerie(actor, encounter_state):
         fortune_penalty = 4 + (2 * rank_steps)
         insulation_penalty = 2 + (2 * rank_steps)
 
-        if "misfortune_debuffs" not in encounter_state:
-            encounter_state["misfortune_debuffs"] = {}
-
-        if target in encounter_state["misfortune_debuffs"]:
-            previous = encounter_state["misfortune_debuffs"][target]
-            target.current_fortune += previous["fortune_penalty"]
-            target.current_insulation += previous["insulation_penalty"]
-
-        target.current_fortune -= fortune_penalty
-        target.current_insulation -= insulation_penalty
-
-        encounter_state["misfortune_debuffs"][target] = {
-            "duration": 8,
-            "fortune_penalty": fortune_penalty,
-            "insulation_penalty": insulation_penalty,
-        }
+        h_effects.add_effect(
+            encounter_state, "misfortune", target, 8,
+            fortune_penalty=fortune_penalty, insulation_penalty=insulation_penalty,
+        )
 
         h_encounter.report(
             f"the {rank_names[rank]} curses {target.name} with misfortune, reducing fortune by {fortune_penalty} and insulation by {insulation_penalty} for 8 turns."
@@ -1037,13 +984,7 @@ def diablerie(actor, encounter_state):
     elif spell_name == "barbed halo":
         damage_bonus = 2 * rank_steps
 
-        if "barbed_halo_buffs" not in encounter_state:
-            encounter_state["barbed_halo_buffs"] = {}
-
-        encounter_state["barbed_halo_buffs"][actor] = {
-            "duration": 8,
-            "damage_bonus": damage_bonus,
-        }
+        h_effects.add_effect(encounter_state, "barbed halo", actor, 8, damage_bonus=damage_bonus)
 
         h_encounter.report(
             f"the {rank_names[rank]} crowns {actor.name} in a barbed halo for 8 turns."
@@ -1051,7 +992,7 @@ def diablerie(actor, encounter_state):
 
     elif spell_name == "grasp of the dead":
         available_targets = filter_targets(actor, encounter_state, ignore_block=True)
-        if actor.logic != None:
+        if actor_logic(actor, encounter_state) != None:
             target = logic_target(available_targets, actor, encounter_state)
         else:
             target = choose_target(available_targets, encounter_state)
@@ -1060,21 +1001,7 @@ def diablerie(actor, encounter_state):
 
         defense_penalty = 4 + (2 * rank_steps)
 
-        if "evil_eye_debuffs" not in encounter_state:
-            encounter_state["evil_eye_debuffs"] = {}
-
-        if target in encounter_state["evil_eye_debuffs"]:
-            previous = encounter_state["evil_eye_debuffs"][target]
-            target.defense += previous["defense_penalty"]
-
-        target.defense -= defense_penalty
-
-        encounter_state["evil_eye_debuffs"][target] = {
-            "duration": 8,
-            "defense_penalty": defense_penalty,
-        }
-
-        cause_root(target, encounter_state)
+        h_effects.add_effect(encounter_state, "evil eye", target, 8, defense_penalty=defense_penalty)
 
         h_encounter.report(
             f"the {rank_names[rank]} marks {target.name} with grasp of the dead, reducing defense by {defense_penalty} for 8 turns."
@@ -1086,6 +1013,48 @@ def diablerie(actor, encounter_state):
 diablerie.description = "Call a demon from hell to cast spells."
 
 
+# Timed effects of diablerie spells (see h_effects)
+
+def apply_stone_skin(actor, encounter_state, effect):
+    actor.add_buff("stone skin", current_reduction=effect["reduction_bonus"], current_power=effect["power_bonus"])
+    if effect.get("juggernaut") == True:
+        actor.features.add("juggernaut")
+
+def revert_stone_skin(actor, encounter_state, effect):
+    actor.remove_buff("stone skin")
+    if effect.get("juggernaut") == True:
+        actor.features.remove("juggernaut")
+
+def apply_diabolic_weapon(actor, encounter_state, effect):
+    actor.add_buff("diabolic weapon", current_power=effect["power_bonus"])
+
+def revert_diabolic_weapon(actor, encounter_state, effect):
+    actor.remove_buff("diabolic weapon")
+
+def apply_misfortune(actor, encounter_state, effect):
+    actor.add_buff("misfortune", current_fortune=-effect["fortune_penalty"], current_insulation=-effect["insulation_penalty"])
+
+def revert_misfortune(actor, encounter_state, effect):
+    actor.remove_buff("misfortune")
+
+def apply_evil_eye(actor, encounter_state, effect):
+    actor.add_buff("evil eye", defense=-effect["defense_penalty"])
+    cause_root(actor, encounter_state)
+
+def revert_evil_eye(actor, encounter_state, effect):
+    actor.remove_buff("evil eye")
+    remove_root(actor, encounter_state)
+
+def no_change(actor, encounter_state, effect):
+    pass
+
+h_effects.register_effect("stone skin", apply_stone_skin, revert_stone_skin, "{}'s stone skin fades away.")
+h_effects.register_effect("diabolic weapon", apply_diabolic_weapon, revert_diabolic_weapon, "{}'s diabolic weapon fades.")
+h_effects.register_effect("barbed halo", no_change, no_change, "{}'s barbed halo fades.")
+h_effects.register_effect("evil eye", apply_evil_eye, revert_evil_eye, "{}'s evil eye fades.")
+h_effects.register_effect("misfortune", apply_misfortune, revert_misfortune, "{}'s misfortune fades.")
+
+
 def prowl(actor, encounter_state):
     # Prowl: similar to fight but does NOT set actor into melee.
     # If actor is not in melee, it may target any enemy (including blockers).
@@ -1094,14 +1063,14 @@ def prowl(actor, encounter_state):
         available_targets = {k: v for k, v in encounter_state["actors"].items() if v["KO"] == False and v["party"] != encounter_state["actors"][actor]["party"]}
         if not available_targets:
             return encounter_state
-        if actor.logic != None:
+        if actor_logic(actor, encounter_state) != None:
             target = logic_target(available_targets, actor, encounter_state)
         else:
             target = choose_target(available_targets, encounter_state)
     else:
         # behave like a normal fight selection
         available_targets = filter_targets(actor, encounter_state)
-        if actor.logic != None:
+        if actor_logic(actor, encounter_state) != None:
             target = logic_target(available_targets, actor, encounter_state)
         else:
             target = choose_target(available_targets, encounter_state)
@@ -1109,20 +1078,21 @@ def prowl(actor, encounter_state):
     if not target:
         return encounter_state
 
-    attack_damage = actor.current_power + random.randint(1, 4)
+    attack_damage = actor.current_power + h_rng.combat(encounter_state).randint(1, 4)
 
     # bonus damage if target is in melee while actor is not
     if encounter_state["actors"][target]["melee"] == True and encounter_state["actors"][actor]["melee"] == False:
-        attack_damage += random.randint(1, 4)
+        attack_damage += h_rng.combat(encounter_state).randint(1, 4)
 
     # prowling action does not set melee flags
-    h_encounter.report (f"{actor.name} prowls toward {target.name}.")
+    h_events.emit("attack", actor=actor.name, target=target.name, action="prowl")
 
-    actor.battlecry()
+    actor.battlecry(h_rng.events(encounter_state))
 
     adder, difficulty = check_combat_modifiers (actor, encounter_state, target)
 
-    result = stat_test (adder, difficulty)
+    result = stat_test (adder, difficulty, h_rng.combat(encounter_state))
+    h_events.emit("hit", actor=actor.name, target=target.name, action="prowl", result=result)
 
     if result == "success":
         mitigation = get_attack_mitigation(actor, target, encounter_state, target.current_reduction)
@@ -1137,7 +1107,6 @@ def prowl(actor, encounter_state):
         encounter_state["actors"][target]["momentum"] = False
 
     else:
-        h_encounter.report (f"{target.name} deflects the attack.")
         encounter_state["actors"][actor]["momentum"] = False
         if encounter_state["actors"][target].get("guard") == True:
             cause_vulnerable(actor, encounter_state)
@@ -1151,7 +1120,7 @@ def stab (actor, encounter_state):
 
     available_targets = filter_targets(actor, encounter_state)
 
-    if actor.logic != None:
+    if actor_logic(actor, encounter_state) != None:
         target = logic_target(available_targets, actor, encounter_state)
     else:
         target = choose_target(available_targets, encounter_state)
@@ -1160,26 +1129,27 @@ def stab (actor, encounter_state):
         return encounter_state
 
     
-    attack_damage = actor.current_power + random.randint (1, 4)
+    attack_damage = actor.current_power + h_rng.combat(encounter_state).randint (1, 4)
 
     attack_damage = charge_trigger (actor, encounter_state, target, attack_damage)
 
     encounter_state["actors"][actor]["melee"] = True
     encounter_state["actors"][target]["melee"] = True
 
-    h_encounter.report (f"{actor.name} aims at {target.name} weak points.")
+    h_events.emit("attack", actor=actor.name, target=target.name, action="stab")
 
-    actor.battlecry()
+    actor.battlecry(h_rng.events(encounter_state))
 
     adder, difficulty = check_combat_modifiers (actor, encounter_state, target)
     
     adder -= 2
 
-    result = stat_test (adder, difficulty)
+    result = stat_test (adder, difficulty, h_rng.combat(encounter_state))
+    h_events.emit("hit", actor=actor.name, target=target.name, action="stab", result=result)
 
     if result == "success":
         mitigation = get_attack_mitigation(actor, target, encounter_state, 0)
-        damage (target, encounter_state, attack_damage + random.randint (1, 4), mitigation, "pierce")
+        damage (target, encounter_state, attack_damage + h_rng.combat(encounter_state).randint (1, 4), mitigation, "pierce")
         encounter_state["actors"][actor]["momentum"] = True
         encounter_state["actors"][target]["momentum"] = False
 
@@ -1190,7 +1160,6 @@ def stab (actor, encounter_state):
         encounter_state["actors"][target]["momentum"] = False
 
     else:
-        h_encounter.report (f"{target.name} deflects the attack.")
         encounter_state["actors"][actor]["momentum"] = False
         if encounter_state["actors"][target].get("guard") == True:
             cause_vulnerable(actor, encounter_state)
@@ -1210,7 +1179,7 @@ def skirmish (actor, encounter_state):
         encounter_state["action_failed"] = True
         return encounter_state
 
-    if actor.logic != None:
+    if actor_logic(actor, encounter_state) != None:
         target = logic_target(available_targets, actor, encounter_state)
     else:
         target = choose_target(available_targets, encounter_state)
@@ -1218,15 +1187,16 @@ def skirmish (actor, encounter_state):
     if not target:
         return encounter_state
 
-    attack_damage = random.randint (1, 6)
+    attack_damage = h_rng.combat(encounter_state).randint (1, 6)
 
-    h_encounter.report (f"{actor.name} takes aims at {target.name} and attacks from a distance.")
+    h_events.emit("attack", actor=actor.name, target=target.name, action="skirmish")
 
     encounter_state["actors"][actor]["momentum"] = False
     
     adder, difficulty = check_combat_modifiers (actor, encounter_state, target)
 
-    result = stat_test (adder, difficulty)
+    result = stat_test (adder, difficulty, h_rng.combat(encounter_state))
+    h_events.emit("hit", actor=actor.name, target=target.name, action="skirmish", result=result)
 
     if result == "success":
         mitigation = get_attack_mitigation(actor, target, encounter_state, target.current_reduction)
@@ -1241,7 +1211,6 @@ def skirmish (actor, encounter_state):
         cause_pin (target, encounter_state)
 
     else:
-        h_encounter.report (f"{actor.name} misses.")
         encounter_state["actors"][actor]["momentum"] = False
 
     return encounter_state
@@ -1331,7 +1300,7 @@ def aid(actor, encounter_state):
         h_encounter.report(f"{actor.name} has no ally to aid.")
         return encounter_state
 
-    if actor.logic != None:
+    if actor_logic(actor, encounter_state) != None:
         target = logic_target(available_targets, actor, encounter_state)
     else:
         target = choose_target(available_targets, encounter_state)
@@ -1357,7 +1326,7 @@ def rally(actor, encounter_state):
     if "rally_used" not in encounter_state:
         encounter_state["rally_used"] = True
     else:
-        if random.randint(0, 1) == 0:
+        if h_rng.combat(encounter_state).randint(0, 1) == 0:
             h_encounter.report(f"{actor.name}'s rally falters.")
             encounter_state["actors"][actor]["momentum"] = False
             return encounter_state
@@ -1394,20 +1363,14 @@ def decisive_order(actor, encounter_state):
         encounter_state["actors"][actor]["momentum"] = False
         return encounter_state
 
-    allies = {
-        k: v
-        for k, v in encounter_state["actors"].items()
-        if v["KO"] == False
-        and v["party"] == encounter_state["actors"][actor]["party"]
-        and k != actor
-    }
+    allies = tactical_view(actor, encounter_state).allies()
 
     if not allies:
         h_encounter.report(f"{actor.name} has no ally to command.")
         encounter_state["actors"][actor]["momentum"] = False
         return encounter_state
 
-    if actor.logic != None:
+    if actor_logic(actor, encounter_state) != None:
         target = logic_target(allies, actor, encounter_state)
     else:
         target = choose_target(allies, encounter_state)
@@ -1416,18 +1379,14 @@ def decisive_order(actor, encounter_state):
         encounter_state["actors"][actor]["momentum"] = False
         return encounter_state
 
-    possible = filter_actions(
-        target,
-        encounter_state,
-        {"fight": fight, "skirmish": skirmish, "retreat": retreat},
-    )
+    possible = filter_actions(target, encounter_state, ORDERED_ACTIONS)
 
     if not possible:
         h_encounter.report(f"{target.name} cannot act on the decisive order.")
         encounter_state["actors"][actor]["momentum"] = False
         return encounter_state
 
-    if actor.logic != None:
+    if actor_logic(actor, encounter_state) != None:
         ordered_action = enemy_action_logic(target, encounter_state, possible)
     else:
         ordered_action = choose_options(possible)
@@ -1440,26 +1399,23 @@ def decisive_order(actor, encounter_state):
     encounter_state["actors"][actor]["momentum"] = False
     return encounter_state
 
+# what an ally can be ordered to do, see decisive_order
+ORDERED_ACTIONS = ActionTable({"fight": fight, "skirmish": skirmish, "retreat": retreat})
+
 def deliverance(actor, encounter_state):
     if encounter_state.get("deliverance_used") == True:
         h_encounter.report(f"{actor.name} has already used deliverance this encounter.")
         encounter_state["actors"][actor]["momentum"] = False
         return encounter_state
 
-    allies = {
-        k: v
-        for k, v in encounter_state["actors"].items()
-        if v["KO"] == False
-        and v["party"] == encounter_state["actors"][actor]["party"]
-        and k != actor
-    }
+    allies = tactical_view(actor, encounter_state).allies()
 
     if not allies:
         h_encounter.report(f"{actor.name} has no ally to aid with deliverance.")
         encounter_state["actors"][actor]["momentum"] = False
         return encounter_state
 
-    if actor.logic != None:
+    if actor_logic(actor, encounter_state) != None:
         target = logic_target(allies, actor, encounter_state)
     else:
         target = choose_target(allies, encounter_state)
@@ -1468,7 +1424,7 @@ def deliverance(actor, encounter_state):
         encounter_state["actors"][actor]["momentum"] = False
         return encounter_state
 
-    restore = random.randint(7, 12)
+    restore = h_rng.combat(encounter_state).randint(7, 12)
     target.current_stamina = min(target.current_stamina + restore, target.stamina)
 
     remove_vulnerable(target, encounter_state)
@@ -1491,7 +1447,7 @@ def swap_arms (actor, encounter_state):
         # nothing to swap
     
     encounter_state["actors"][actor]["momentum"] = False
-    if swapped and "quick draw" in actor.features:
+    if swapped and actor.features.mask & h_features.QUICK_DRAW:
         encounter_state["action_failed"] = True
 
     return encounter_state
@@ -1510,23 +1466,19 @@ def use_item (actor, encounter_state):
         h_encounter.report(f"The party has no items to use.")
         return encounter_state
     
-    # Display items and prompt for choice
-    options_index = {}
-    for i, item in enumerate(items, start=1):
-        print(f"{i}.\t{item.name}")
-        options_index[i] = i - 1  # Store 0-indexed position
-    
-    try:
-        choice_index = int(input("choose item."))
-    except ValueError:
-        choice_index = 1
-    
-    if choice_index > len(items):
-        choice_index = len(items)
-    elif choice_index < 1:
-        choice_index = 1
-    
-    item_index = options_index[choice_index]
+    if actor_logic(actor, encounter_state) != None:
+        item_index = h_rng.ai(encounter_state).randrange(len(items))
+    else:
+        # Display items and prompt for choice
+        options_index = {}
+        menu = []
+        for i, item in enumerate(items, start=1):
+            menu.append(f"{i}.\t{item.name}")
+            options_index[i] = i - 1  # Store 0-indexed position
+
+        choice_index = h_replay.choose("item", len(items), "choose item.", menu)
+
+        item_index = options_index[choice_index]
     consumable = items[item_index]
     
     h_encounter.report(f"{actor.name} uses {consumable.name}.")
@@ -1545,11 +1497,7 @@ def observe(actor, encounter_state):
     lines = ["Observation:"]
 
     def format_actor_status(target, target_state):
-        status_flags = [
-            key
-            for key, value in target_state.items()
-            if value == True and key not in {"active", "party"}
-        ]
+        status_flags = target_state.status_names()
         status_text = f"Status: {', '.join(status_flags)}" if status_flags else "Status: none"
         weapon_name = target.arms_slot1.name if target.arms_slot1 else "None"
         return (
@@ -1579,7 +1527,7 @@ def observe(actor, encounter_state):
     return encounter_state
 
 def recover(actor, encounter_state):
-    restore = random.randint(3, 6)
+    restore = h_rng.combat(encounter_state).randint(3, 6)
     max_recover = max(1, actor.stamina // 2)
     new_stamina = min(actor.current_stamina + restore, max_recover)
     actual_restore = max(0, new_stamina - actor.current_stamina)
@@ -1622,20 +1570,26 @@ def damage (actor, encounter_state, power = 0, reduction = 0, damage_type = "blu
 
     fate_check = final_damage >= actor.current_stamina
 
+    damage_taken = encounter_state.get("damage_taken")
+    if damage_taken is not None:
+        damage_taken[actor] = damage_taken.get(actor, 0) + final_damage
+    table = encounter_state["table"]
+    table.wounded.add(table.slot[actor])
+
     ft_result = None
     # If this damage would drop the actor to 0 or below, attempt a fortune test
     
     actor.current_stamina -= final_damage
 
-    actor.pain ()
+    actor.pain (h_rng.events(encounter_state))
 
-    h_encounter.report (f"{actor.name} takes {final_damage} damage.")
+    h_events.emit("damage", actor=actor.name, amount=final_damage, damage_type=damage_type)
 
     if fate_check:
         h_encounter.report(f"{actor.name}'s fate is about to be decided.")
         if fate_check:
             # Fortune test: adder = actor.current_fortune, difficulty = 10 + damage
-            ft_result = stat_test(actor.current_fortune, 10 + final_damage)
+            ft_result = stat_test(actor.current_fortune, 10 + final_damage, h_rng.combat(encounter_state))
 
         if ft_result == "success" or ft_result == "critical":
             # Survives by fortune: restore to 1 stamina and skip death
@@ -1647,8 +1601,9 @@ def damage (actor, encounter_state, power = 0, reduction = 0, damage_type = "blu
         actor.current_stamina = 0
         encounter_state["actors"][actor]["KO"] = True
         encounter_state["actors"][actor]["melee"] = False
+        h_events.emit("ko", actor=actor.name, damage_type=damage_type)
 
-        actor.death (damage_type)
+        actor.death (damage_type, h_rng.events(encounter_state))
 
     return encounter_state
 
@@ -1656,9 +1611,9 @@ def damage (actor, encounter_state, power = 0, reduction = 0, damage_type = "blu
 def charge_trigger (actor, encounter_state, target, attack_damage):
 
     if encounter_state["actors"][actor]["melee"] == False:
-        if "charge" in actor.features:
-            if "reach" not in target.features:
-                attack_damage += random.randint (1, 4)
+        if actor.features.mask & h_features.CHARGE:
+            if not target.features.mask & h_features.REACH:
+                attack_damage += h_rng.combat(encounter_state).randint (1, 4)
                 h_encounter.report (f"{actor.name} charges furiously into battle.")
             else:
                 h_encounter.report (f"{target.name} staggers {actor.name}'s charge.")
@@ -1667,17 +1622,17 @@ def charge_trigger (actor, encounter_state, target, attack_damage):
 
 def riposte_trigger (actor, encounter_state, target):
     if encounter_state["actors"][target]["guard"] == True: 
-        if "riposte" in target.features:
+        if target.features.mask & h_features.RIPOSTE:
             
             h_encounter.report (f"{target.name} siezes the moment and counter-attacks.")
 
-            attack_damage = target.current_power + random.randint (1, 4)
+            attack_damage = target.current_power + h_rng.combat(encounter_state).randint (1, 4)
 
-            target.battlecry()
+            target.battlecry(h_rng.events(encounter_state))
 
             adder, difficulty = check_combat_modifiers (target, encounter_state, actor)
 
-            result = stat_test (adder, difficulty)
+            result = stat_test (adder, difficulty, h_rng.combat(encounter_state))
 
             if result == "success":
                 mitigation = get_attack_mitigation(target, actor, encounter_state, actor.current_reduction)
@@ -1693,135 +1648,154 @@ def riposte_trigger (actor, encounter_state, target):
                 h_encounter.report (f"{target.name} misses.")
 
 def savagery_trigger (actor, encounter_state):
-    if encounter_state["actors"].get(actor, {}).get("KO") == True:
+    table = encounter_state["table"]
+    i = table.slot[actor]
+    if table.ko[i]:
         return encounter_state
-    if "savagery" in actor.features:
+    if actor.features.mask & h_features.SAVAGERY:
         if actor.current_stamina < actor.stamina // 2 +1:
-            if encounter_state["actors"][actor]["enraged"] == False:
+            if not table.status[i] & h_state.ENRAGED:
                 h_encounter.report (f"{actor.name} is enraged and grows stronger from their wounds.")
                 actor.current_power += 2
                 actor.current_reduction += 2
-                encounter_state["actors"][actor]["enraged"] = True
-                encounter_state["actors"][actor]["speed"] = "fast"
                 # Enraged actors are always vulnerable
-                encounter_state["actors"][actor]["vulnerable"] = True
+                table.status[i] |= h_state.ENRAGED | h_state.VULNERABLE
+                table.set_speed(i, h_state.SPEED_RANK["fast"])
 
     return encounter_state
 
-def cause_status (actor, encounter_state, status, message):
-    if encounter_state["actors"].get(actor, {}).get("KO") == True:
+def set_speed (actor, encounter_state, speed):
+    table = encounter_state["table"]
+    table.set_speed(table.slot[actor], h_state.SPEED_RANK.get(speed, h_state.NORMAL_SPEED))
+
+def is_ko (actor, encounter_state):
+    table = encounter_state["table"]
+    return table.ko[table.slot[actor]]
+
+def cause_status (actor, encounter_state, status, message=None):
+    table = encounter_state["table"]
+    i = table.slot[actor]
+    if table.ko[i]:
         return
-    if encounter_state["actors"][actor][status] == False:
-        encounter_state["actors"][actor][status] = True
-        h_encounter.report (message)
+    bit = h_state.STATUS_BITS[status]
+    if h_state.set_status(table, i, bit):
+        if message is None:
+            h_events.emit("status_applied", actor=actor.name, status=status)
+        else:
+            h_encounter.report (message)
 
 def remove_status (actor, encounter_state, status, message):
-    if encounter_state["actors"].get(actor, {}).get("KO") == True:
+    table = encounter_state["table"]
+    i = table.slot[actor]
+    if table.ko[i]:
         return
-    if encounter_state["actors"][actor][status] == True:
-        encounter_state["actors"][actor][status] = False
+    bit = h_state.STATUS_BITS[status]
+    if h_state.clear_status(table, i, bit):
         h_encounter.report (message)
 
 def cause_daze (actor, encounter_state):
-    if encounter_state["actors"].get(actor, {}).get("KO") == True:
+    if is_ko(actor, encounter_state):
         return
-    if "juggernaut" in actor.features:
+    if actor.features.mask & h_features.JUGGERNAUT:
         h_encounter.report (f"{actor.name}'s juggernaut resilience ignores the daze.")
         return
     status = "daze"
-    message = f"{actor.name} is dazed."
-    cause_status (actor, encounter_state, status, message)
+    cause_status (actor, encounter_state, status)
 
 def cause_vulnerable (actor, encounter_state):
-    if encounter_state["actors"].get(actor, {}).get("KO") == True:
+    if is_ko(actor, encounter_state):
         return
     status = "vulnerable"
-    message = f"{actor.name} is vulnerable."
-    cause_status (actor, encounter_state, status, message)
+    cause_status (actor, encounter_state, status)
 
 def cause_disable (actor, encounter_state):
-    if encounter_state["actors"].get(actor, {}).get("KO") == True:
+    if is_ko(actor, encounter_state):
         return
     status = "disable"
-    message = f"{actor.name} is disabled."
     # Enraged actors cannot be disabled
     if encounter_state["actors"][actor].get("enraged") == True:
         h_encounter.report (f"{actor.name}'s rage prevents them from being disabled.")
     else:
-        cause_status (actor, encounter_state, status, message)
+        cause_status (actor, encounter_state, status)
 
 def cause_pin (actor, encounter_state):
-    if encounter_state["actors"].get(actor, {}).get("KO") == True:
+    if is_ko(actor, encounter_state):
         return
     status = "pin"
-    message = f"{actor.name} is pinned."
     # Enraged actors cannot be pinned
     if encounter_state["actors"][actor].get("enraged") == True:
         h_encounter.report (f"{actor.name}'s rage prevents them from being pinned.")
-    elif "resist pin" not in actor.features:
-        cause_status (actor, encounter_state, status, message)
+    elif not actor.features.mask & h_features.RESIST_PIN:
+        cause_status (actor, encounter_state, status)
     else:
         # Resist pin has 75% chance to prevent pinning
-        if random.randint(1, 4) <= 3:
+        if h_rng.combat(encounter_state).randint(1, 4) <= 3:
             h_encounter.report (f"{actor.name} resists being pinned.")
         else:
-            cause_status (actor, encounter_state, status, message)
+            cause_status (actor, encounter_state, status)
 
 def cause_blind (actor, encounter_state):
-    if encounter_state["actors"].get(actor, {}).get("KO") == True:
+    if is_ko(actor, encounter_state):
         return
     status = "blind"
-    message = f"{actor.name} is blinded."
-    cause_status (actor, encounter_state, status, message)
+    cause_status (actor, encounter_state, status)
 
 def cause_root (actor, encounter_state):
-    if encounter_state["actors"].get(actor, {}).get("KO") == True:
+    if is_ko(actor, encounter_state):
         return
     status = "root"
-    message = f"{actor.name} is rooted."
-    cause_status (actor, encounter_state, status, message)
+    cause_status (actor, encounter_state, status)
+
+# Order in which ended statuses are reported, as resets always have.
+REMOVE_ORDER = (
+    (h_state.GUARD, "guard"),
+    (h_state.BLOCK, "block"),
+    (h_state.HIDE, "hide"),
+    (h_state.VULNERABLE, "vulnerable"),
+    (h_state.DAZE, "daze"),
+    (h_state.DISABLE, "disable"),
+    (h_state.PIN, "pin"),
+    (h_state.BLIND, "blind"),
+    (h_state.ROOT, "root"),
+)
+
+def clear_statuses (actor, encounter_state, mask):
+    """Clear every status in `mask` at once and report only the ones that
+    were actually set. Returns the cleared flags."""
+    table = encounter_state["table"]
+    i = table.slot[actor]
+    if table.ko[i]:
+        return 0
+    removed = h_state.clear_status(table, i, mask)
+    if removed and h_events.current_sink().enabled:
+        for bit, status in REMOVE_ORDER:
+            if removed & bit:
+                h_events.emit("status_removed", actor=actor.name, status=status)
+    return removed
 
 def remove_guard (actor, encounter_state):
-    status = "guard"
-    message = f"{actor.name} is no longer guarding."
-    remove_status (actor, encounter_state, status, message)
+    clear_statuses (actor, encounter_state, h_state.GUARD)
 
 def remove_block (actor, encounter_state):
-    status = "block"
-    message = f"{actor.name} is no longer blocking."
-    remove_status (actor, encounter_state, status, message)
+    clear_statuses (actor, encounter_state, h_state.BLOCK)
 
 def remove_hide (actor, encounter_state):
-    status = "hide"
-    message = f"{actor.name} is no longer hidden."
-    remove_status (actor, encounter_state, status, message)
+    clear_statuses (actor, encounter_state, h_state.HIDE)
 
 def remove_daze (actor, encounter_state):
-    status = "daze"
-    message = f"{actor.name} is no longer dazed."
-    remove_status (actor, encounter_state, status, message)
+    clear_statuses (actor, encounter_state, h_state.DAZE)
 
 def remove_vulnerable (actor, encounter_state):
-    status = "vulnerable"
-    message = f"{actor.name} is no longer vulnerable."
-    remove_status (actor, encounter_state, status, message)
+    clear_statuses (actor, encounter_state, h_state.VULNERABLE)
 
 def remove_disable (actor, encounter_state):
-    status = "disable"
-    message = f"{actor.name} is no longer disabled."
-    remove_status (actor, encounter_state, status, message)
+    clear_statuses (actor, encounter_state, h_state.DISABLE)
 
 def remove_pin (actor, encounter_state):
-    status = "pin"
-    message = f"{actor.name} is no longer pinned."
-    remove_status (actor, encounter_state, status, message)
+    clear_statuses (actor, encounter_state, h_state.PIN)
 
 def remove_blind (actor, encounter_state):
-    status = "blind"
-    message = f"{actor.name} is no longer blinded."
-    remove_status (actor, encounter_state, status, message)
+    clear_statuses (actor, encounter_state, h_state.BLIND)
 
 def remove_root (actor, encounter_state):
-    status = "root"
-    message = f"{actor.name} is no longer rooted."
-    remove_status (actor, encounter_state, status, message)
+    clear_statuses (actor, encounter_state, h_state.ROOT)
@@ -1,11 +1,28 @@
 import random
+import operator
 import os
-import pickle
 import h_encounter
 import h_actions
+import h_effects
+import h_events
+import h_features
+import h_rng
+import h_replay
+
+
+def _set_slots(obj, state):
+    """__setstate__ for the slotted classes below. Saves from before they
+    had slots hold a plain __dict__ state."""
+    if isinstance(state, tuple):
+        state = state[1] or {}
+    for name, value in state.items():
+        setattr(obj, name, value)
 
 
 class Consumable:
+    __slots__ = ("name", "description")
+    __setstate__ = _set_slots
+
     def __init__(self, name, description):
         self.name = name
         self.description = description
@@ -37,8 +54,7 @@ class Inventory:
 
 def _apply_stat_bonus(actor, attr, amount):
     current_attr = f"current_{attr}"
-    if hasattr(actor, attr):
-        setattr(actor, attr, getattr(actor, attr) + amount)
+    actor.adjust_stat(attr, amount, "boons")
     if hasattr(actor, current_attr):
         setattr(actor, current_attr, getattr(actor, current_attr) + amount)
 
@@ -58,12 +74,12 @@ def _boon_benefits():
         {"name": "+1 insulation", "apply": lambda a: _apply_stat_bonus(a, "insulation", 1)},
         {
             "name": "gain riposte",
-            "apply": lambda a: a.features.append("riposte") if "riposte" not in a.features else None,
+            "apply": lambda a: a.features.add("riposte"),
         },
     ]
 
 
-def apply_boon(party):
+def apply_boon(party, rng=random):
     eligible = [a for a in party if len(getattr(a, "boons", [])) < 3]
     if not eligible:
         h_encounter.report("No party member can receive more boons.")
@@ -72,43 +88,29 @@ def apply_boon(party):
     h_encounter.report("Choose one party member to receive a boon.")
     options_index = {}
     options_counter = 0
+    menu = []
     for actor in eligible:
         options_counter += 1
-        print(f"{options_counter}.\t{actor.name}")
+        menu.append(f"{options_counter}.\t{actor.name}")
         options_index[options_counter] = actor
 
-    try:
-        choice_index = int(input("choose actor."))
-    except ValueError:
-        choice_index = 1
-
-    if choice_index > options_counter:
-        choice_index = options_counter
-    elif choice_index < 1:
-        choice_index = 1
+    choice_index = h_replay.choose("boon actor", options_counter, "choose actor.", menu)
 
     chosen_actor = options_index[choice_index]
 
     benefits = _boon_benefits()
-    selected = random.sample(benefits, 2)
+    selected = rng.sample(benefits, 2)
 
     h_encounter.report("Choose a boon:")
     boon_index = {}
     boon_counter = 0
+    menu = []
     for boon in selected:
         boon_counter += 1
-        print(f"{boon_counter}.\t{boon['name']}")
+        menu.append(f"{boon_counter}.\t{boon['name']}")
         boon_index[boon_counter] = boon
 
-    try:
-        boon_choice_index = int(input("choose boon."))
-    except ValueError:
-        boon_choice_index = 1
-
-    if boon_choice_index > boon_counter:
-        boon_choice_index = boon_counter
-    elif boon_choice_index < 1:
-        boon_choice_index = 1
+    boon_choice_index = h_replay.choose("boon", boon_counter, "choose boon.", menu)
 
     boon_choice = boon_index[boon_choice_index]
     boon_choice["apply"](chosen_actor)
@@ -116,7 +118,39 @@ def apply_boon(party):
     h_encounter.report(f"{chosen_actor.name} gains boon: {boon_choice['name']}.")
 
 
+# Actor stats are the sum of these layers, each a {stat: amount} dict that
+# is replaced, never changed in place, so snapshots can share them. The sums
+# are cached as plain attributes (actor.skill...) and worked out again on
+# the first read after a layer changes. current_* values are what combat
+# spends and buffs; refresh() resets them to the stats. Enemies keep what
+# they rolled in the "rolled" layer, so roll_stats() can roll it again.
+STATS = ("stamina", "skill", "defense", "fortune", "power", "reduction", "insulation")
+STAT_LAYERS = ("base", "rolled", "archetype", "arms", "armor", "headgear", "boons", "buffs")
+
+# arms never changed anything else
+ARMS_STATS = ("skill", "defense", "power")
+
+
+def _stat_layer(source, stats=STATS):
+    layer = {}
+    for stat in stats:
+        amount = getattr(source, stat, 0)
+        if amount:
+            layer[stat] = amount
+    return layer
+
+
 class Actor:
+    __slots__ = (
+        "name", "description", "logic",
+        "current_stamina", "current_skill", "current_defense", "current_fortune",
+        "current_power", "current_reduction", "current_insulation",
+        "stamina", "skill", "defense", "fortune", "power", "reduction", "insulation",
+        "layers", "buffs", "_stats_clean",
+        "inventory", "damage_type", "arms_slot1", "arms_slot2", "armor", "headgear", "speed",
+        "archetype", "special_actions", "arms_actions", "_action_tables", "features", "boons",
+    )
+
     def __init__(self, name):
         self.name = name
         self.description = ""
@@ -130,13 +164,11 @@ class Actor:
         self.current_reduction = 0
         self.current_insulation = 0
 
-        self.stamina = 12
-        self.skill = 10
-        self.defense = 10
-        self.fortune = 10
-        self.power = 1
-        self.reduction = 0
-        self.insulation = 0
+        layers = dict.fromkeys(STAT_LAYERS, {})
+        layers["base"] = {"stamina": 12, "skill": 10, "defense": 10, "fortune": 10, "power": 1, "reduction": 0, "insulation": 0}
+        self.layers = layers
+        self.buffs = {}
+        self._stats_clean = False
 
         self.inventory = None
 
@@ -150,20 +182,144 @@ class Actor:
         self.archetype = None
         self.special_actions = {}
         self.arms_actions = {}
-        self.features = []
+        self._action_tables = {}
+        self.features = h_features.Features()
         self.boons = []
 
+    # (stat, low, high) for roll_stats(); enemies roll some of their stats
+    ROLLS = ()
+
+    def roll_stats(self, rng):
+        """Roll the ROLLS stats into the "rolled" layer, replacing an
+        earlier roll, and reset the current values."""
+        self.set_layer("rolled", {stat: rng.randint(low, high) for stat, low, high in self.ROLLS})
+        self.refresh()
+
+    def __getattr__(self, name):
+        # only reached for stats dropped by invalidate_stats
+        if name in STATS:
+            self._sum_layers()
+            return getattr(self, name)
+        raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+
+    def __setstate__(self, state):
+        # saves from before stat layers hold the summed stats, a plain
+        # feature list and no action tables
+        if isinstance(state, tuple):
+            state = state[1] or {}
+        if "layers" not in state:
+            state = dict(state)
+            layers = dict.fromkeys(STAT_LAYERS, {})
+            sources = (
+                ("archetype", state.get("archetype"), STATS),
+                ("arms", state.get("arms_slot1"), ARMS_STATS),
+                ("armor", state.get("armor"), STATS),
+                ("headgear", state.get("headgear"), STATS),
+            )
+            for layer, source, stats in sources:
+                if source is not None:
+                    layers[layer] = _stat_layer(source, stats)
+            layers["base"] = {
+                stat: state.pop(stat) - sum(layer.get(stat, 0) for layer in layers.values())
+                for stat in STATS
+            }
+            state["layers"] = layers
+            state["buffs"] = {}
+            state["_stats_clean"] = False
+        if isinstance(state.get("features"), list):
+            state["features"] = h_features.Features(state["features"])
+            # headgear did not grant its features back then
+            headgear = state.get("headgear")
+            if headgear is not None:
+                state["features"].update(headgear.features)
+        state.setdefault("_action_tables", {})
+        for name, value in state.items():
+            setattr(self, name, value)
+
+    def _sum_layers(self):
+        totals = dict.fromkeys(STATS, 0)
+        for layer in self.layers.values():
+            for stat, amount in layer.items():
+                totals[stat] += amount
+        for stat, amount in totals.items():
+            setattr(self, stat, amount)
+        self._stats_clean = True
+
+    def invalidate_stats(self):
+        """Drop the cached stats; call after replacing `layers` wholesale."""
+        if self._stats_clean:
+            self._stats_clean = False
+            for stat in STATS:
+                delattr(self, stat)
+
+    def spawn(self):
+        """A fresh combat instance of this actor, sharing nothing it can
+        change in place. Stats are not rolled again: the stat layers and
+        current values are taken over as they are."""
+        clone = object.__new__(type(self))
+        for name, value in zip(SPAWN_FIELDS, _get_spawn_fields(self)):
+            setattr(clone, name, value)
+        clone._stats_clean = False
+        clone.features = h_features.Features()
+        clone.features.setstate(self.features.getstate())
+        clone.boons = list(self.boons)
+        clone._action_tables = dict(self._action_tables)
+        return clone
+
+    def set_layer(self, layer, stats):
+        layers = dict(self.layers)
+        layers[layer] = stats
+        self.layers = layers
+        self.invalidate_stats()
+
+    def adjust_stat(self, stat, amount, layer="base"):
+        """Add `amount` to a stat in one layer; a stat that comes to 0 is
+        dropped from it, so a layer with nothing active is empty."""
+        stats = dict(self.layers[layer])
+        total = stats.get(stat, 0) + amount
+        if total:
+            stats[stat] = total
+        else:
+            stats.pop(stat, None)
+        self.set_layer(layer, stats)
+
+    def set_stat(self, stat, value):
+        """Make a stat come out at `value` by changing its base."""
+        self.adjust_stat(stat, value - getattr(self, stat))
+
+    def add_buff(self, key, **amounts):
+        """Timed change to stats (`defense=-2`) or current values
+        (`current_power=2`), undone by remove_buff(key). Replaces an older
+        buff under the same key."""
+        self.remove_buff(key)
+        buffs = dict(self.buffs)
+        buffs[key] = amounts
+        self.buffs = buffs
+        for stat, amount in amounts.items():
+            if stat in STATS:
+                self.adjust_stat(stat, amount, "buffs")
+            else:
+                setattr(self, stat, getattr(self, stat) + amount)
+
+    def remove_buff(self, key):
+        """Undo a buff, or what refresh() left of it."""
+        if key not in self.buffs:
+            return
+        buffs = dict(self.buffs)
+        amounts = buffs.pop(key)
+        self.buffs = buffs
+        for stat, amount in amounts.items():
+            if stat in STATS:
+                self.adjust_stat(stat, -amount, "buffs")
+            else:
+                setattr(self, stat, getattr(self, stat) - amount)
+
     def _express(self, message):
-        header = ("< " * 17).rstrip()
-        footer = ("> " * 17).rstrip()
-        print(f"{header}\n")
-        print(message)
-        print(f"\n{footer}")
-        input()
+        h_events.emit("bark", actor=self.name, text=message)
         return
 
-    def battlecry(self):
-        randomizer = random.randint(0, 9)
+    def battlecry(self, rng=random):
+        randomizer = rng.randint(0, 9)
         battlecry_message = [
             f"Aah!",
             f"Death to you fiend!",
@@ -181,8 +337,8 @@ class Actor:
         # no interactive pause
         return
 
-    def pain(self):
-        randomizer = random.randint(0, 3)
+    def pain(self, rng=random):
+        randomizer = rng.randint(0, 3)
         pain_message = [f"Aaaahh!", f"Curses!", f"Damn you!", f"Ooouff!"]
 
         self._express(f"{self.name}:\n{pain_message[randomizer]}")
@@ -190,9 +346,10 @@ class Actor:
         return
 
     def feeling(self, encounter_state):
-        chance = random.randint(0, 1)
+        rng = h_rng.events(encounter_state)
+        chance = rng.randint(0, 1)
         if chance == 1:
-            randomizer = random.randint(0, 3)
+            randomizer = rng.randint(0, 3)
             if self.current_stamina < self.stamina // 2 + 1:
                 feeling_message = [
                     f"{self.name} spits out blood.",
@@ -218,8 +375,8 @@ class Actor:
                 self._express(f"{self.name}:\n{feeling_message[randomizer]}")
             return
 
-    def death(self, damage_type="sharp"):
-        randomizer = random.randint(0, 3)
+    def death(self, damage_type="sharp", rng=random):
+        randomizer = rng.randint(0, 3)
         death_message = {
             "blunt": [
                 f"{self.name} is beaten to a bloody pulp.",
@@ -249,6 +406,14 @@ class Actor:
         h_encounter.report(f"{death_message[damage_type][randomizer]}")
 
     def refresh(self):
+        # current values start over, so buffs on them have nothing to undo
+        buffs = {}
+        for key, amounts in self.buffs.items():
+            kept = {stat: amount for stat, amount in amounts.items() if stat in STATS}
+            if kept:
+                buffs[key] = kept
+        self.buffs = buffs
+
         self.current_stamina = self.stamina
         self.current_skill = self.skill
         self.current_defense = self.defense
@@ -257,43 +422,48 @@ class Actor:
         self.current_reduction = self.reduction
         self.current_insulation = self.insulation
 
+    def action_table(self, party_menu=False):
+        """Base, special and arms actions merged into one ActionTable, kept
+        until the archetype or the weapon changes. The party menu lists the
+        actor's own actions first; everyone else merges from the base
+        actions up, which decides who wins a name clash."""
+        tables = self._action_tables
+        table = tables.get(party_menu)
+        # snapshot restores and plain assignments swap the dicts underneath
+        if table is None or table.special is not self.special_actions or table.arms is not self.arms_actions:
+            if party_menu:
+                merged = self.special_actions | self.arms_actions | h_actions.base_actions
+            else:
+                merged = h_actions.base_actions | self.special_actions | self.arms_actions
+            table = tables[party_menu] = h_actions.ActionTable(merged, self.special_actions, self.arms_actions)
+        return table
+
     def give_archetype(self, archetype):
-        # add archetype's specific stats to the actor
-        self.stamina += getattr(archetype, "stamina", 0)
-        self.skill += getattr(archetype, "skill", 0)
-        self.defense += getattr(archetype, "defense", 0)
-        self.power += getattr(archetype, "power", 0)
-        self.fortune += getattr(archetype, "fortune", 0)
-        self.reduction += getattr(archetype, "reduction", 0)
-        self.insulation += getattr(archetype, "insulation", 0)
+        # a second archetype stacks on the first, as it always has
+        for stat, amount in _stat_layer(archetype).items():
+            self.adjust_stat(stat, amount, "archetype")
         self.special_actions = dict(archetype.archetype_actions)
-        # ensure features is a list and extend
-        self.features += list(archetype.features)
+        self._action_tables = {}
+        self.features.update(archetype.features)
         self.archetype = archetype
 
     def equip_weapons(self, arms):
+        self._action_tables = {}
 
         if self.arms_slot1 == None:
-            self.skill += arms.skill
-            self.defense += arms.defense
-            self.power += arms.power
+            self.set_layer("arms", _stat_layer(arms, ARMS_STATS))
             self.damage_type = arms.damage_type
             self.arms_slot1 = arms
             self.speed = arms.speed
             self.arms_actions = arms.arms_actions
-            self.features += list(arms.features)
+            self.features.update(arms.features)
 
         else:
-            self.skill -= self.arms_slot1.skill
-            self.defense -= self.arms_slot1.defense
-            self.power -= self.arms_slot1.power
+            self.set_layer("arms", {})
             self.damage_type = "blunt"
             self.speed = "normal"
             self.arms_actions = {}
-            # remove features safely
-            for item in getattr(self.arms_slot1, "features", []):
-                if item in self.features:
-                    self.features.remove(item)
+            self.features.discard(getattr(self.arms_slot1, "features", []))
 
             self.arms_slot1 = None
             self.equip_weapons(arms)
@@ -301,25 +471,13 @@ class Actor:
     def wear_armor(self, armor):
 
         if self.armor == None:
-            self.skill += armor.skill
-            self.defense += armor.defense
-            self.fortune += armor.fortune
-            self.insulation += armor.insulation
-            self.reduction += armor.reduction
-            self.power += armor.power
+            self.set_layer("armor", _stat_layer(armor))
             self.armor = armor
-            self.features += list(getattr(armor, "features", []))
+            self.features.update(getattr(armor, "features", []))
 
         else:
-            self.skill -= self.armor.skill
-            self.defense -= self.armor.defense
-            self.fortune -= self.armor.fortune
-            self.reduction -= self.armor.reduction
-            self.insulation -= self.armor.insulation
-            self.power -= self.armor.power
-            for item in getattr(self.armor, "features", []):
-                if item in self.features:
-                    self.features.remove(item)
+            self.set_layer("armor", {})
+            self.features.discard(getattr(self.armor, "features", []))
             self.armor = None
 
             self.wear_armor(armor)
@@ -327,25 +485,14 @@ class Actor:
     def wear_headgear(self, headgear):
 
         if self.headgear == None:
-            self.skill += headgear.skill
-            self.defense += headgear.defense
-            self.fortune += headgear.fortune
-            self.insulation += headgear.insulation
-            self.reduction += headgear.reduction
-            self.power += headgear.power
+            self.set_layer("headgear", _stat_layer(headgear))
             self.headgear = headgear
+            self.features.update(getattr(headgear, "features", []))
 
         else:
-            self.skill -= self.headgear.skill
-            self.defense -= self.headgear.defense
-            self.fortune -= self.headgear.fortune
-            self.reduction -= self.headgear.reduction
-            self.insulation -= self.headgear.insulation
-            self.power -= self.headgear.power
+            self.set_layer("headgear", {})
 
-            for item in getattr(self.headgear, "features", []):
-                if item in self.features:
-                    self.features.remove(item)
+            self.features.discard(getattr(self.headgear, "features", []))
 
             self.headgear = None
 
@@ -360,23 +507,27 @@ class Actor:
         self.arms_slot2 = reserve
 
 
+# What spawn() copies by reference: plain values, and the layer, buff and
+# action dicts, which actors replace but never change in place. Summed stats
+# are left to be worked out again.
+SPAWN_FIELDS = tuple(
+    name for name in Actor.__slots__
+    if name not in STATS and name not in ("_stats_clean", "features", "boons", "_action_tables")
+)
+_get_spawn_fields = operator.attrgetter(*SPAWN_FIELDS)
+
+
 class Minion(Actor):
-    def __init__(self, name):
+    __slots__ = ()
+    ROLLS = (("stamina", -1, 3), ("skill", -1, 3), ("defense", -1, 3), ("fortune", -1, 3), ("power", -1, 3))
+
+    def __init__(self, name, rng=None):
         super().__init__(name)
-        self.stamina += random.randint(-1, 3)
-        self.skill += random.randint(-1, 3)
-        self.defense += random.randint(-1, 3)
-        self.fortune += random.randint(-1, 3)
-        self.power += random.randint(-1, 3)
-        self.current_stamina = self.stamina
-        self.current_skill = self.skill
-        self.current_defense = self.defense
-        self.current_fortune = self.fortune
-        self.current_power = self.power
+        self.roll_stats(rng or h_rng.content_stream())
 
-    def battlecry(self):
+    def battlecry(self, rng=random):
         # Format matches Actor.battlecry: header, name, messages, footer
-        randomizer = random.randint(0, 7)
+        randomizer = rng.randint(0, 7)
         messages = [
             f"Aah!",
             f"Death to you fiend!",
@@ -394,26 +545,20 @@ class Minion(Actor):
 
 
 class Champion(Actor):
-    def __init__(self, name):
-        super().__init__(name)
-        self.stamina += 8
-        self.skill += 4
-        self.defense += 4
-        self.fortune += 2
-        self.power += 2
-        self.stamina += random.randint(3, 9)
-        self.skill += random.randint(0, 4)
-        self.defense += random.randint(0, 4)
-        self.fortune += random.randint(0, 4)
-        self.power += random.randint(0, 2)
-        self.current_stamina = self.stamina
-        self.current_skill = self.skill
-        self.current_defense = self.defense
-        self.current_fortune = self.fortune
-        self.current_power = self.power
+    __slots__ = ()
+    ROLLS = (("stamina", 3, 9), ("skill", 0, 4), ("defense", 0, 4), ("fortune", 0, 4), ("power", 0, 2))
 
-    def battlecry(self):
-        randomizer = random.randint(0, 7)
+    def __init__(self, name, rng=None):
+        super().__init__(name)
+        self.adjust_stat("stamina", 8)
+        self.adjust_stat("skill", 4)
+        self.adjust_stat("defense", 4)
+        self.adjust_stat("fortune", 2)
+        self.adjust_stat("power", 2)
+        self.roll_stats(rng or h_rng.content_stream())
+
+    def battlecry(self, rng=random):
+        randomizer = rng.randint(0, 7)
         threats = [
             "Stand down, or be broken.",
             "Your line ends here.",
@@ -429,24 +574,18 @@ class Champion(Actor):
 
 
 class Master(Actor):
-    def __init__(self, name):
+    __slots__ = ()
+    ROLLS = (("stamina", -3, 3), ("skill", -3, 3), ("defense", -3, 3), ("fortune", -3, 3), ("power", -3, 3))
+
+    def __init__(self, name, rng=None):
         super().__init__(name)
-        self.stamina += 6
-        self.skill += 3
-        self.stamina += random.randint(-3, 3)
-        self.skill += random.randint(-3, 3)
-        self.defense += random.randint(-3, 3)
-        self.fortune += random.randint(-3, 3)
-        self.power += random.randint(-3, 3)
-        self.current_stamina = self.stamina
-        self.current_skill = self.skill
-        self.current_defense = self.defense
-        self.current_fortune = self.fortune
-        self.current_power = self.power
+        self.adjust_stat("stamina", 6)
+        self.adjust_stat("skill", 3)
+        self.roll_stats(rng or h_rng.content_stream())
 
-    def battlecry(self):
+    def battlecry(self, rng=random):
         # Imposing, threatening multi-line battlecry for Master actors
-        randomizer = random.randint(0, 7)
+        randomizer = rng.randint(0, 7)
         threats = [
             "Fall now; I will crush you.",
             "I will break every bone you own.",
@@ -462,11 +601,13 @@ class Master(Actor):
 
 
 class Rowdy(Actor):
+    __slots__ = ()
+
     def __init__(self, name):
         super().__init__(name)
 
-    def battlecry(self):
-        randomizer = random.randint(0, 7)
+    def battlecry(self, rng=random):
+        randomizer = rng.randint(0, 7)
         messages = [
             "Oi! Let's make it loud!",
             "Come on then!",
@@ -480,16 +621,17 @@ class Rowdy(Actor):
         self._express(f"{self.name}:\n{messages[randomizer]}")
         return
 
-    def pain(self):
-        randomizer = random.randint(0, 3)
+    def pain(self, rng=random):
+        randomizer = rng.randint(0, 3)
         messages = ["Oof!", "That all?", "Oi!", "Right in the ribs!"]
         self._express(f"{self.name}:\n{messages[randomizer]}")
         return
 
     def feeling(self, encounter_state):
-        chance = random.randint(0, 1)
+        rng = h_rng.events(encounter_state)
+        chance = rng.randint(0, 1)
         if chance == 1:
-            randomizer = random.randint(0, 3)
+            randomizer = rng.randint(0, 3)
             if self.current_stamina < self.stamina // 2 + 1:
                 messages = [
                     f"{self.name} wipes blood from their mouth and laughs.",
@@ -509,11 +651,13 @@ class Rowdy(Actor):
 
 
 class Righteous(Actor):
+    __slots__ = ()
+
     def __init__(self, name):
         super().__init__(name)
 
-    def battlecry(self):
-        randomizer = random.randint(0, 7)
+    def battlecry(self, rng=random):
+        randomizer = rng.randint(0, 7)
         messages = [
             "Justice guides my hand.",
             "By oath and honor!",
@@ -527,16 +671,17 @@ class Righteous(Actor):
         self._express(f"{self.name}:\n{messages[randomizer]}")
         return
 
-    def pain(self):
-        randomizer = random.randint(0, 3)
+    def pain(self, rng=random):
+        randomizer = rng.randint(0, 3)
         messages = ["Faith endures.", "My resolve holds.", "Justice demands more.", "I will not falter."]
         self._express(f"{self.name}:\n{messages[randomizer]}")
         return
 
     def feeling(self, encounter_state):
-        chance = random.randint(0, 1)
+        rng = h_rng.events(encounter_state)
+        chance = rng.randint(0, 1)
         if chance == 1:
-            randomizer = random.randint(0, 3)
+            randomizer = rng.randint(0, 3)
             if self.current_stamina < self.stamina // 2 + 1:
                 messages = [
                     f"{self.name} whispers a vow and steadies.",
@@ -556,11 +701,13 @@ class Righteous(Actor):
 
 
 class Confident(Actor):
+    __slots__ = ()
+
     def __init__(self, name):
         super().__init__(name)
 
-    def battlecry(self):
-        randomizer = random.randint(0, 7)
+    def battlecry(self, rng=random):
+        randomizer = rng.randint(0, 7)
         messages = [
             "You can't stop me.",
             "Watch and learn.",
@@ -574,16 +721,17 @@ class Confident(Actor):
         self._express(f"{self.name}:\n{messages[randomizer]}")
         return
 
-    def pain(self):
-        randomizer = random.randint(0, 3)
+    def pain(self, rng=random):
+        randomizer = rng.randint(0, 3)
         messages = ["Tch.", "Is that all?", "Hardly.", "You'll need more."]
         self._express(f"{self.name}:\n{messages[randomizer]}")
         return
 
     def feeling(self, encounter_state):
-        chance = random.randint(0, 1)
+        rng = h_rng.events(encounter_state)
+        chance = rng.randint(0, 1)
         if chance == 1:
-            randomizer = random.randint(0, 3)
+            randomizer = rng.randint(0, 3)
             if self.current_stamina < self.stamina // 2 + 1:
                 messages = [
                     f"{self.name} smirks despite the blood.",
@@ -603,11 +751,13 @@ class Confident(Actor):
 
 
 class Anxious(Actor):
+    __slots__ = ()
+
     def __init__(self, name):
         super().__init__(name)
 
-    def battlecry(self):
-        randomizer = random.randint(0, 7)
+    def battlecry(self, rng=random):
+        randomizer = rng.randint(0, 7)
         messages = [
             "I can do this...",
             "Stay calm...",
@@ -621,16 +771,17 @@ class Anxious(Actor):
         self._express(f"{self.name}:\n{messages[randomizer]}")
         return
 
-    def pain(self):
-        randomizer = random.randint(0, 3)
+    def pain(self, rng=random):
+        randomizer = rng.randint(0, 3)
         messages = ["Ah!", "Ow!", "Too close!", "No, no, no..."]
         self._express(f"{self.name}:\n{messages[randomizer]}")
         return
 
     def feeling(self, encounter_state):
-        chance = random.randint(0, 1)
+        rng = h_rng.events(encounter_state)
+        chance = rng.randint(0, 1)
         if chance == 1:
-            randomizer = random.randint(0, 3)
+            randomizer = rng.randint(0, 3)
             if self.current_stamina < self.stamina // 2 + 1:
                 messages = [
                     f"{self.name} swallows hard, hands trembling.",
@@ -650,11 +801,13 @@ class Anxious(Actor):
 
 
 class Callous(Actor):
+    __slots__ = ()
+
     def __init__(self, name):
         super().__init__(name)
 
-    def battlecry(self):
-        randomizer = random.randint(0, 7)
+    def battlecry(self, rng=random):
+        randomizer = rng.randint(0, 7)
         messages = [
             "Spare me the pleas.",
             "I don't feel a thing.",
@@ -668,16 +821,17 @@ class Callous(Actor):
         self._express(f"{self.name}:\n{messages[randomizer]}")
         return
 
-    def pain(self):
-        randomizer = random.randint(0, 3)
+    def pain(self, rng=random):
+        randomizer = rng.randint(0, 3)
         messages = ["Irrelevant.", "Noted.", "Still standing.", "You done?"]
         self._express(f"{self.name}:\n{messages[randomizer]}")
         return
 
     def feeling(self, encounter_state):
-        chance = random.randint(0, 1)
+        rng = h_rng.events(encounter_state)
+        chance = rng.randint(0, 1)
         if chance == 1:
-            randomizer = random.randint(0, 3)
+            randomizer = rng.randint(0, 3)
             if self.current_stamina < self.stamina // 2 + 1:
                 messages = [
                     f"{self.name} stares through the pain without flinching.",
@@ -697,11 +851,13 @@ class Callous(Actor):
 
 
 class Bully(Actor):
+    __slots__ = ()
+
     def __init__(self, name):
         super().__init__(name)
 
-    def battlecry(self):
-        randomizer = random.randint(0, 7)
+    def battlecry(self, rng=random):
+        randomizer = rng.randint(0, 7)
         messages = [
             "Back down!",
             "You're outmatched.",
@@ -715,16 +871,17 @@ class Bully(Actor):
         self._express(f"{self.name}:\n{messages[randomizer]}")
         return
 
-    def pain(self):
-        randomizer = random.randint(0, 3)
+    def pain(self, rng=random):
+        randomizer = rng.randint(0, 3)
         messages = ["Gah!", "You'll pay for that!", "Cheap shot!", "I'll break you!"]
         self._express(f"{self.name}:\n{messages[randomizer]}")
         return
 
     def feeling(self, encounter_state):
-        chance = random.randint(0, 1)
+        rng = h_rng.events(encounter_state)
+        chance = rng.randint(0, 1)
         if chance == 1:
-            randomizer = random.randint(0, 3)
+            randomizer = rng.randint(0, 3)
             if self.current_stamina < self.stamina // 2 + 1:
                 messages = [
                     f"{self.name} snarls, anger sharpening their gaze.",
@@ -744,11 +901,13 @@ class Bully(Actor):
 
 
 class Libertine(Actor):
+    __slots__ = ()
+
     def __init__(self, name):
         super().__init__(name)
 
-    def battlecry(self):
-        randomizer = random.randint(0, 7)
+    def battlecry(self, rng=random):
+        randomizer = rng.randint(0, 7)
         messages = [
             "Let the night decide!",
             "No chains, no masters!",
@@ -762,16 +921,17 @@ class Libertine(Actor):
         self._express(f"{self.name}:\n{messages[randomizer]}")
         return
 
-    def pain(self):
-        randomizer = random.randint(0, 3)
+    def pain(self, rng=random):
+        randomizer = rng.randint(0, 3)
         messages = ["Ah! Spicy.", "A little sting.", "Worth it.", "What a rush!"]
         self._express(f"{self.name}:\n{messages[randomizer]}")
         return
 
     def feeling(self, encounter_state):
-        chance = random.randint(0, 1)
+        rng = h_rng.events(encounter_state)
+        chance = rng.randint(0, 1)
         if chance == 1:
-            randomizer = random.randint(0, 3)
+            randomizer = rng.randint(0, 3)
             if self.current_stamina < self.stamina // 2 + 1:
                 messages = [
                     f"{self.name} laughs breathlessly, blood on their lips.",
@@ -791,11 +951,13 @@ class Libertine(Actor):
 
 
 class Esoterist(Actor):
+    __slots__ = ()
+
     def __init__(self, name):
         super().__init__(name)
 
-    def battlecry(self):
-        randomizer = random.randint(0, 7)
+    def battlecry(self, rng=random):
+        randomizer = rng.randint(0, 7)
         messages = [
             "The hidden rites awaken.",
             "Secrets answer my call.",
@@ -809,16 +971,17 @@ class Esoterist(Actor):
         self._express(f"{self.name}:\n{messages[randomizer]}")
         return
 
-    def pain(self):
-        randomizer = random.randint(0, 3)
+    def pain(self, rng=random):
+        randomizer = rng.randint(0, 3)
         messages = ["A sign.", "The price is known.", "It stings.", "The rite endures."]
         self._express(f"{self.name}:\n{messages[randomizer]}")
         return
 
     def feeling(self, encounter_state):
-        chance = random.randint(0, 1)
+        rng = h_rng.events(encounter_state)
+        chance = rng.randint(0, 1)
         if chance == 1:
-            randomizer = random.randint(0, 3)
+            randomizer = rng.randint(0, 3)
             if self.current_stamina < self.stamina // 2 + 1:
                 messages = [
                     f"{self.name} murmurs a ward under their breath.",
@@ -838,11 +1001,13 @@ class Esoterist(Actor):
 
 
 class Downtrodden(Actor):
+    __slots__ = ()
+
     def __init__(self, name):
         super().__init__(name)
 
-    def battlecry(self):
-        randomizer = random.randint(0, 7)
+    def battlecry(self, rng=random):
+        randomizer = rng.randint(0, 7)
         messages = [
             "Just let it end.",
             "Nothing to lose.",
@@ -856,16 +1021,17 @@ class Downtrodden(Actor):
         self._express(f"{self.name}:\n{messages[randomizer]}")
         return
 
-    def pain(self):
-        randomizer = random.randint(0, 3)
+    def pain(self, rng=random):
+        randomizer = rng.randint(0, 3)
         messages = ["Figures.", "Of course.", "I'm used to it.", "Still here."]
         self._express(f"{self.name}:\n{messages[randomizer]}")
         return
 
     def feeling(self, encounter_state):
-        chance = random.randint(0, 1)
+        rng = h_rng.events(encounter_state)
+        chance = rng.randint(0, 1)
         if chance == 1:
-            randomizer = random.randint(0, 3)
+            randomizer = rng.randint(0, 3)
             if self.current_stamina < self.stamina // 2 + 1:
                 messages = [
                     f"{self.name} sags for a moment, then pushes on.",
@@ -899,6 +1065,7 @@ def save_party_to_file(party, filename):
     if not filename.endswith(".pkl"):
         filename += ".pkl"
     path = os.path.join(_save_dir(), filename)
+    import pickle
     with open(path, "wb") as handle:
         pickle.dump(party, handle)
     h_encounter.report(f"Party saved to {filename}.")
@@ -910,6 +1077,7 @@ def load_party_from_file(filename):
     if not filename.endswith(".pkl"):
         filename += ".pkl"
     path = os.path.join(_save_dir(), filename)
+    import pickle
     try:
         with open(path, "rb") as handle:
             party = pickle.load(handle)
@@ -933,6 +1101,7 @@ def _ensure_shared_inventory(party):
 
 
 def create_party():
+    content = _content()
     h_encounter.report("Create a new party.")
     party = []
 
@@ -953,11 +1122,11 @@ def create_party():
     if answer.lower() == "y":
         # Pre-made character selection
         premade_characters = {
-            "Valeria": valeria,
-            "Sonja": sonja,
-            "Bosh": bosh,
-            "Atlantes": atlantes,
-            "Sera": sera,
+            "Valeria": content.valeria,
+            "Sonja": content.sonja,
+            "Bosh": content.bosh,
+            "Atlantes": content.atlantes,
+            "Sera": content.sera,
         }
 
         full_premade = input("Use the full pre-made party? (y/n)")
@@ -1033,11 +1202,11 @@ def create_party():
             use_premade = input("Use a pre-made character for the next slot? (y/n)")
             if use_premade.lower() == "y":
                 premade_characters = {
-                    "Valeria": valeria,
-                    "Sonja": sonja,
-                    "Bosh": bosh,
-                    "Atlantes": atlantes,
-                    "Sera": sera,
+                    "Valeria": content.valeria,
+                    "Sonja": content.sonja,
+                    "Bosh": content.bosh,
+                    "Atlantes": content.atlantes,
+                    "Sera": content.sera,
                 }
                 available_characters = {k: v for k, v in premade_characters.items() if v not in party}
 
@@ -1165,6 +1334,7 @@ def create_party():
 
 
 def create_actor():
+    content = _content()
     confirmed = False
     
     while not confirmed:
@@ -1210,23 +1380,23 @@ def create_actor():
         actor = actor_class(name)
 
         h_encounter.report("Choose archetype:")
-        archetype_choice = h_actions.choose_options(archetype_list)
+        archetype_choice = h_actions.choose_options(content.archetype_list)
         actor.give_archetype(archetype_choice)
 
         h_encounter.report("Choose armor:")
-        armor_choice = h_actions.choose_options(armor_list)
+        armor_choice = h_actions.choose_options(content.armor_list)
         actor.wear_armor(armor_choice)
 
         h_encounter.report("Choose headgear:")
-        headgear_choice = h_actions.choose_options(headgear_list)
+        headgear_choice = h_actions.choose_options(content.headgear_list)
         actor.wear_headgear(headgear_choice)
 
         h_encounter.report("Choose main weapon:")
-        arms_choice = h_actions.choose_options(arms_list)
+        arms_choice = h_actions.choose_options(content.arms_list)
         actor.equip_weapons(arms_choice)
 
         h_encounter.report("Choose secondary weapon:")
-        arms_choice = h_actions.choose_options(arms_list)
+        arms_choice = h_actions.choose_options(content.arms_list)
         actor.arms_slot2 = arms_choice
 
         actor.refresh()
@@ -1270,6 +1440,9 @@ def create_actor():
 
 
 class Arms:
+    __slots__ = ("name", "description", "skill", "defense", "power", "fortune", "damage_type", "speed", "arms_actions", "features")
+    __setstate__ = _set_slots
+
     def __init__(self, name, description):
         self.name = name
         self.description = description
@@ -1283,99 +1456,15 @@ class Arms:
         self.features = []
 
 
-shield_and_sword = Arms(
-    "shield and sword", "slashing, skill +2, defense +2, stab, resist pinning."
-)
-shield_and_sword.skill += 1
-shield_and_sword.defense += 2
-shield_and_sword.damage_type = "sharp"
-shield_and_sword.arms_actions = {"stab": h_actions.stab}
-shield_and_sword.features = ["resist pin"]
-
-bearded_axe = Arms("bearded axe", "slashing, power +3, defense -2, charge, slow.")
-bearded_axe.power += 3
-bearded_axe.defense -= 2
-bearded_axe.speed = "slow"
-bearded_axe.damage_type = "sharp"
-bearded_axe.arms_actions = {"smash": h_actions.smash}
-bearded_axe.features = ["charge"]
-
-shield_and_spear = Arms(
-    "shield and spear", "piercing, defense +2, charge, reach, resist pinning."
-)
-shield_and_spear.defense += 2
-shield_and_spear.damage_type = "pierce"
-shield_and_spear.features = ["resist pin", "reach", "charge"]
-
-dagger_and_whip = Arms("dagger and whip", "slashing, skill +2, stab, reach, fast.")
-dagger_and_whip.skill += 2
-dagger_and_whip.speed = "fast"
-dagger_and_whip.damage_type = "sharp"
-dagger_and_whip.arms_actions = {"stab": h_actions.stab}
-dagger_and_whip.features = ["reach"]
-
-shield_and_club = Arms(
-    "shield and club", "blunt, power +1, defense +2, resist pinning."
-)
-shield_and_club.power += 1
-shield_and_club.defense += 2
-shield_and_club.damage_type = "blunt"
-shield_and_club.arms_actions = {"smash": h_actions.smash}
-shield_and_club.features = ["resist pin"]
-
-paired_swords = Arms("paired swords", "slashing, skill +1, power +1, stab, fast")
-paired_swords.skill += 1
-paired_swords.power += 1
-paired_swords.speed = "fast"
-paired_swords.damage_type = "sharp"
-paired_swords.arms_actions = {"stab": h_actions.stab}
-
-polearm = Arms("polearm", "piercing, power +2, charge, reach, slow.")
-polearm.power += 2
-polearm.speed = "slow"
-polearm.damage_type = "pierce"
-polearm.arms_actions = {"smash": h_actions.smash}
-polearm.features = ["charge", "reach"]
-
-bastard_sword = Arms("bastard sword", "slashing, power +2, stab.")
-bastard_sword.power += 2
-bastard_sword.damage_type = "sharp"
-bastard_sword.arms_actions = {"stab": h_actions.stab}
-
-scepter = Arms("scepter", "blunt, power +1, smash.")
-scepter.power += 1
-scepter.fortune += 2
-scepter.damage_type = "blunt"
-scepter.arms_actions = {"smash": h_actions.smash}
-
-flail = Arms("flail", "blunt, power +2, skill +2, defense -2, charge, smash.")
-flail.power += 2
-flail.skill += 2
-flail.defense -= 2
-flail.speed = "slow"
-flail.damage_type = "blunt"
-flail.arms_actions = {"smash": h_actions.smash}
-flail.features = ["charge"]
-
-arms_list = {
-    "shield and sword": shield_and_sword,
-    "shield and club": shield_and_club,
-    "bearded axe": bearded_axe,
-    "shield and spear": shield_and_spear,
-    "dagger and whip": dagger_and_whip,
-    "paired swords": paired_swords,
-    "polearm": polearm,
-    "bastard sword": bastard_sword,
-    "scepter": scepter,
-    "flail": flail,
-    }
-
 # ------------------------------------------------------------------
 # armor
 # ------------------------------------------------------------------
 
 
 class Armor:
+    __slots__ = ("name", "description", "skill", "defense", "power", "fortune", "reduction", "insulation", "features")
+    __setstate__ = _set_slots
+
     def __init__(self, name, description):
         self.name = name
         self.description = description
@@ -1388,54 +1477,15 @@ class Armor:
         self.features = []
 
 
-bare = Armor("bare", "defense +2.")
-bare.defense += 2
-
-war_paint = Armor("war paint", "defense -2, juggernaut.")
-war_paint.features = ["juggernaut"]
-war_paint.defense -= 2
-
-cape = Armor("cape", "fortune +1, insulation +1.")
-cape.insulation += 1
-cape.fortune += 1
-
-light_mail = Armor("light mail", "damage reduction +1")
-light_mail.reduction += 1
-
-bone_mail = Armor("bone mail", "damage reduction +1, fortune +1, defense -1")
-bone_mail.reduction += 1
-bone_mail.fortune += 1
-bone_mail.defense -= 1
-
-heavy_mail = Armor("heavy mail", "damage reduction +2, -2 insulation")
-heavy_mail.reduction += 2
-heavy_mail.insulation -= 2
-
-suit_of_plate = Armor("suit of plate", "damage reduction +3, -2 skill, -2 insulation")
-suit_of_plate.reduction += 3
-suit_of_plate.skill -= 2
-suit_of_plate.insulation -= 2
-
-brigandine = Armor("brigandine", "defense +1, damage reduction +1")
-brigandine.defense += 1
-brigandine.reduction += 1
-
-armor_list = {
-    "bare": bare,
-    "war paint": war_paint,
-    "cape": cape,
-    "light mail": light_mail,
-    "bone mail": bone_mail,
-    "heavy mail": heavy_mail,
-    "suit of plate": suit_of_plate,
-}
-
 # ------------------------------------------------------------------
 # headgear
 # ------------------------------------------------------------------
 
 
 class Headgear:
+    __slots__ = ("name", "description", "skill", "defense", "power", "fortune", "reduction", "insulation", "features")
+    __setstate__ = _set_slots
+
     def __init__(self, name, description):
         self.name = name
         self.description = description
@@ -1448,55 +1498,26 @@ class Headgear:
         self.features = []
 
 
-winged_helm = Headgear("winged helm", "defense +1, insulation -1.")
-winged_helm.defense += 1
-winged_helm.insulation -= 1
-
-moon_circlet = Headgear("moon circlet", "fortune +1, defense -1.")
-moon_circlet.fortune += 1
-moon_circlet.defense -= 1
-
-stag_helm = Headgear("stag helm", "damage reduction +1, skill -2.")
-stag_helm.reduction += 1
-stag_helm.skill -= 2
-
-black_hood = Headgear("black hood", "skill +1, fortune -1.")
-black_hood.skill += 1
-black_hood.fortune -= 1
-
-ritual_mask = Headgear("ritual mask", "mystic aim.")
-ritual_mask.features = ["mystic aim"]
-ritual_mask.insulation -= 1
-
-flaming_topknot = Headgear("flaming topknot", "resist pinning, defense -1.")
-flaming_topknot.features = ["resist pin"]
-flaming_topknot.defense -= 1
-
-headgear_list = {
-    "winged helm": winged_helm,
-    "stag helm": stag_helm,
-    "moon circlet": moon_circlet,
-    "black hood": black_hood,
-    "flaming topknot": flaming_topknot,
-    "ritual mask": ritual_mask,
-}
-
 # ------------------------------------------------------------------
 # Consumables
 # ------------------------------------------------------------------
 
 
 class Elixir(Consumable):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("elixir", "restores 7-12 stamina")
     
     def use(self, actor, encounter_state):
-        stamina_restore = random.randint(7, 12)
+        stamina_restore = h_rng.combat(encounter_state).randint(7, 12)
         actor.current_stamina = min(actor.current_stamina + stamina_restore, actor.stamina)
         h_encounter.report(f"{actor.name} drinks the elixir and restores {stamina_restore} stamina.")
 
 
 class FireBomb(Consumable):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("fire bomb", "deals 7-12 hellfire damage (always hits)")
     
@@ -1504,46 +1525,54 @@ class FireBomb(Consumable):
         # Select a target
         available_targets = h_actions.filter_targets(actor, encounter_state)
         
-        if actor.logic != None:
-            target = h_actions.logic_target(available_targets)
+        if h_actions.actor_logic(actor, encounter_state) != None:
+            target = h_actions.logic_target(available_targets, actor, encounter_state)
         else:
-            target = h_actions.choose_target(available_targets)
+            target = h_actions.choose_target(available_targets, encounter_state)
         
         if not target:
             h_encounter.report(f"No target available for {actor.name}'s fire bomb.")
             return
         
-        damage_dealt = random.randint(7, 12)
+        damage_dealt = h_rng.combat(encounter_state).randint(7, 12)
         h_encounter.report(f"{actor.name}'s fire bomb explodes on {target.name}!")
         h_actions.damage(target, encounter_state, damage_dealt, target.current_insulation, "hellfire")
 
 
 class DevilsDust(Consumable):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("devil's dust", "increases power by 2 and speed to fast for 8 turns")
     
     def use(self, actor, encounter_state):
-        actor.current_power += 2
-        actor.speed = "fast"
+        h_effects.add_effect(encounter_state, "devil's dust", actor, 8, power_bonus=2)
         h_encounter.report(f"{actor.name} inhales the devil's dust and feels more powerful!")
         h_encounter.report(f"{actor.name} gains +2 power and fast speed for 8 turns.")
-        
-        # Track the buff duration
-        if "devils_dust_buffs" not in encounter_state:
-            encounter_state["devils_dust_buffs"] = {}
-        
-        encounter_state["devils_dust_buffs"][actor] = {
-            "duration": 8,
-            "power_bonus": 2
-        }
+
+
+def apply_devils_dust(actor, encounter_state, effect):
+    actor.add_buff("devil's dust", current_power=effect["power_bonus"])
+    # the speed it had before, put back when the dust wears off
+    effect["speed"] = encounter_state["actors"][actor]["speed"]
+    h_actions.set_speed(actor, encounter_state, "fast")
+
+def revert_devils_dust(actor, encounter_state, effect):
+    actor.remove_buff("devil's dust")
+    if not encounter_state["actors"][actor]["enraged"]:
+        h_actions.set_speed(actor, encounter_state, effect["speed"])
+
+h_effects.register_effect("devil's dust", apply_devils_dust, revert_devils_dust, "{}'s devil's dust effect wears off.")
 
 
 class SaintsFlesh(Consumable):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("saint's flesh", "restores 3-6 fortune")
 
     def use(self, actor, encounter_state):
-        fortune_restore = random.randint(3, 6)
+        fortune_restore = h_rng.combat(encounter_state).randint(3, 6)
         actor.current_fortune = min(actor.current_fortune + fortune_restore, actor.fortune)
         h_encounter.report(
             f"{actor.name} consumes the saint's flesh and restores {fortune_restore} fortune."
@@ -1551,6 +1580,8 @@ class SaintsFlesh(Consumable):
 
 
 class UnicornDust(Consumable):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("unicorn dust", "grants +2 reduction and +1 power for 3 turns")
 
@@ -1558,25 +1589,16 @@ class UnicornDust(Consumable):
         reduction_bonus = 2
         power_bonus = 1
 
-        actor.current_reduction += reduction_bonus
-        actor.current_power += power_bonus
-        if "juggernaut" not in actor.features:
-            actor.features.append("juggernaut")
+        # shares the stone skin effect, so the two do not stack
+        h_effects.add_effect(
+            encounter_state, "stone skin", actor, 3,
+            reduction_bonus=reduction_bonus, power_bonus=power_bonus, juggernaut=True,
+        )
 
         h_encounter.report(
             f"{actor.name}'s skin hardens. +{reduction_bonus} reduction, +{power_bonus} power, and juggernaut for 3 turns."
         )
 
-        if "stone_skin_buffs" not in encounter_state:
-            encounter_state["stone_skin_buffs"] = {}
-
-        encounter_state["stone_skin_buffs"][actor] = {
-            "duration": 3,
-            "reduction_bonus": reduction_bonus,
-            "power_bonus": power_bonus,
-            "juggernaut": True,
-        }
-
 
 # Create consumable instances
 Elixir = Elixir()
@@ -1591,6 +1613,9 @@ UnicornDust = UnicornDust()
 
 
 class Archetype:
+    __slots__ = ("name", "description", "stamina", "skill", "defense", "power", "fortune", "reduction", "insulation", "archetype_actions", "features")
+    __setstate__ = _set_slots
+
     def __init__(self, name, description):
         self.name = name
         self.description = description
@@ -1605,249 +1630,33 @@ class Archetype:
         self.features = []
 
 
-gendarme = Archetype(
-    "gendarme",
-    "stamina +6, skill +4, defense + 3, riposte, quick draw",
-)
-gendarme.stamina += 6
-gendarme.skill += 4
-gendarme.defense += 3
-gendarme.features = ["riposte", "quick draw"]
-
-herald = Archetype(
-    "herald",
-    "stamina +6, skill +2, defense +2, rally, decisive order, deliverance",
-)
-herald.stamina += 6
-herald.skill += 2
-herald.defense += 2
-herald.archetype_actions = {
-    "rally": h_actions.rally,
-    "decisive order": h_actions.decisive_order,
-    "deliverance": h_actions.deliverance,
-}
-herald.features = []
-
-furioso = Archetype(
-    "furioso", "stamina +12, skill +2, defense + 2, hack and slash, savagery"
-)
-furioso.stamina += 12
-furioso.skill += 2
-furioso.defense += 2
-furioso.archetype_actions = {"hack and slash": h_actions.hack_and_slash}
-furioso.features = ["savagery"]
-
-
-# New archetype: heathen
-# As `gendarme` but with 3 fewer stamina and no riposte; grants
-# special actions `prowl` and `dirty trick`.
-heathen = Archetype("heathen", "stamina +3, skill +4, defense +4, prowl, dirty trick")
-heathen.stamina += 3
-heathen.skill += 4
-heathen.defense += 4
-heathen.archetype_actions = {"prowl": h_actions.prowl, "dirty trick": h_actions.dirty_trick}
-heathen.features = []
-
-# New archetype: diabolist
-# Grants +3 fortune and the special action 'diablerie'.
-diabolist = Archetype("diabolist", "fortune +3, diablerie")
-diabolist.fortune += 3
-diabolist.archetype_actions = {"diablerie": h_actions.diablerie}
-diabolist.features = []
-
-archetype_list = {
-    "gendarme": gendarme,
-    "herald": herald,
-    "furioso": furioso,
-    "heathen": heathen,
-    "diabolist": diabolist,
-}
-
 # ------------------------------------------------------------------
-# Enemies
+# Content
 # ------------------------------------------------------------------
+# The equipment, archetype, enemy and pre-made actor instances live in
+# h_content, built the first time one of them is looked up here.
 
 
-minion_disruptive = Minion("Jinx")
-minion_disruptive.logic = "disruptive"
-minion_disruptive.equip_weapons(dagger_and_whip)
-minion_disruptive.description = "a wiry cutpurse with a hooked whip and darting eyes"
-minion_aggressive = Minion("Gnash")
-minion_aggressive.logic = "aggressive"
-minion_aggressive.equip_weapons(flail)
-minion_aggressive.wear_armor(brigandine)
-minion_aggressive.description = "a hulking brute in brigandine, swinging a spiked flail"
-minion_defensive = Minion("Bulwark")
-minion_defensive.logic = "defensive"
-minion_defensive.equip_weapons(shield_and_spear)
-minion_defensive.wear_armor(heavy_mail)
-minion_defensive.description = "a steady guard in heavy mail, braced behind a spear and battered shield"
-minion_reactive = Minion("Skulk")
-minion_reactive.logic = "reactive"
-minion_reactive.equip_weapons(scepter)
-minion_reactive.wear_armor(bone_mail)
-minion_reactive.description = "a lean scrapper in bone mail, circling with a knotted scepter"
-
-minion_disruptive_2 = Minion("Vex")
-minion_disruptive_2.logic = "disruptive"
-minion_disruptive_2.equip_weapons(dagger_and_whip)
-minion_disruptive_2.wear_armor(light_mail)
-minion_disruptive_2.description = "a twitchy raider in light mail, with a barbed whip and a jagged blade"
-
-minion_aggressive_2 = Minion("Raze")
-minion_aggressive_2.logic = "aggressive"
-minion_aggressive_2.equip_weapons(bastard_sword)
-minion_aggressive_2.description = "a broad-shouldered marauder swinging a heavy bastard sword"
-
-minion_defensive_2 = Minion("Ward")
-minion_defensive_2.logic = "defensive"
-minion_defensive_2.equip_weapons(shield_and_sword)
-minion_defensive_2.wear_armor(brigandine)
-minion_defensive_2.description = "a grim sentinel in brigandine behind a battered shield and short blade"
-
-minion_reactive_2 = Minion("Mire")
-minion_reactive_2.logic = "reactive"
-minion_reactive_2.equip_weapons(shield_and_spear)
-minion_reactive_2.wear_armor(light_mail)
-minion_reactive_2.description = "a watchful lancer in light mail who shifts with every feint"
-
-minion_disruptive_3 = Minion("Snare")
-minion_disruptive_3.logic = "disruptive"
-minion_disruptive_3.equip_weapons(paired_swords)
-minion_disruptive_3.description = "a quick-footed duelist striking from odd angles"
-
-minion_aggressive_3 = Minion("Cleaver")
-minion_aggressive_3.logic = "aggressive"
-minion_aggressive_3.equip_weapons(bearded_axe)
-minion_aggressive_3.description = "a scarred axeman who swings for the bone"
-
-minion_defensive_3 = Minion("Rampart")
-minion_defensive_3.logic = "defensive"
-minion_defensive_3.equip_weapons(shield_and_club)
-minion_defensive_3.wear_armor(heavy_mail)
-minion_defensive_3.description = "a stocky bruiser in heavy mail, braced behind a thick buckler"
-
-minion_reactive_3 = Minion("Slink")
-minion_reactive_3.logic = "reactive"
-minion_reactive_3.equip_weapons(dagger_and_whip)
-minion_reactive_3.description = "a patient prowler waiting to counter and cut"
-
-champion_1 = Champion("Aurek")
-champion_1.logic = "aggressive"
-champion_1.give_archetype(furioso)
-champion_1.equip_weapons(bearded_axe)
-champion_1.wear_armor(suit_of_plate)
-champion_1.wear_headgear(stag_helm)
-champion_1.description = "a towering executioner in plate, swinging a heavy axe"
-
-champion_2 = Champion("Seren")
-champion_2.logic = "defensive"
-champion_2.give_archetype(gendarme)
-champion_2.equip_weapons(shield_and_spear)
-champion_2.wear_armor(heavy_mail)
-champion_2.wear_headgear(winged_helm)
-champion_2.description = "a disciplined champion behind a long spear and stout shield"
-
-champion_3 = Champion("Mira")
-champion_3.logic = "disruptive"
-champion_3.give_archetype(heathen)
-champion_3.equip_weapons(paired_swords)
-champion_3.wear_armor(light_mail)
-champion_3.wear_headgear(black_hood)
-champion_3.description = "a duelist in a black hood, striking with twin blades"
-
-champion_4 = Champion("Talan")
-champion_4.logic = "sorcerer"
-champion_4.give_archetype(diabolist)
-champion_4.equip_weapons(polearm)
-champion_4.wear_armor(cape)
-champion_4.wear_headgear(moon_circlet)
-champion_4.description = "a grim spellblade in a cape, warding with a hooked polearm"
-
-minion_sentinel = Minion("Sentinel")
-minion_sentinel.logic = "defensive"
-minion_sentinel.give_archetype(gendarme)
-minion_sentinel.equip_weapons(shield_and_spear)
-minion_sentinel.wear_armor(heavy_mail)
-minion_sentinel.description = "a disciplined line-holder bearing a long spear and towered shield"
-
-minion_banneret = Minion("Banneret")
-minion_banneret.logic = "defensive"
-minion_banneret.give_archetype(herald)
-minion_banneret.equip_weapons(shield_and_sword)
-minion_banneret.wear_armor(light_mail)
-minion_banneret.description = "a standard-bearer who barks orders behind a bright shield"
-
-minion_ravager = Minion("Ravager")
-minion_ravager.logic = "aggressive"
-minion_ravager.give_archetype(furioso)
-minion_ravager.equip_weapons(bearded_axe)
-minion_ravager.wear_armor(war_paint)
-minion_ravager.description = "a frenzied berserker daubed in war paint, charging with a chipped axe"
-
-minion_cutthroat = Minion("Cutthroat")
-minion_cutthroat.logic = "disruptive"
-minion_cutthroat.give_archetype(heathen)
-minion_cutthroat.equip_weapons(dagger_and_whip)
-minion_cutthroat.wear_armor(cape)
-minion_cutthroat.description = "a swaggering rogue who fights dirty from the shadows"
-
-minion_occultist = Minion("Occultist")
-minion_occultist.logic = "sorcerer"
-minion_occultist.give_archetype(diabolist)
-minion_occultist.equip_weapons(polearm)
-minion_occultist.wear_armor(suit_of_plate)
-minion_occultist.description = "a grim summoner in patched suit of plate, warding with a polearm"
-
-minion_dragoon = Minion("Dragoon")
-minion_dragoon.logic = "aggressive"
-minion_dragoon.give_archetype(gendarme)
-minion_dragoon.equip_weapons(paired_swords)
-minion_dragoon.wear_armor(suit_of_plate)
-minion_dragoon.description = "a plated shock trooper who advances with twin blades and iron resolve"
+def _content():
+    import h_content
+    return h_content
 
 
-# ------------------------------------------------------------------
-# Pre-made Actors
-# ------------------------------------------------------------------
+def __getattr__(name):
+    if name.startswith("_"):
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    try:
+        return getattr(_content(), name)
+    except AttributeError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
 
 
-valeria = Righteous("Valeria")
-valeria.give_archetype(gendarme)
-valeria.wear_armor(heavy_mail)
-valeria.wear_headgear(winged_helm)
-valeria.equip_weapons(shield_and_sword)
-valeria.arms_slot2 = polearm
-
-bosh = Rowdy("Bosh")
-bosh.give_archetype(furioso)
-bosh.wear_armor(light_mail)
-bosh.wear_headgear(black_hood)
-bosh.equip_weapons(bastard_sword)
-bosh.arms_slot2 = shield_and_club
-
-sonja = Confident("Sonja")
-sonja.give_archetype(heathen)
-sonja.wear_armor(bare)
-sonja.wear_headgear(flaming_topknot)
-sonja.equip_weapons(paired_swords)
-sonja.arms_slot2 = dagger_and_whip
-
-atlantes = Esoterist("Atlante")
-atlantes.give_archetype(diabolist)
-atlantes.wear_armor(cape)
-atlantes.wear_headgear(moon_circlet)
-atlantes.equip_weapons(dagger_and_whip)
-atlantes.arms_slot2 = shield_and_sword
-
-sera = Callous("Sera")
-sera.give_archetype(herald)
-sera.wear_armor(light_mail)
-sera.wear_headgear(winged_helm)
-sera.equip_weapons(shield_and_sword)
-sera.arms_slot2 = shield_and_spear
+def spawn(name):
+    """A combat instance of the enemy template `name` ("minion_aggressive")."""
+    return _content().ENEMY_TEMPLATES[name].spawn()
 
 
 def get_default_party():
     """Returns the default party with Valeria, Sonja, Bosh, Atlantes, and Sera."""
-    return [valeria, sonja, bosh, atlantes]
\ No newline at end of file
+    content = _content()
+    return [content.valeria, content.sonja, content.bosh, content.atlantes]
@@ -0,0 +1,159 @@
+# ---------------------------------------------------------------------------
+# Logic profiles
+# ---------------------------------------------------------------------------
+#
+# How an actor with a logic profile ("aggressive", "defensive"...) picks its
+# action, as data. A profile has:
+#
+#   rules     - (condition, actions) pairs tried in order; the first action
+#               that is possible, of a rule whose condition holds, is taken
+#   weights   - (weight, actions) groups; otherwise one die with as many
+#               faces as the weights add up to picks a group, and its first
+#               possible action is taken
+#   fallback  - actions tried when the picked group has none possible
+#
+# A condition is a tuple of clauses and holds when all the facts of any one
+# clause do; facts are the SITUATION names, "not <fact>" negates one.
+#
+# Profiles are compiled when registered: for every combination of facts
+# (the situation bitmask) the rules that hold are flattened into one
+# candidate list, so a decision is a table lookup, a scan of that list and,
+# when it comes up empty, one die roll. Only the facts a profile mentions
+# are worked out.
+
+SITUATION = {
+    "momentum": 1,
+    "melee": 2,
+    "allies need help": 4,
+}
+
+PROFILES = {}
+
+
+def _condition_masks(condition):
+    """Situation masks a condition holds for."""
+    masks = set()
+    for mask in range(1 << len(SITUATION)):
+        for clause in condition:
+            if all(_holds(fact, mask) for fact in clause):
+                masks.add(mask)
+                break
+    return masks
+
+
+def _holds(fact, mask):
+    if fact.startswith("not "):
+        return not mask & SITUATION[fact[len("not "):]]
+    return bool(mask & SITUATION[fact])
+
+
+def register_profile(name, rules=(), weights=(), fallback=()):
+    """Compile a profile and make it available as `name`."""
+    facts = 0
+    for condition, _ in rules:
+        for clause in condition:
+            for fact in clause:
+                facts |= SITUATION[fact[len("not "):] if fact.startswith("not ") else fact]
+
+    table = []
+    for mask in range(1 << len(SITUATION)):
+        sure = []
+        for condition, actions in rules:
+            if mask in _condition_masks(condition):
+                sure += [action for action in actions if action not in sure]
+        table.append(tuple(sure))
+
+    thresholds = []
+    total = 0
+    for weight, actions in weights:
+        total += weight
+        thresholds.append((total, tuple(actions)))
+
+    PROFILES[name] = {
+        "facts": facts,
+        "table": tuple(table),
+        "die": total,
+        "groups": tuple(thresholds),
+        "fallback": tuple(fallback),
+    }
+
+
+def situation(view, facts):
+    """Situation mask of a TacticalView, limited to `facts`."""
+    mask = 0
+    if facts & SITUATION["momentum"] and view.momentum:
+        mask |= SITUATION["momentum"]
+    if facts & SITUATION["melee"] and view.melee:
+        mask |= SITUATION["melee"]
+    if facts & SITUATION["allies need help"] and view.allies_need_help():
+        mask |= SITUATION["allies need help"]
+    return mask
+
+
+def decide(profile, view, possible_actions, rng):
+    """Name of the action `profile` picks, or None."""
+    for name in profile["table"][situation(view, profile["facts"])]:
+        if name in possible_actions:
+            return name
+
+    groups = profile["groups"]
+    if groups:
+        roll = rng.randint(1, profile["die"])
+        for threshold, actions in groups:
+            if roll <= threshold:
+                for name in actions:
+                    if name in possible_actions:
+                        return name
+                break
+
+    for name in profile["fallback"]:
+        if name in possible_actions:
+            return name
+    return None
+
+
+register_profile(
+    "disruptive",
+    rules=[
+        ((("momentum",),), ["fight"]),
+        ((("momentum",), ("melee",)), ["dirty trick", "diablerie"]),
+    ],
+    weights=[(4, ["hide", "skirmish", "prowl"]), (2, ["trip", "smash", "fight"])],
+    fallback=["retreat", "guard", "block", "fight"],
+)
+
+register_profile(
+    "aggressive",
+    rules=[((("momentum",),), ["hack and slash"])],
+    weights=[(4, ["fight", "hack and slash", "smash"]), (2, ["stab", "trip", "skirmish"])],
+    fallback=["fight", "guard", "block"],
+)
+
+register_profile(
+    "defensive",
+    rules=[((("allies need help",),), ["deliverance", "decisive order"])],
+    weights=[(4, ["guard", "block", "rally"]), (2, ["fight", "trip", "skirmish"])],
+    fallback=["guard", "block", "retreat", "fight"],
+)
+
+register_profile(
+    "reactive",
+    rules=[((("momentum", "melee"),), ["dirty trick", "decisive order"])],
+    weights=[(4, ["skirmish", "trip", "guard"]), (2, ["retreat", "fight", "block"])],
+    fallback=["guard", "retreat", "fight"],
+)
+
+register_profile(
+    "sorcerer",
+    rules=[((("momentum",), ("not melee",)), ["diablerie"])],
+    weights=[(4, ["diablerie", "skirmish"]), (2, ["guard", "retreat", "fight"])],
+    fallback=["guard", "fight", "block"],
+)
+
+# actors without a profile, or with one nobody registered
+register_profile(
+    "default",
+    rules=[((("momentum",),), ["fight"])],
+    weights=[(4, ["fight", "skirmish", "guard"]), (2, ["trip", "block"])],
+    fallback=["guard", "fight"],
+)
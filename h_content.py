@@ -0,0 +1,514 @@
+import time
+
+import h_actions
+import h_rng
+from h_actors import (
+    Archetype,
+    Armor,
+    Arms,
+    Callous,
+    Champion,
+    Confident,
+    Esoterist,
+    Headgear,
+    Master,
+    Minion,
+    Righteous,
+    Rowdy,
+)
+
+# ---------------------------------------------------------------------------
+# Game content
+# ---------------------------------------------------------------------------
+#
+# The arms, armor, headgear and archetypes players pick from, the enemy
+# templates and the pre-made characters. Building them takes longer than
+# anything else at startup, so this module is not imported by h_actors: it
+# is loaded the first time one of its names is looked up there
+# (h_actors.valeria, h_actors.ENEMY_TEMPLATES...), and everything is built
+# in one go.
+#
+# Enemy templates roll their stats from one h_rng.content_stream, in the
+# order below: the content seed alone decides them. roll_templates() rolls
+# them again for another seed, in place, so rosters and scenes holding the
+# templates see the new stats.
+#
+# BUILD_TIMES holds the seconds each table took; see h_startup.
+
+BUILD_TIMES = {}
+_started = time.perf_counter()
+
+
+def _table_built(name):
+    global _started
+    now = time.perf_counter()
+    BUILD_TIMES[name] = now - _started
+    _started = now
+
+
+# ------------------------------------------------------------------
+# Equipment
+# ------------------------------------------------------------------
+
+
+shield_and_sword = Arms(
+    "shield and sword", "slashing, skill +2, defense +2, stab, resist pinning."
+)
+shield_and_sword.skill += 1
+shield_and_sword.defense += 2
+shield_and_sword.damage_type = "sharp"
+shield_and_sword.arms_actions = {"stab": h_actions.stab}
+shield_and_sword.features = ["resist pin"]
+
+bearded_axe = Arms("bearded axe", "slashing, power +3, defense -2, charge, slow.")
+bearded_axe.power += 3
+bearded_axe.defense -= 2
+bearded_axe.speed = "slow"
+bearded_axe.damage_type = "sharp"
+bearded_axe.arms_actions = {"smash": h_actions.smash}
+bearded_axe.features = ["charge"]
+
+shield_and_spear = Arms(
+    "shield and spear", "piercing, defense +2, charge, reach, resist pinning."
+)
+shield_and_spear.defense += 2
+shield_and_spear.damage_type = "pierce"
+shield_and_spear.features = ["resist pin", "reach", "charge"]
+
+dagger_and_whip = Arms("dagger and whip", "slashing, skill +2, stab, reach, fast.")
+dagger_and_whip.skill += 2
+dagger_and_whip.speed = "fast"
+dagger_and_whip.damage_type = "sharp"
+dagger_and_whip.arms_actions = {"stab": h_actions.stab}
+dagger_and_whip.features = ["reach"]
+
+shield_and_club = Arms(
+    "shield and club", "blunt, power +1, defense +2, resist pinning."
+)
+shield_and_club.power += 1
+shield_and_club.defense += 2
+shield_and_club.damage_type = "blunt"
+shield_and_club.arms_actions = {"smash": h_actions.smash}
+shield_and_club.features = ["resist pin"]
+
+paired_swords = Arms("paired swords", "slashing, skill +1, power +1, stab, fast")
+paired_swords.skill += 1
+paired_swords.power += 1
+paired_swords.speed = "fast"
+paired_swords.damage_type = "sharp"
+paired_swords.arms_actions = {"stab": h_actions.stab}
+
+polearm = Arms("polearm", "piercing, power +2, charge, reach, slow.")
+polearm.power += 2
+polearm.speed = "slow"
+polearm.damage_type = "pierce"
+polearm.arms_actions = {"smash": h_actions.smash}
+polearm.features = ["charge", "reach"]
+
+bastard_sword = Arms("bastard sword", "slashing, power +2, stab.")
+bastard_sword.power += 2
+bastard_sword.damage_type = "sharp"
+bastard_sword.arms_actions = {"stab": h_actions.stab}
+
+scepter = Arms("scepter", "blunt, power +1, smash.")
+scepter.power += 1
+scepter.fortune += 2
+scepter.damage_type = "blunt"
+scepter.arms_actions = {"smash": h_actions.smash}
+
+flail = Arms("flail", "blunt, power +2, skill +2, defense -2, charge, smash.")
+flail.power += 2
+flail.skill += 2
+flail.defense -= 2
+flail.speed = "slow"
+flail.damage_type = "blunt"
+flail.arms_actions = {"smash": h_actions.smash}
+flail.features = ["charge"]
+
+arms_list = {
+    "shield and sword": shield_and_sword,
+    "shield and club": shield_and_club,
+    "bearded axe": bearded_axe,
+    "shield and spear": shield_and_spear,
+    "dagger and whip": dagger_and_whip,
+    "paired swords": paired_swords,
+    "polearm": polearm,
+    "bastard sword": bastard_sword,
+    "scepter": scepter,
+    "flail": flail,
+    }
+
+_table_built("arms")
+
+
+# ------------------------------------------------------------------
+# armor
+# ------------------------------------------------------------------
+
+
+bare = Armor("bare", "defense +2.")
+bare.defense += 2
+
+war_paint = Armor("war paint", "defense -2, juggernaut.")
+war_paint.features = ["juggernaut"]
+war_paint.defense -= 2
+
+cape = Armor("cape", "fortune +1, insulation +1.")
+cape.insulation += 1
+cape.fortune += 1
+
+light_mail = Armor("light mail", "damage reduction +1")
+light_mail.reduction += 1
+
+bone_mail = Armor("bone mail", "damage reduction +1, fortune +1, defense -1")
+bone_mail.reduction += 1
+bone_mail.fortune += 1
+bone_mail.defense -= 1
+
+heavy_mail = Armor("heavy mail", "damage reduction +2, -2 insulation")
+heavy_mail.reduction += 2
+heavy_mail.insulation -= 2
+
+suit_of_plate = Armor("suit of plate", "damage reduction +3, -2 skill, -2 insulation")
+suit_of_plate.reduction += 3
+suit_of_plate.skill -= 2
+suit_of_plate.insulation -= 2
+
+brigandine = Armor("brigandine", "defense +1, damage reduction +1")
+brigandine.defense += 1
+brigandine.reduction += 1
+
+armor_list = {
+    "bare": bare,
+    "war paint": war_paint,
+    "cape": cape,
+    "light mail": light_mail,
+    "bone mail": bone_mail,
+    "heavy mail": heavy_mail,
+    "suit of plate": suit_of_plate,
+}
+
+_table_built("armor")
+
+
+# ------------------------------------------------------------------
+# headgear
+# ------------------------------------------------------------------
+
+
+winged_helm = Headgear("winged helm", "defense +1, insulation -1.")
+winged_helm.defense += 1
+winged_helm.insulation -= 1
+
+moon_circlet = Headgear("moon circlet", "fortune +1, defense -1.")
+moon_circlet.fortune += 1
+moon_circlet.defense -= 1
+
+stag_helm = Headgear("stag helm", "damage reduction +1, skill -2.")
+stag_helm.reduction += 1
+stag_helm.skill -= 2
+
+black_hood = Headgear("black hood", "skill +1, fortune -1.")
+black_hood.skill += 1
+black_hood.fortune -= 1
+
+ritual_mask = Headgear("ritual mask", "mystic aim.")
+ritual_mask.features = ["mystic aim"]
+ritual_mask.insulation -= 1
+
+flaming_topknot = Headgear("flaming topknot", "resist pinning, defense -1.")
+flaming_topknot.features = ["resist pin"]
+flaming_topknot.defense -= 1
+
+headgear_list = {
+    "winged helm": winged_helm,
+    "stag helm": stag_helm,
+    "moon circlet": moon_circlet,
+    "black hood": black_hood,
+    "flaming topknot": flaming_topknot,
+    "ritual mask": ritual_mask,
+}
+
+_table_built("headgear")
+
+
+# ------------------------------------------------------------------
+# Archetype
+# ------------------------------------------------------------------
+
+
+gendarme = Archetype(
+    "gendarme",
+    "stamina +6, skill +4, defense + 3, riposte, quick draw",
+)
+gendarme.stamina += 6
+gendarme.skill += 4
+gendarme.defense += 3
+gendarme.features = ["riposte", "quick draw"]
+
+herald = Archetype(
+    "herald",
+    "stamina +6, skill +2, defense +2, rally, decisive order, deliverance",
+)
+herald.stamina += 6
+herald.skill += 2
+herald.defense += 2
+herald.archetype_actions = {
+    "rally": h_actions.rally,
+    "decisive order": h_actions.decisive_order,
+    "deliverance": h_actions.deliverance,
+}
+herald.features = []
+
+furioso = Archetype(
+    "furioso", "stamina +12, skill +2, defense + 2, hack and slash, savagery"
+)
+furioso.stamina += 12
+furioso.skill += 2
+furioso.defense += 2
+furioso.archetype_actions = {"hack and slash": h_actions.hack_and_slash}
+furioso.features = ["savagery"]
+
+
+# New archetype: heathen
+# As `gendarme` but with 3 fewer stamina and no riposte; grants
+# special actions `prowl` and `dirty trick`.
+heathen = Archetype("heathen", "stamina +3, skill +4, defense +4, prowl, dirty trick")
+heathen.stamina += 3
+heathen.skill += 4
+heathen.defense += 4
+heathen.archetype_actions = {"prowl": h_actions.prowl, "dirty trick": h_actions.dirty_trick}
+heathen.features = []
+
+# New archetype: diabolist
+# Grants +3 fortune and the special action 'diablerie'.
+diabolist = Archetype("diabolist", "fortune +3, diablerie")
+diabolist.fortune += 3
+diabolist.archetype_actions = {"diablerie": h_actions.diablerie}
+diabolist.features = []
+
+archetype_list = {
+    "gendarme": gendarme,
+    "herald": herald,
+    "furioso": furioso,
+    "heathen": heathen,
+    "diabolist": diabolist,
+}
+
+_table_built("archetypes")
+
+
+# ------------------------------------------------------------------
+# Enemies
+# ------------------------------------------------------------------
+
+
+# the content seed the templates were last rolled from
+content_seed = h_rng.CONTENT_SEED
+_rolls = h_rng.content_stream(content_seed)
+
+minion_disruptive = Minion("Jinx", _rolls)
+minion_disruptive.logic = "disruptive"
+minion_disruptive.equip_weapons(dagger_and_whip)
+minion_disruptive.description = "a wiry cutpurse with a hooked whip and darting eyes"
+minion_aggressive = Minion("Gnash", _rolls)
+minion_aggressive.logic = "aggressive"
+minion_aggressive.equip_weapons(flail)
+minion_aggressive.wear_armor(brigandine)
+minion_aggressive.description = "a hulking brute in brigandine, swinging a spiked flail"
+minion_defensive = Minion("Bulwark", _rolls)
+minion_defensive.logic = "defensive"
+minion_defensive.equip_weapons(shield_and_spear)
+minion_defensive.wear_armor(heavy_mail)
+minion_defensive.description = "a steady guard in heavy mail, braced behind a spear and battered shield"
+minion_reactive = Minion("Skulk", _rolls)
+minion_reactive.logic = "reactive"
+minion_reactive.equip_weapons(scepter)
+minion_reactive.wear_armor(bone_mail)
+minion_reactive.description = "a lean scrapper in bone mail, circling with a knotted scepter"
+
+minion_disruptive_2 = Minion("Vex", _rolls)
+minion_disruptive_2.logic = "disruptive"
+minion_disruptive_2.equip_weapons(dagger_and_whip)
+minion_disruptive_2.wear_armor(light_mail)
+minion_disruptive_2.description = "a twitchy raider in light mail, with a barbed whip and a jagged blade"
+
+minion_aggressive_2 = Minion("Raze", _rolls)
+minion_aggressive_2.logic = "aggressive"
+minion_aggressive_2.equip_weapons(bastard_sword)
+minion_aggressive_2.description = "a broad-shouldered marauder swinging a heavy bastard sword"
+
+minion_defensive_2 = Minion("Ward", _rolls)
+minion_defensive_2.logic = "defensive"
+minion_defensive_2.equip_weapons(shield_and_sword)
+minion_defensive_2.wear_armor(brigandine)
+minion_defensive_2.description = "a grim sentinel in brigandine behind a battered shield and short blade"
+
+minion_reactive_2 = Minion("Mire", _rolls)
+minion_reactive_2.logic = "reactive"
+minion_reactive_2.equip_weapons(shield_and_spear)
+minion_reactive_2.wear_armor(light_mail)
+minion_reactive_2.description = "a watchful lancer in light mail who shifts with every feint"
+
+minion_disruptive_3 = Minion("Snare", _rolls)
+minion_disruptive_3.logic = "disruptive"
+minion_disruptive_3.equip_weapons(paired_swords)
+minion_disruptive_3.description = "a quick-footed duelist striking from odd angles"
+
+minion_aggressive_3 = Minion("Cleaver", _rolls)
+minion_aggressive_3.logic = "aggressive"
+minion_aggressive_3.equip_weapons(bearded_axe)
+minion_aggressive_3.description = "a scarred axeman who swings for the bone"
+
+minion_defensive_3 = Minion("Rampart", _rolls)
+minion_defensive_3.logic = "defensive"
+minion_defensive_3.equip_weapons(shield_and_club)
+minion_defensive_3.wear_armor(heavy_mail)
+minion_defensive_3.description = "a stocky bruiser in heavy mail, braced behind a thick buckler"
+
+minion_reactive_3 = Minion("Slink", _rolls)
+minion_reactive_3.logic = "reactive"
+minion_reactive_3.equip_weapons(dagger_and_whip)
+minion_reactive_3.description = "a patient prowler waiting to counter and cut"
+
+champion_1 = Champion("Aurek", _rolls)
+champion_1.logic = "aggressive"
+champion_1.give_archetype(furioso)
+champion_1.equip_weapons(bearded_axe)
+champion_1.wear_armor(suit_of_plate)
+champion_1.wear_headgear(stag_helm)
+champion_1.description = "a towering executioner in plate, swinging a heavy axe"
+
+champion_2 = Champion("Seren", _rolls)
+champion_2.logic = "defensive"
+champion_2.give_archetype(gendarme)
+champion_2.equip_weapons(shield_and_spear)
+champion_2.wear_armor(heavy_mail)
+champion_2.wear_headgear(winged_helm)
+champion_2.description = "a disciplined champion behind a long spear and stout shield"
+
+champion_3 = Champion("Mira", _rolls)
+champion_3.logic = "disruptive"
+champion_3.give_archetype(heathen)
+champion_3.equip_weapons(paired_swords)
+champion_3.wear_armor(light_mail)
+champion_3.wear_headgear(black_hood)
+champion_3.description = "a duelist in a black hood, striking with twin blades"
+
+champion_4 = Champion("Talan", _rolls)
+champion_4.logic = "sorcerer"
+champion_4.give_archetype(diabolist)
+champion_4.equip_weapons(polearm)
+champion_4.wear_armor(cape)
+champion_4.wear_headgear(moon_circlet)
+champion_4.description = "a grim spellblade in a cape, warding with a hooked polearm"
+
+minion_sentinel = Minion("Sentinel", _rolls)
+minion_sentinel.logic = "defensive"
+minion_sentinel.give_archetype(gendarme)
+minion_sentinel.equip_weapons(shield_and_spear)
+minion_sentinel.wear_armor(heavy_mail)
+minion_sentinel.description = "a disciplined line-holder bearing a long spear and towered shield"
+
+minion_banneret = Minion("Banneret", _rolls)
+minion_banneret.logic = "defensive"
+minion_banneret.give_archetype(herald)
+minion_banneret.equip_weapons(shield_and_sword)
+minion_banneret.wear_armor(light_mail)
+minion_banneret.description = "a standard-bearer who barks orders behind a bright shield"
+
+minion_ravager = Minion("Ravager", _rolls)
+minion_ravager.logic = "aggressive"
+minion_ravager.give_archetype(furioso)
+minion_ravager.equip_weapons(bearded_axe)
+minion_ravager.wear_armor(war_paint)
+minion_ravager.description = "a frenzied berserker daubed in war paint, charging with a chipped axe"
+
+minion_cutthroat = Minion("Cutthroat", _rolls)
+minion_cutthroat.logic = "disruptive"
+minion_cutthroat.give_archetype(heathen)
+minion_cutthroat.equip_weapons(dagger_and_whip)
+minion_cutthroat.wear_armor(cape)
+minion_cutthroat.description = "a swaggering rogue who fights dirty from the shadows"
+
+minion_occultist = Minion("Occultist", _rolls)
+minion_occultist.logic = "sorcerer"
+minion_occultist.give_archetype(diabolist)
+minion_occultist.equip_weapons(polearm)
+minion_occultist.wear_armor(suit_of_plate)
+minion_occultist.description = "a grim summoner in patched suit of plate, warding with a polearm"
+
+minion_dragoon = Minion("Dragoon", _rolls)
+minion_dragoon.logic = "aggressive"
+minion_dragoon.give_archetype(gendarme)
+minion_dragoon.equip_weapons(paired_swords)
+minion_dragoon.wear_armor(suit_of_plate)
+minion_dragoon.description = "a plated shock trooper who advances with twin blades and iron resolve"
+
+# The enemies above are templates. Rosters hold spawned copies, so a fight
+# never changes a template and encounters running side by side (or the
+# same minion drawn twice) do not share an actor.
+ENEMY_TEMPLATES = {
+    name: value for name, value in list(globals().items())
+    if isinstance(value, (Minion, Champion, Master))
+}
+# current values catch up with the equipment above, so every spawn starts
+# the way refreshed enemies used to after their first encounter
+for template in ENEMY_TEMPLATES.values():
+    template.refresh()
+
+
+def roll_templates(seed):
+    """Roll the stats of every enemy template again from content seed
+    `seed`. They come out as building the templates with that seed would
+    have rolled them."""
+    global content_seed
+    rolls = h_rng.content_stream(seed)
+    for template in ENEMY_TEMPLATES.values():
+        template.roll_stats(rolls)
+    content_seed = seed
+
+_table_built("enemies")
+
+
+# ------------------------------------------------------------------
+# Pre-made Actors
+# ------------------------------------------------------------------
+
+
+valeria = Righteous("Valeria")
+valeria.give_archetype(gendarme)
+valeria.wear_armor(heavy_mail)
+valeria.wear_headgear(winged_helm)
+valeria.equip_weapons(shield_and_sword)
+valeria.arms_slot2 = polearm
+
+bosh = Rowdy("Bosh")
+bosh.give_archetype(furioso)
+bosh.wear_armor(light_mail)
+bosh.wear_headgear(black_hood)
+bosh.equip_weapons(bastard_sword)
+bosh.arms_slot2 = shield_and_club
+
+sonja = Confident("Sonja")
+sonja.give_archetype(heathen)
+sonja.wear_armor(bare)
+sonja.wear_headgear(flaming_topknot)
+sonja.equip_weapons(paired_swords)
+sonja.arms_slot2 = dagger_and_whip
+
+atlantes = Esoterist("Atlante")
+atlantes.give_archetype(diabolist)
+atlantes.wear_armor(cape)
+atlantes.wear_headgear(moon_circlet)
+atlantes.equip_weapons(dagger_and_whip)
+atlantes.arms_slot2 = shield_and_sword
+
+sera = Callous("Sera")
+sera.give_archetype(herald)
+sera.wear_armor(light_mail)
+sera.wear_headgear(winged_helm)
+sera.equip_weapons(shield_and_sword)
+sera.arms_slot2 = shield_and_spear
+
+_table_built("premade")
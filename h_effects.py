@@ -0,0 +1,97 @@
+# ---------------------------------------------------------------------------
+# Timed effects
+# ---------------------------------------------------------------------------
+#
+# Buffs and debuffs that last a number of rounds. Each kind of effect
+# registers how it is applied and reverted; running effects live in
+# `encounter_state["effects"]` and are filed in an expiry wheel under the
+# round they run out, so upkeep only touches the effects that expire.
+#
+# An effect added during round r with duration d is reverted at the end of
+# round r + d - 1. Adding an effect to an actor that already has one of the
+# same kind reverts the old one first.
+
+EFFECT_TYPES = {}
+
+
+def register_effect(kind, apply, revert, fade=None):
+    """`apply(actor, encounter_state, effect)` and `revert(...)` change the
+    actor; `effect` is the dict passed to add_effect plus bookkeeping.
+    `fade` is reported with the actor's name when the effect runs out."""
+    EFFECT_TYPES[kind] = (apply, revert, fade)
+
+
+def _effects(encounter_state):
+    effects = encounter_state.get("effects")
+    if effects is None:
+        effects = {"active": {}, "wheel": {}}
+        encounter_state["effects"] = effects
+    return effects
+
+
+def add_effect(encounter_state, kind, actor, duration, **data):
+    effects = _effects(encounter_state)
+    key = (kind, actor)
+    previous = effects["active"].pop(key, None)
+    if previous is not None:
+        EFFECT_TYPES[kind][1](actor, encounter_state, previous)
+
+    effect = dict(data)
+    effect["kind"] = kind
+    effect["actor"] = actor
+    effect["expires"] = encounter_state["round"] + duration - 1
+
+    effects["active"][key] = effect
+    effects["wheel"].setdefault(effect["expires"], []).append(effect)
+    EFFECT_TYPES[kind][0](actor, encounter_state, effect)
+    return effect
+
+
+def get_effect(encounter_state, kind, actor):
+    effects = encounter_state.get("effects")
+    if effects is None:
+        return None
+    return effects["active"].get((kind, actor))
+
+
+def _expire(encounter_state, effect):
+    actor = effect["actor"]
+    apply, revert, fade = EFFECT_TYPES[effect["kind"]]
+    revert(actor, encounter_state, effect)
+    if fade and not encounter_state["table"].ko[encounter_state["table"].slot[actor]]:
+        h_encounter.report(fade.format(actor.name))
+
+
+def expire_effects(encounter_state):
+    """Revert the effects that run out this round."""
+    effects = encounter_state.get("effects")
+    if effects is None:
+        return encounter_state
+
+    active = effects["active"]
+    for effect in effects["wheel"].pop(encounter_state["round"], ()):
+        key = (effect["kind"], effect["actor"])
+        # replaced effects leave their old wheel entry behind
+        if active.get(key) is effect:
+            del active[key]
+            _expire(encounter_state, effect)
+    return encounter_state
+
+
+def clear_effects(encounter_state):
+    """Revert every running effect, e.g. when an encounter is cut short."""
+    effects = encounter_state.get("effects")
+    if effects is None:
+        return encounter_state
+
+    active = list(effects["active"].values())
+    effects["active"].clear()
+    effects["wheel"].clear()
+    for effect in active:
+        _expire(encounter_state, effect)
+    return encounter_state
+
+
+# imported last: h_encounter pulls in h_actions, which registers its effects
+# here at import time
+import h_encounter
@@ -1,5 +1,9 @@
 import h_actions
-import random
+import h_effects
+import h_events
+import h_rng
+import h_replay
+import h_state
 
 # When True, calls to `report()` and `major_report()` will pause
 # and wait for the user to press Enter. Default is False to allow
@@ -21,36 +25,41 @@ def disable_interactive_reports():
     set_interactive_reports(False)
 
 
+# When True, `report()`, `major_report()` and actor barks are dropped
+# without printing or pausing: the event sink is swapped for the null sink
+# until silent reports are switched off again.
+silent_reports = False
+_loud_sink = None
+
+
+def set_silent_reports(value: bool):
+    """Enable or disable silent (headless) report handling."""
+    global silent_reports, _loud_sink
+    value = bool(value)
+    if value and not silent_reports:
+        _loud_sink = h_events.set_sink(h_events.NULL_SINK)
+    elif silent_reports and not value:
+        h_events.set_sink(_loud_sink)
+    silent_reports = value
+
+
 def report(message, pause=None):
-    print("--"*30 + "\n")
-    print(message.center(60))
-    print("\n" + "--"*30)
-    # If pause is None, follow the module-level `interactive_reports` flag.
-    if pause is None:
-        if interactive_reports:
-            input()
-    else:
-        if pause:
-            input()
-    return
+    # If pause is None, the console sink follows `interactive_reports`.
+    h_events.emit("message", text=message, pause=pause)
 
 
 def major_report(message, pause=None):
-    print("=="*30 + "\n")
-    print(message.center(60))
-    print("\n" + "=="*30)
-    if pause is None:
-        if interactive_reports:
-            input()
-    else:
-        if pause:
-            input()
-    return
-
-def run_encounter (scene, party):
-
-    encounter_state = new_encounter (scene, party)
-    encounter_phase = "round"
+    h_events.emit("major", text=message, pause=pause)
+
+def run_encounter (scene, party, rng=None):
+
+    encounter_state = begin_encounter (scene, party, rng)
+    play_encounter (encounter_state)
+    return finish_encounter (scene, party, encounter_state)
+
+def begin_encounter (scene, party, rng=None):
+
+    encounter_state = new_encounter (scene, party, rng)
 
     if scene.roster:
         descriptions = []
@@ -69,7 +78,7 @@ def run_encounter (scene, party):
             report(event_message)
         apply_scene_event(encounter_state, event)
 
-    randomizer = random.randint (0,5)
+    randomizer = h_rng.events(encounter_state).randint (0,5)
     battle_start_message = [
         "Fate provides another challenge!",
         "Let madness reign!",
@@ -80,12 +89,23 @@ def run_encounter (scene, party):
     ]
     major_report(battle_start_message[randomizer].center(60))
     report(f"Round: {encounter_state['round']}".center(60) )
-    
-    while encounter_phase != "END":
 
+    return encounter_state
+
+def play_encounter (encounter_state, encounter_phase="round", until_turn=None):
+    """Run phases until the encounter ends, or until `until_turn` turns
+    have been taken. Returns the phase to resume from."""
+
+    while encounter_phase != "END":
+        if until_turn is not None and encounter_state["turn"] >= until_turn:
+            break
         encounter_phase, encounter_state = PHASES[encounter_phase] (encounter_phase, encounter_state)
 
-    randomizer = random.randint (0,5)
+    return encounter_phase
+
+def finish_encounter (scene, party, encounter_state):
+
+    randomizer = h_rng.events(encounter_state).randint (0,5)
     battle_end_message = [
         "In the end there is only silence.",
         "A feast for worms.",
@@ -101,8 +121,8 @@ def run_encounter (scene, party):
 
     party = [actor for actor in party if encounter_state["actors"].get(actor, {}).get("KO") != True]
     for actor in party:
-        stamina_restore = random.randint(3, 6)
-        fortune_restore = random.randint(0, 2)
+        stamina_restore = h_rng.loot(encounter_state).randint(3, 6)
+        fortune_restore = h_rng.loot(encounter_state).randint(0, 2)
         actor.current_stamina = min(actor.current_stamina + stamina_restore, actor.stamina)
         actor.current_fortune = min(actor.current_fortune + fortune_restore, actor.fortune)
         report(
@@ -111,6 +131,90 @@ def run_encounter (scene, party):
     return party
 
 
+# Logic profile used for actors that have none of their own when a
+# headless simulation has to drive them (falls back to default weights).
+DEFAULT_LOGIC = "default"
+
+# Upper bound on action retries per headless turn, so a policy that keeps
+# picking failing actions cannot stall a simulation.
+MAX_ACTION_RETRIES = 10
+
+
+def simulate_encounter (scene, party, party_policy=None, enemy_policy=None, rng=None, max_rounds=100, fresh=True, sink=None):
+    """Run one encounter headless and return a structured outcome.
+
+    Stdin is never read. Combat events go to `sink` (see h_events), by
+    default the null sink, so nothing is printed. `party_policy` and
+    `enemy_policy` are logic profile names ("aggressive", "defensive", ...)
+    that drive every actor on that side; None keeps each actor's own
+    `logic`, falling back to DEFAULT_LOGIC. `rng` (a seed, a
+    `random.Random` or h_rng.RngStreams) gives the encounter its own
+    random streams, so a seed reproduces a run in any process; without it
+    the campaign streams (by default the global `random` module) are used.
+    With `fresh` every actor is refreshed before the fight.
+
+    The outcome is a dict with `winner` ("party", "enemy" or None when
+    `max_rounds` runs out), `rounds`, `survivors` and `damage_dealt`
+    (both keyed by side, survivors listed by name).
+    """
+    if fresh:
+        for actor in party + scene.roster:
+            actor.refresh()
+
+    previous_sink = h_events.set_sink(sink)
+    try:
+        encounter_state = new_encounter (scene, party, rng)
+        encounter_state["headless"] = True
+        logic = {}
+        for actor in party:
+            logic[actor] = party_policy or actor.logic or DEFAULT_LOGIC
+        for actor in scene.roster:
+            logic[actor] = enemy_policy or actor.logic or DEFAULT_LOGIC
+        encounter_state["logic"] = logic
+
+        trigger_special_event(encounter_state)
+        if getattr(scene, "event", None):
+            apply_scene_event(encounter_state, scene.event)
+
+        encounter_phase = "round"
+        while encounter_phase != "END" and encounter_state["round"] <= max_rounds:
+            encounter_phase, encounter_state = PHASES[encounter_phase] (encounter_phase, encounter_state)
+
+        # lingering buffs and debuffs must not leak into the next run
+        tick_timed_effects(encounter_state, expire_all=True)
+    finally:
+        h_events.set_sink(previous_sink)
+
+    return encounter_outcome(encounter_state, encounter_phase)
+
+
+def encounter_outcome (encounter_state, encounter_phase="END"):
+    actors = encounter_state["actors"]
+    party_alive = [a for a in encounter_state["party"] if actors[a]["KO"] == False]
+    enemy_alive = [a for a in encounter_state["enemy"] if actors[a]["KO"] == False]
+
+    winner = None
+    if encounter_phase == "END":
+        if not enemy_alive:
+            winner = "party"
+        elif not party_alive:
+            winner = "enemy"
+
+    damage_taken = encounter_state.get("damage_taken", {})
+    party_taken = sum(damage_taken.get(a, 0) for a in set(encounter_state["party"]))
+    enemy_taken = sum(damage_taken.get(a, 0) for a in set(encounter_state["enemy"]))
+
+    return {
+        "winner": winner,
+        "rounds": encounter_state["round"],
+        "survivors": {
+            "party": [a.name for a in party_alive],
+            "enemy": [a.name for a in enemy_alive],
+        },
+        "damage_dealt": {"party": enemy_taken, "enemy": party_taken},
+    }
+
+
 def apply_scene_event(encounter_state, event):
     effect = event.get("effect")
 
@@ -157,52 +261,56 @@ def apply_scene_event(encounter_state, event):
     return encounter_state
 
 
-def trigger_special_event(encounter_state):
-    special_events = [
-        {
-            "message": "A sudden pall slows your reactions.",
-            "effect": "party_slow_first_round",
-        },
-        {
-            "message": "The enemy surges with murderous momentum.",
-            "effect": "enemy_momentum",
-        },
-        {
-            "message": "The enemy locks shields and braces.",
-            "effect": "enemy_guard",
-        },
-        {
-            "message": "Your formation tightens, shields high.",
-            "effect": "party_guard",
-        },
-        {
-            "message": "A chilling dread leaves you exposed.",
-            "effect": "party_vulnerable",
-        },
-        {
-            "message": "Resolve flares and quickens your strike.",
-            "effect": "party_momentum",
-        },
-        {
-            "message": "The enemy is rattled and off-balance.",
-            "effect": "enemy_vulnerable",
-        },
-        {
-            "message": "The enemy hesitates, their pace faltering.",
-            "effect": "enemy_slow_first_round",
-        },
-    ]
+# One of these opens every encounter.
+SPECIAL_EVENTS = [
+    {
+        "message": "A sudden pall slows your reactions.",
+        "effect": "party_slow_first_round",
+    },
+    {
+        "message": "The enemy surges with murderous momentum.",
+        "effect": "enemy_momentum",
+    },
+    {
+        "message": "The enemy locks shields and braces.",
+        "effect": "enemy_guard",
+    },
+    {
+        "message": "Your formation tightens, shields high.",
+        "effect": "party_guard",
+    },
+    {
+        "message": "A chilling dread leaves you exposed.",
+        "effect": "party_vulnerable",
+    },
+    {
+        "message": "Resolve flares and quickens your strike.",
+        "effect": "party_momentum",
+    },
+    {
+        "message": "The enemy is rattled and off-balance.",
+        "effect": "enemy_vulnerable",
+    },
+    {
+        "message": "The enemy hesitates, their pace faltering.",
+        "effect": "enemy_slow_first_round",
+    },
+]
+
 
-    event = random.choice(special_events)
+def trigger_special_event(encounter_state):
+    event = h_rng.events(encounter_state).choice(SPECIAL_EVENTS)
     report(event["message"])
     apply_scene_event(encounter_state, event)
 
-def new_encounter (scene, party):
+def new_encounter (scene, party, rng=None):
     encounter_state = {}
+    encounter_state["rng"] = h_rng.make_streams(rng) if rng is not None else h_rng.campaign
     encounter_state["party"] = party
     encounter_state["enemy"] = scene.roster
     encounter_state["round"] = 1
-    encounter_state["actors"] = {}
+    encounter_state["turn"] = 0
+    encounter_state["damage_taken"] = {}
 
     party_inventory = None
     if party:
@@ -214,257 +322,107 @@ def new_encounter (scene, party):
             actor.inventory = party_inventory
 
 
-    all_actors = party + scene.roster
-    
-    for item in all_actors:
-        encounter_state["actors"][item] = {
-            "party" : False,
-            "active" : False,
-            "waiting" : False,
-            "done" : False,
-            "KO" : False,
-            "melee" : False,
-            "momentum" : False,
-            "guard" : False,
-            "block" : False,
-            "hide" : False,
-            "speed" : "normal",
-            "vulnerable" : False,
-            "daze" : False,
-            "blind" : False,
-            "pin" : False,
-            "disable" : False,
-            "root" : False,
-            "enraged" : False
-        }
-
-        if item in party:
-            encounter_state["actors"][item]["party"] = True
-
-        encounter_state["actors"][item]["speed"] = item.speed
-        
+    table = h_state.EncounterTable(party, scene.roster)
+    encounter_state["table"] = table
+    encounter_state["actors"] = table.by_actor
 
     return encounter_state
 
 def round_phase (encounter_phase, encounter_state):
 
-    fast_actors =[]
-    regular_actors =[]
-    slow_actors =[]
-
-    for k in encounter_state["actors"]:
-
-        encounter_state = h_actions.savagery_trigger (k, encounter_state)
-
-        if encounter_state["actors"][k]["speed"] == "fast":
-            fast_actors.append(k)
-        elif encounter_state["actors"][k]["speed"] == "slow":
-            slow_actors.append(k)
-        else:
-            regular_actors.append(k)
-
-    for k in fast_actors:
-        if encounter_state["actors"][k]["KO"] == False:
-            if encounter_state["actors"][k]["done"] == False:
-                encounter_state["actors"][k]["active"] = True
-                active_actor = k
-                encounter_phase = "round"
-
-                # reset soft status
-                encounter_state = reset_soft_status (active_actor, encounter_state)
-
-                if active_actor in encounter_state["party"]:
-                    encounter_state = party_turn (k, encounter_state)
-                else:
-                    encounter_state = enemy_turn (k, encounter_state)
-
-                # reset hard status
-                encounter_state = reset_hard_status (active_actor, encounter_state)
-                
-                # end melee check
-                encounter_state = check_melee_condition (encounter_phase, encounter_state)
-                
-                # end condition check
-                encounter_phase = check_end_condition (encounter_phase, encounter_state)
-
-                return encounter_phase, encounter_state
-
-    for k in regular_actors:
-        if encounter_state["actors"][k]["KO"] == False:
-            if encounter_state["actors"][k]["done"] == False:
-                encounter_state["actors"][k]["active"] = True
-                active_actor = k
-                encounter_phase = "round"
-
-                # reset soft status
-                encounter_state = reset_soft_status (active_actor, encounter_state)
-
-                if active_actor in encounter_state["party"]:
-                    encounter_state = party_turn (k, encounter_state)
-                else:
-                    encounter_state = enemy_turn (k, encounter_state)
-
-                # end condition check
-                encounter_phase = check_end_condition (encounter_phase, encounter_state)
-                
-                # reset hard status
-                encounter_state = reset_hard_status (active_actor, encounter_state)
-                
-                # end melee check
-                encounter_state = check_melee_condition (encounter_phase, encounter_state)
-
-                return encounter_phase, encounter_state
-
-    for k in slow_actors:
-        if encounter_state["actors"][k]["KO"] == False:
-            if encounter_state["actors"][k]["done"] == False:
-                encounter_state["actors"][k]["active"] = True
-                active_actor = k
-                encounter_phase = "round"
-
-                # reset soft status
-                encounter_state = reset_soft_status (active_actor, encounter_state)
-
-                if active_actor in encounter_state["party"]:
-                    encounter_state = party_turn (k, encounter_state)
-                else:
-                    encounter_state = enemy_turn (k, encounter_state)
-
-                # end condition check
-                encounter_phase = check_end_condition (encounter_phase, encounter_state)
-                
-                # reset hard status
-                encounter_state = reset_hard_status (active_actor, encounter_state)
-                
-                # end melee check
-                encounter_state = check_melee_condition (encounter_phase, encounter_state)
-
-                return encounter_phase, encounter_state
+    table = encounter_state["table"]
+
+    # only actors hurt since the last check can have become enraged
+    if table.wounded:
+        for i in sorted(table.wounded):
+            encounter_state = h_actions.savagery_trigger (table.actors[i], encounter_state)
+        table.wounded.clear()
+
+    i = table.next_ready()
+
+    if i is not None:
+        active_actor = table.actors[i]
+        table.status[i] |= h_state.ACTIVE
+        table.tactics.clear()
+        encounter_state["turn"] += 1
+        # lookahead rollouts (h_search) are not turns of the session
+        if "search" not in encounter_state:
+            h_replay.turn_started()
+
+        # reset soft status
+        encounter_state = reset_soft_status (active_actor, encounter_state)
+
+        encounter_state = take_turn (active_actor, encounter_state)
+
+        return end_turn (active_actor, encounter_state)
 
     encounter_phase = "upkeep"
 
-    # Decrement stone skin buff durations
-    if "stone_skin_buffs" in encounter_state:
-        actors_to_remove = []
-        for buffed_actor in encounter_state["stone_skin_buffs"]:
-            encounter_state["stone_skin_buffs"][buffed_actor]["duration"] -= 1
-            if encounter_state["stone_skin_buffs"][buffed_actor]["duration"] <= 0:
-                # Buff expired, remove bonuses
-                bonus_data = encounter_state["stone_skin_buffs"][buffed_actor]
-                buffed_actor.current_reduction -= bonus_data["reduction_bonus"]
-                buffed_actor.current_power -= bonus_data["power_bonus"]
-                if bonus_data.get("juggernaut") == True and "juggernaut" in buffed_actor.features:
-                    buffed_actor.features.remove("juggernaut")
-                if encounter_state["actors"].get(buffed_actor, {}).get("KO") != True:
-                    report(f"{buffed_actor.name}'s stone skin fades away.")
-                actors_to_remove.append(buffed_actor)
-        
-        # Remove expired buffs
-        for actor_to_remove in actors_to_remove:
-            del encounter_state["stone_skin_buffs"][actor_to_remove]
-
-    # Decrement devil's dust buff durations
-    if "devils_dust_buffs" in encounter_state:
-        actors_to_remove = []
-        for buffed_actor in encounter_state["devils_dust_buffs"]:
-            encounter_state["devils_dust_buffs"][buffed_actor]["duration"] -= 1
-            if encounter_state["devils_dust_buffs"][buffed_actor]["duration"] <= 0:
-                # Buff expired, remove bonuses
-                bonus_data = encounter_state["devils_dust_buffs"][buffed_actor]
-                buffed_actor.current_power -= bonus_data["power_bonus"]
-                buffed_actor.speed = "normal"
-                if encounter_state["actors"].get(buffed_actor, {}).get("KO") != True:
-                    report(f"{buffed_actor.name}'s devil's dust effect wears off.")
-                actors_to_remove.append(buffed_actor)
-        
-        # Remove expired buffs
-        for actor_to_remove in actors_to_remove:
-            del encounter_state["devils_dust_buffs"][actor_to_remove]
-
-    # Decrement diabolic weapon buff durations
-    if "diabolic_weapon_buffs" in encounter_state:
-        actors_to_remove = []
-        for buffed_actor in encounter_state["diabolic_weapon_buffs"]:
-            encounter_state["diabolic_weapon_buffs"][buffed_actor]["duration"] -= 1
-            if encounter_state["diabolic_weapon_buffs"][buffed_actor]["duration"] <= 0:
-                bonus_data = encounter_state["diabolic_weapon_buffs"][buffed_actor]
-                buffed_actor.current_power -= bonus_data["power_bonus"]
-                if encounter_state["actors"].get(buffed_actor, {}).get("KO") != True:
-                    report(f"{buffed_actor.name}'s diabolic weapon fades.")
-                actors_to_remove.append(buffed_actor)
-
-        for actor_to_remove in actors_to_remove:
-            del encounter_state["diabolic_weapon_buffs"][actor_to_remove]
-
-    # Decrement barbed halo buff durations
-    if "barbed_halo_buffs" in encounter_state:
-        actors_to_remove = []
-        for buffed_actor in encounter_state["barbed_halo_buffs"]:
-            encounter_state["barbed_halo_buffs"][buffed_actor]["duration"] -= 1
-            if encounter_state["barbed_halo_buffs"][buffed_actor]["duration"] <= 0:
-                if encounter_state["actors"].get(buffed_actor, {}).get("KO") != True:
-                    report(f"{buffed_actor.name}'s barbed halo fades.")
-                actors_to_remove.append(buffed_actor)
-
-        for actor_to_remove in actors_to_remove:
-            del encounter_state["barbed_halo_buffs"][actor_to_remove]
-
-    # Decrement evil eye debuff durations
-    if "evil_eye_debuffs" in encounter_state:
-        actors_to_remove = []
-        for debuffed_actor in encounter_state["evil_eye_debuffs"]:
-            encounter_state["evil_eye_debuffs"][debuffed_actor]["duration"] -= 1
-            if encounter_state["evil_eye_debuffs"][debuffed_actor]["duration"] <= 0:
-                debuff_data = encounter_state["evil_eye_debuffs"][debuffed_actor]
-                debuffed_actor.defense += debuff_data["defense_penalty"]
-                h_actions.remove_root(debuffed_actor, encounter_state)
-                if encounter_state["actors"].get(debuffed_actor, {}).get("KO") != True:
-                    report(f"{debuffed_actor.name}'s evil eye fades.")
-                actors_to_remove.append(debuffed_actor)
-
-        for actor_to_remove in actors_to_remove:
-            del encounter_state["evil_eye_debuffs"][actor_to_remove]
-
-    # Decrement misfortune debuff durations
-    if "misfortune_debuffs" in encounter_state:
-        actors_to_remove = []
-        for debuffed_actor in encounter_state["misfortune_debuffs"]:
-            encounter_state["misfortune_debuffs"][debuffed_actor]["duration"] -= 1
-            if encounter_state["misfortune_debuffs"][debuffed_actor]["duration"] <= 0:
-                debuff_data = encounter_state["misfortune_debuffs"][debuffed_actor]
-                debuffed_actor.current_fortune += debuff_data["fortune_penalty"]
-                debuffed_actor.current_insulation += debuff_data["insulation_penalty"]
-                if encounter_state["actors"].get(debuffed_actor, {}).get("KO") != True:
-                    report(f"{debuffed_actor.name}'s misfortune fades.")
-                actors_to_remove.append(debuffed_actor)
-
-        for actor_to_remove in actors_to_remove:
-            del encounter_state["misfortune_debuffs"][actor_to_remove]
+    encounter_state = tick_timed_effects (encounter_state)
 
     return encounter_phase, encounter_state
 
+def end_turn (actor, encounter_state):
+
+    encounter_phase = "round"
+
+    # reset hard status
+    encounter_state = reset_hard_status (actor, encounter_state)
+
+    # end melee check
+    encounter_state = check_melee_condition (encounter_phase, encounter_state)
+
+    # end condition check
+    encounter_phase = check_end_condition (encounter_phase, encounter_state)
+
+    return encounter_phase, encounter_state
+
+def tick_timed_effects (encounter_state, expire_all=False):
+    """Revert the buffs and debuffs that run out at this upkeep.
+    With `expire_all` every running effect is reverted immediately."""
+
+    if expire_all:
+        return h_effects.clear_effects (encounter_state)
+    return h_effects.expire_effects (encounter_state)
+
+def take_turn (actor, encounter_state):
+    if encounter_state.get("headless"):
+        return headless_turn (actor, encounter_state)
+    if actor in encounter_state["party"]:
+        return party_turn (actor, encounter_state)
+    return enemy_turn (actor, encounter_state)
+
+def headless_turn (actor, encounter_state):
+
+    encounter_state["actors"][actor].pop("hide_blocked", None)
+
+    for _ in range(MAX_ACTION_RETRIES):
+        possible_actions = h_actions.filter_actions (actor, encounter_state, actor.action_table())
+
+        action = h_actions.enemy_action_logic(actor, encounter_state, possible_actions)
+        if action is None:
+            break
+
+        encounter_state = action (actor, encounter_state)
+        if not encounter_state.pop("action_failed", False):
+            break
+        encounter_state["table"].tactics.clear()
+
+    encounter_state["actors"][actor]["active"] = False
+    encounter_state["actors"][actor]["done"] = True
+
+    return encounter_state
+
 def party_turn (actor, encounter_state):
 
     actor.feeling (encounter_state)
 
-    print (f"{actor.name}'s turn")
-    weapon_name = actor.arms_slot1.name if actor.arms_slot1 else "None"
-    print(
-        f"Stamina: {actor.current_stamina}/{actor.stamina} | Fortune: {actor.current_fortune}/{actor.fortune} | Weapon: {weapon_name}"
-    )
-    status_text = "Status: "
-    for key, value in encounter_state["actors"][actor].items():
-        if value == True:
-            if key != "active":
-                if key != "party":
-                    status_text += f"({key})"
-    print(status_text)
-    input()
+    turn_header (actor, encounter_state)
 
     encounter_state["actors"][actor].pop("hide_blocked", None)
 
     while True:
-        possible_actions = h_actions.filter_actions (actor, encounter_state, actor.special_actions | actor.arms_actions | h_actions.base_actions)
+        possible_actions = h_actions.filter_actions (actor, encounter_state, actor.action_table(party_menu=True))
 
         user_action = h_actions.choose_options (possible_actions)
 
@@ -485,23 +443,12 @@ def party_turn (actor, encounter_state):
     return encounter_state
 
 def enemy_turn (actor, encounter_state):
-    print (f"{actor.name}'s turn")
-    weapon_name = actor.arms_slot1.name if actor.arms_slot1 else "None"
-    print(
-        f"Stamina: {actor.current_stamina}/{actor.stamina} | Fortune: {actor.current_fortune}/{actor.fortune} | Weapon: {weapon_name}"
-    )
-    status_text = "Status: "
-    for key, value in encounter_state["actors"][actor].items():
-        if value == True:
-            if key != "active":
-                status_text += f"({key})"
-    print(status_text)
-    input()
+    turn_header (actor, encounter_state)
 
     encounter_state["actors"][actor].pop("hide_blocked", None)
 
     while True:
-        possible_actions = h_actions.filter_actions (actor, encounter_state, h_actions.base_actions | actor.special_actions | actor.arms_actions)
+        possible_actions = h_actions.filter_actions (actor, encounter_state, actor.action_table())
 
         enemy_action = h_actions.enemy_action_logic(actor, encounter_state, possible_actions)
         if enemy_action is None:
@@ -509,6 +456,7 @@ def enemy_turn (actor, encounter_state):
 
         encounter_state = enemy_action (actor, encounter_state)
         if encounter_state.pop("action_failed", False):
+            encounter_state["table"].tactics.clear()
             continue
         break
 
@@ -517,20 +465,36 @@ def enemy_turn (actor, encounter_state):
     #print(actor.name, encounter_state["actors"][actor])
     return encounter_state
 
+def turn_header (actor, encounter_state):
+    if not h_events.current_sink().enabled:
+        return
+    h_events.emit(
+        "turn_start",
+        actor=actor.name,
+        stamina=actor.current_stamina,
+        max_stamina=actor.stamina,
+        fortune=actor.current_fortune,
+        max_fortune=actor.fortune,
+        weapon=actor.arms_slot1.name if actor.arms_slot1 else "None",
+        status=encounter_state["actors"][actor].status_tags(),
+    )
+
 def upkeep_phase (encounter_phase, encounter_state):
     #major_report(f"Round {encounter_state['round']} upkeep".center(60))
     #input()
     encounter_state["round"] += 1
-    major_report(f"Round {encounter_state['round']}")
+    h_events.emit("round_start", round=encounter_state["round"])
 
     if encounter_state.get("restore_speeds_round") == encounter_state["round"]:
         for actor, speed in encounter_state.get("speed_overrides", {}).items():
             encounter_state["actors"][actor]["speed"] = speed
         encounter_state.pop("speed_overrides", None)
         encounter_state.pop("restore_speeds_round", None)
-    for k in encounter_state["actors"]:
-        encounter_state["actors"][k]["done"] = False
-        encounter_state["actors"][k]["active"] = False
+    table = encounter_state["table"]
+    status = table.status
+    for i in table.indexes:
+        status[i] &= ~(h_state.DONE | h_state.ACTIVE)
+    table.start_round()
 
     encounter_phase = "round"
 
@@ -543,18 +507,9 @@ PHASES = {
 
 def check_end_condition (encounter_phase, encounter_state):
 
-    party_KO = True
-    enemy_KO = True
-
-    for item in encounter_state["party"]:
-        if encounter_state["actors"][item]["KO"] == False:
-            party_KO = False
-
-    for item in encounter_state["enemy"]:
-        if encounter_state["actors"][item]["KO"] == False:
-            enemy_KO = False
+    alive = encounter_state["table"].alive
 
-    if party_KO == True or enemy_KO == True:
+    if not alive[True] or not alive[False]:
         #major_report("The battle is over.".center(60))
         encounter_phase = "END"
 
@@ -562,43 +517,30 @@ def check_end_condition (encounter_phase, encounter_state):
 
 def check_melee_condition (encounter_phase, encounter_state):
 
-    party_melee = False
-    enemy_melee = False
-
-    for item in encounter_state["actors"]:
-        if encounter_state["actors"][item]["party"] == True:
-            if encounter_state["actors"][item]["melee"] == True:
-                party_melee = True
-        else:
-            if encounter_state["actors"][item]["melee"] == True:
-                enemy_melee = True
-
-    if party_melee == True:
-        if enemy_melee == True:
-            return encounter_state
-        
-    for item in encounter_state["actors"]:
-        encounter_state["actors"][item]["melee"] = False
-
-    if party_melee or enemy_melee:
+    table = encounter_state["table"]
+    in_melee = table.in_melee
+
+    if in_melee[True] and in_melee[False]:
+        return encounter_state
+
+    if in_melee[True] or in_melee[False]:
+        status = table.status
+        for i in table.indexes:
+            status[i] &= ~h_state.MELEE
+        in_melee[True].clear()
+        in_melee[False].clear()
         report ("No melee.")
 
     return encounter_state
 
 def reset_soft_status (actor, encounter_state):
 
-    h_actions.remove_guard (actor, encounter_state)
-    h_actions.remove_block (actor, encounter_state)
-    h_actions.remove_hide (actor, encounter_state)
-    h_actions.remove_vulnerable (actor, encounter_state)
+    h_actions.clear_statuses (actor, encounter_state, h_state.SOFT_STATUS)
 
     return encounter_state
 
 def reset_hard_status (actor, encounter_state):
-    
-    h_actions.remove_daze (actor, encounter_state)
-    h_actions.remove_disable (actor, encounter_state)
-    h_actions.remove_pin (actor, encounter_state)
-    h_actions.remove_blind (actor, encounter_state)
-    
+
+    h_actions.clear_statuses (actor, encounter_state, h_state.HARD_STATUS)
+
     return encounter_state
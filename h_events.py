@@ -0,0 +1,207 @@
+# ---------------------------------------------------------------------------
+# Combat event stream
+# ---------------------------------------------------------------------------
+#
+# Combat code emits typed events (a kind plus plain fields such as actor
+# names and numbers) instead of formatting narration. The current sink
+# decides what happens to them: the console sink renders today's text,
+# the JSONL sink records them and the null sink drops them before any
+# event is even built.
+#
+# Kinds: attack, hit, roll, damage, status_applied, status_removed, ko,
+# spell_cast, round_start, turn_start, plus message/major/bark for
+# free-form narration that goes through report(), major_report() and
+# actor barks.
+#
+# The sink is kept per thread, so simulations can run in threads at the
+# same time; threads that never install one use the console sink.
+
+import threading
+
+
+class NullSink:
+    enabled = False
+
+    def handle(self, event):
+        pass
+
+    def flush(self):
+        pass
+
+
+ATTACK_TEXT = {
+    "fight": "{actor} attacks {target} in melee.",
+    "smash": "{actor} winds up for a heavy attack against {target}.",
+    "hack and slash": "{actor} attacks {target} with a flurry of blows.",
+    "trip": "{actor} looks for an openning against {target}.",
+    "dirty trick": "{actor} attempts a dirty trick on {target}.",
+    "prowl": "{actor} prowls toward {target}.",
+    "stab": "{actor} aims at {target} weak points.",
+    "skirmish": "{actor} takes aims at {target} and attacks from a distance.",
+}
+
+MISS_TEXT = {
+    "skirmish": "{actor} misses.",
+}
+
+STATUS_APPLIED_TEXT = {
+    "daze": "{actor} is dazed.",
+    "vulnerable": "{actor} is vulnerable.",
+    "disable": "{actor} is disabled.",
+    "pin": "{actor} is pinned.",
+    "blind": "{actor} is blinded.",
+    "root": "{actor} is rooted.",
+}
+
+STATUS_REMOVED_TEXT = {
+    "guard": "{actor} is no longer guarding.",
+    "block": "{actor} is no longer blocking.",
+    "hide": "{actor} is no longer hidden.",
+    "vulnerable": "{actor} is no longer vulnerable.",
+    "daze": "{actor} is no longer dazed.",
+    "disable": "{actor} is no longer disabled.",
+    "pin": "{actor} is no longer pinned.",
+    "blind": "{actor} is no longer blinded.",
+    "root": "{actor} is no longer rooted.",
+}
+
+
+def render(event):
+    """Narration line for an event, or None when the console shows nothing."""
+    kind = event["kind"]
+    if kind in ("message", "major", "bark"):
+        return event["text"]
+    if kind == "attack":
+        return ATTACK_TEXT[event["action"]].format(**event)
+    if kind == "hit":
+        if event["result"] == "failure":
+            return MISS_TEXT.get(event["action"], "{target} deflects the attack.").format(**event)
+        return None
+    if kind == "roll":
+        return "{result} - {total} ({target})".format(**event)
+    if kind == "damage":
+        return "{actor} takes {amount} damage.".format(**event)
+    if kind == "status_applied":
+        return STATUS_APPLIED_TEXT[event["status"]].format(**event)
+    if kind == "status_removed":
+        return STATUS_REMOVED_TEXT[event["status"]].format(**event)
+    if kind == "spell_cast":
+        return "{actor} summons a {demon} of hell to cast {spell}.".format(**event)
+    if kind == "round_start":
+        return "Round {round}".format(**event)
+    if kind == "turn_start":
+        return (
+            "{actor}'s turn\n"
+            "Stamina: {stamina}/{max_stamina} | Fortune: {fortune}/{max_fortune} | Weapon: {weapon}\n"
+            "Status: {status}"
+        ).format(**event)
+    # ko narration comes from the actor's death message
+    return None
+
+
+class ConsoleSink:
+    """Prints events exactly as the game always has, pausing for Enter
+    according to h_encounter.interactive_reports."""
+
+    enabled = True
+
+    def handle(self, event):
+        text = render(event)
+        if text is None:
+            return
+        kind = event["kind"]
+        if kind == "turn_start":
+            print(text)
+            input()
+            return
+        if kind == "bark":
+            header = ("< " * 17).rstrip()
+            footer = ("> " * 17).rstrip()
+            print(f"{header}\n")
+            print(text)
+            print(f"\n{footer}")
+            input()
+            return
+
+        rule = "==" if kind in ("major", "round_start") else "--"
+        print(rule*30 + "\n")
+        print(text.center(60))
+        print("\n" + rule*30)
+        pause = event.get("pause")
+        if pause is None:
+            pause = h_encounter.interactive_reports
+        if pause:
+            input()
+
+    def flush(self):
+        pass
+
+
+class JsonlSink:
+    """Buffers events and writes them as JSON lines to `stream` (a path or
+    an open text file) every `buffer_size` events and on flush/close."""
+
+    enabled = True
+
+    def __init__(self, stream, buffer_size=1024):
+        self.owned = isinstance(stream, str)
+        self.stream = open(stream, "a", encoding="utf-8") if self.owned else stream
+        self.buffer_size = buffer_size
+        self.buffer = []
+
+    def handle(self, event):
+        self.buffer.append(event)
+        if len(self.buffer) >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        if self.buffer:
+            import json
+            self.stream.write("".join(json.dumps(event) + "\n" for event in self.buffer))
+            self.buffer = []
+        self.stream.flush()
+
+    def close(self):
+        self.flush()
+        if self.owned:
+            self.stream.close()
+
+
+NULL_SINK = NullSink()
+default_sink = ConsoleSink()
+_local = threading.local()
+
+
+def current_sink():
+    """The sink of the calling thread: the one installed there with
+    set_sink, otherwise the process-wide default (the console)."""
+    return getattr(_local, "sink", default_sink)
+
+
+def set_sink(new_sink):
+    """Install a sink for the calling thread and return the previous one.
+    Each thread has its own, so headless encounters running side by side
+    never send events to each other's sinks."""
+    previous = current_sink()
+    _local.sink = new_sink if new_sink is not None else NULL_SINK
+    return previous
+
+
+def __getattr__(name):
+    # `h_events.sink` still reads the calling thread's sink
+    if name == "sink":
+        return current_sink()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def emit(kind, **fields):
+    sink = current_sink()
+    if not sink.enabled:
+        return
+    event = {"kind": kind}
+    event.update(fields)
+    sink.handle(event)
+
+
+# imported last, see h_effects
+import h_encounter
@@ -0,0 +1,90 @@
+# ---------------------------------------------------------------------------
+# Actor features
+# ---------------------------------------------------------------------------
+#
+# Features ("reach", "riposte"...) come from archetypes, arms, armor,
+# headgear, boons and effects, and more than one of them can grant the same
+# one. Every feature name is interned to a bit once; an actor's Features
+# keeps how many sources grant each feature and the mask of those granted
+# at least once, so removing one source leaves the feature to the others
+# and a check is one AND:
+#
+#     actor.features.mask & h_features.REACH
+#
+# `name in actor.features` still works where speed does not matter.
+
+BITS = {}
+
+
+def bit(name):
+    """The bit of a feature, registering it the first time it is seen."""
+    value = BITS.get(name)
+    if value is None:
+        value = BITS[name] = 1 << len(BITS)
+    return value
+
+
+CHARGE = bit("charge")
+JUGGERNAUT = bit("juggernaut")
+MYSTIC_AIM = bit("mystic aim")
+QUICK_DRAW = bit("quick draw")
+REACH = bit("reach")
+RESIST_PIN = bit("resist pin")
+RIPOSTE = bit("riposte")
+SAVAGERY = bit("savagery")
+
+
+class Features:
+    """Features granted to one actor, with a grant count per name."""
+
+    __slots__ = ("counts", "mask")
+
+    def __init__(self, names=()):
+        self.counts = {}
+        self.mask = 0
+        self.update(names)
+
+    def add(self, name):
+        count = self.counts.get(name, 0)
+        self.counts[name] = count + 1
+        if not count:
+            self.mask |= bit(name)
+
+    def update(self, names):
+        for name in names:
+            self.add(name)
+
+    def remove(self, name):
+        """Take back one grant of `name`; the feature stays while another
+        source still grants it. Names never granted are ignored."""
+        count = self.counts.get(name)
+        if count is None:
+            return
+        if count > 1:
+            self.counts[name] = count - 1
+        else:
+            del self.counts[name]
+            self.mask &= ~bit(name)
+
+    def discard(self, names):
+        for name in names:
+            self.remove(name)
+
+    def __contains__(self, name):
+        return bool(self.mask & BITS.get(name, 0))
+
+    def __iter__(self):
+        return iter(self.counts)
+
+    def __len__(self):
+        return len(self.counts)
+
+    def __repr__(self):
+        return f"Features({list(self.counts)})"
+
+    def getstate(self):
+        return dict(self.counts), self.mask
+
+    def setstate(self, state):
+        counts, self.mask = state
+        self.counts = dict(counts)
@@ -3,6 +3,7 @@
 import h_actors
 import h_scenario
 import h_encounter
+import h_replay
 
 def main ():
     show_title_and_intro()
@@ -48,8 +49,13 @@ def new_game():
     game_state["start_scene"] = choice
     return game_state, party
 
-def setup_gamestate():
+# Every campaign is recorded here so a session can be replayed (h_replay).
+REPLAY_FILE = "last_session.replay.json"
+
+def setup_gamestate(seed=None):
     game_state = {}
+    # the campaign's random streams are seeded from this (None: a fresh seed)
+    game_state["seed"] = seed
     return game_state
 
 def show_tutorial():
@@ -128,63 +134,48 @@ def run_game (game_state, party):
 
     h_encounter.report(f"You've made your way to the halls of the mountain king.\n\nYou stand in the feeble sun before the bleached walls lined with faded murals, their stories lost to time.\n\nWhy have you come?\n\nPerhaps it doesn't matter now...")
 
-    current = game_state.get("start_scene", "100")
-    while current != "END":
-        manage = input("Manage party before next scene? (y/n): ")
-        if manage.lower() == "y":
-            party = manage_party(party)
-        current, party = h_scenario.scenario_list[current](game_state, party)
+    recording = h_replay.start_recording(game_state.get("seed"), game_state.get("start_scene", "100"))
+    try:
+        party = h_scenario.run_campaign(game_state, party, manage_party)
+    finally:
+        h_replay.stop_recording()
+        recording.save(game_state.get("replay_file", REPLAY_FILE))
     h_encounter.major_report ("MADNESS REIGNS IN THE HALL OF THE MOUNTAIN KING.")
 
 
 def manage_party(party):
     while True:
-        print("\nParty management:")
-        print("1.\tReorder party")
-        print("2.\tSwap weapon set")
-        print("3.\tCheck stats")
-        print("4.\tDone")
-        try:
-            choice = int(input("Choose option: "))
-        except ValueError:
-            choice = 4
+        menu = [
+            "\nParty management:",
+            "1.\tReorder party",
+            "2.\tSwap weapon set",
+            "3.\tCheck stats",
+            "4.\tDone",
+        ]
+        choice = h_replay.choose("manage option", 4, "Choose option: ", menu, default=4, retry=True)
 
         if choice == 1:
             remaining = list(party)
             new_order = []
             while remaining:
-                print("Choose the next party member in line:")
                 options_index = {}
+                menu = ["Choose the next party member in line:"]
                 for i, actor in enumerate(remaining, start=1):
-                    print(f"{i}.\t{actor.name}")
+                    menu.append(f"{i}.\t{actor.name}")
                     options_index[i] = actor
-                try:
-                    choice_index = int(input("Choose actor: "))
-                except ValueError:
-                    choice_index = 1
-                if choice_index > len(remaining):
-                    choice_index = len(remaining)
-                elif choice_index < 1:
-                    choice_index = 1
+                choice_index = h_replay.choose("party order", len(remaining), "Choose actor: ", menu)
                 chosen = options_index[choice_index]
                 new_order.append(chosen)
                 remaining.remove(chosen)
             party = new_order
 
         elif choice == 2:
-            print("Choose a party member to swap weapon set:")
             options_index = {}
+            menu = ["Choose a party member to swap weapon set:"]
             for i, actor in enumerate(party, start=1):
-                print(f"{i}.\t{actor.name}")
+                menu.append(f"{i}.\t{actor.name}")
                 options_index[i] = actor
-            try:
-                choice_index = int(input("Choose actor: "))
-            except ValueError:
-                choice_index = 1
-            if choice_index > len(party):
-                choice_index = len(party)
-            elif choice_index < 1:
-                choice_index = 1
+            choice_index = h_replay.choose("swap actor", len(party), "Choose actor: ", menu)
             chosen = options_index[choice_index]
             if chosen.arms_slot2 is None:
                 h_encounter.report(f"{chosen.name} has no secondary weapon to swap.")
@@ -223,5 +214,5 @@ def manage_party(party):
 # RUNNING
 # ---------------------------------------------------------------------------
 
-main ()
-
+if __name__ == "__main__":
+    main ()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+
+import argparse
+import copy
+import gc
+import sys
+import tracemalloc
+import types
+
+import h_actors
+import h_encounter
+import h_events
+import h_scenario
+
+# ---------------------------------------------------------------------------
+# Memory per live session
+# ---------------------------------------------------------------------------
+#
+# A hosted session holds its own copy of the party, the enemies spawned
+# for the scene it is in and one encounter_state. This builds `count` of them, keeps
+# them alive and reports the bytes tracemalloc sees per session, along with
+# the size of single actor and equipment objects (instance plus __dict__,
+# where there is one). The sessions are built three ways, so the layouts
+# can be compared in the same tree:
+#
+#   - as the game builds them: slotted actors, enemies spawned from their
+#     templates
+#   - with the enemies deep-copied, as rosters were before templates
+#   - with the enemies deep-copied and every actor, arms, armor, headgear
+#     and archetype swapped for a stand-in that keeps its attributes in a
+#     __dict__, as they did before __slots__
+#
+#     python h_memory.py --sessions 200
+
+# classes whose instances unslotted() swaps for stand-ins
+SLOTTED = (h_actors.Actor, h_actors.Arms, h_actors.Armor, h_actors.Headgear, h_actors.Archetype)
+
+_standins = {}
+
+
+def _standin(cls):
+    """`cls` without __slots__: the same methods and class attributes,
+    with instances keeping their attributes in a __dict__."""
+    standin = _standins.get(cls)
+    if standin is None:
+        namespace = {}
+        for klass in reversed(cls.__mro__[:-1]):
+            for name, value in vars(klass).items():
+                if name in ("__slots__", "__dict__", "__weakref__") or isinstance(value, types.MemberDescriptorType):
+                    continue
+                namespace[name] = value
+        standin = _standins[cls] = type(cls.__name__, (), namespace)
+    return standin
+
+
+def unslotted(obj):
+    """A copy of a slotted actor or item whose attributes live in a
+    __dict__; the items an actor holds are copied the same way."""
+    clone = object.__new__(_standin(type(obj)))
+    for klass in type(obj).__mro__:
+        for name in getattr(klass, "__slots__", ()):
+            if not hasattr(obj, name):
+                continue
+            value = getattr(obj, name)
+            if isinstance(value, SLOTTED):
+                value = unslotted(value)
+            clone.__dict__[name] = value
+    return clone
+
+
+def live_session(seed, spawn=True, slots=True):
+    party = copy.deepcopy(h_actors.get_default_party())
+    scene = h_scenario.Scene("memory")
+    templates = h_scenario.scene_500.roster_options[0]
+    if spawn:
+        scene.roster = [template.spawn() for template in templates]
+    else:
+        scene.roster = copy.deepcopy(list(templates))
+    if not slots:
+        party = [unslotted(actor) for actor in party]
+        scene.roster = [unslotted(actor) for actor in scene.roster]
+    for actor in party + scene.roster:
+        actor.refresh()
+    return h_encounter.new_encounter(scene, party, seed)
+
+
+def object_size(obj):
+    size = sys.getsizeof(obj)
+    if hasattr(obj, "__dict__"):
+        size += sys.getsizeof(obj.__dict__)
+    return size
+
+
+def session_bytes(count, spawn=True, slots=True):
+    """tracemalloc bytes per session with `count` sessions alive."""
+    live_session(0, spawn, slots)
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    sessions = [live_session(seed, spawn, slots) for seed in range(count)]
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before) // count, sessions
+
+
+def measure(count):
+    previous_sink = h_events.set_sink(None)
+    try:
+        unslotted_bytes, unslotted_sessions = session_bytes(count, spawn=False, slots=False)
+        copied, _ = session_bytes(count, spawn=False)
+        spawned, sessions = session_bytes(count)
+    finally:
+        h_events.set_sink(previous_sink)
+
+    party = sessions[0]["party"]
+    plain = unslotted_sessions[0]["party"]
+    return {
+        "sessions": len(sessions),
+        "bytes per session": spawned,
+        "bytes per session, deep-copied enemies": copied,
+        "bytes per session, deep-copied enemies, no __slots__": unslotted_bytes,
+        "actor": object_size(party[0]),
+        "arms": object_size(party[0].arms_slot1),
+        "armor": object_size(party[0].armor),
+        "headgear": object_size(party[0].headgear),
+        "archetype": object_size(party[0].archetype),
+        "actor, no __slots__": object_size(plain[0]),
+        "arms, no __slots__": object_size(plain[0].arms_slot1),
+        "archetype, no __slots__": object_size(plain[0].archetype),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bytes per live session.")
+    parser.add_argument("--sessions", type=int, default=200, help="sessions kept alive at once")
+    args = parser.parse_args()
+
+    for name, value in measure(args.sessions).items():
+        print(f"{name}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+# ---------------------------------------------------------------------------
+# Exact odds
+# ---------------------------------------------------------------------------
+#
+# stat_test rolls d20 + adder against difficulty + 10 (success) and
+# difficulty + 20 (critical), so its outcome only depends on the margin
+# adder - difficulty. Attack damage is power plus a few small dice plus a
+# flat bonus on a critical, less the target's mitigation and never below 0.
+# Both distributions are computed here in closed form and cached, so code
+# that only needs a probability or an expected value can look it up
+# instead of rolling.
+#
+# Probabilities are floats; TEST_COUNTS keeps the exact d20 face counts.
+
+D20 = 20
+
+# Margins below MIN_MARGIN always fail, margins from MAX_MARGIN up always
+# crit.
+MIN_MARGIN = -29
+MAX_MARGIN = 19
+
+
+def _test_counts(margin):
+    # faces with roll + margin >= 20 crit, >= 10 succeed
+    critical = min(max(margin + 1, 0), D20)
+    at_least_success = min(max(margin + 11, 0), D20)
+    return (D20 - at_least_success, at_least_success - critical, critical)
+
+
+# (failure, success, critical) face counts out of 20, by margin
+TEST_COUNTS = {margin: _test_counts(margin) for margin in range(MIN_MARGIN, MAX_MARGIN + 1)}
+TEST_ODDS = {margin: tuple(count / D20 for count in counts) for margin, counts in TEST_COUNTS.items()}
+
+
+def test_odds(adder, difficulty):
+    """(failure, success, critical) probabilities of stat_test(adder, difficulty)."""
+    margin = adder - difficulty
+    if margin < MIN_MARGIN:
+        margin = MIN_MARGIN
+    elif margin > MAX_MARGIN:
+        margin = MAX_MARGIN
+    return TEST_ODDS[margin]
+
+
+def pass_chance(adder, difficulty):
+    """Chance of a success or a critical."""
+    failure, success, critical = test_odds(adder, difficulty)
+    return success + critical
+
+
+# How each attack deals damage. "adder" changes the attack test, "power"
+# adds the attacker's current power, "dice" are rolled on every attack,
+# "success"/"critical" are (flat bonus, extra dice) on that result and
+# "mitigation" is the target stat subtracted (None: stab ignores armor).
+# "charge" attacks get the charge die; prowl gets its ambush die against a
+# target that is in melee while the attacker is not. Without "momentum"
+# the attacker's momentum is spent before the roll.
+ATTACKS = {
+    "fight": {"adder": 0, "power": True, "dice": (4,), "success": (0, ()), "critical": (4, ()), "mitigation": "reduction", "charge": True, "momentum": True},
+    "smash": {"adder": -4, "power": True, "dice": (4,), "success": (2, ()), "critical": (6, ()), "mitigation": "reduction", "charge": True, "momentum": True},
+    "hack and slash": {"adder": 4, "power": True, "dice": (4,), "success": (0, ()), "critical": (4, ()), "mitigation": "reduction", "charge": True, "momentum": True},
+    "prowl": {"adder": 0, "power": True, "dice": (4,), "success": (0, ()), "critical": (4, ()), "mitigation": "reduction", "charge": False, "momentum": True},
+    "stab": {"adder": -2, "power": True, "dice": (4,), "success": (0, (4,)), "critical": (4, ()), "mitigation": None, "charge": True, "momentum": True},
+    "skirmish": {"adder": 0, "power": False, "dice": (6,), "success": (0, ()), "critical": (4, ()), "mitigation": "reduction", "charge": False, "momentum": False},
+}
+
+_dice_pmfs = {(): {0: 1.0}}
+_damage_pmfs = {}
+
+
+def dice_pmf(dice):
+    """Distribution of the sum of dice given by their sizes, e.g. (4, 4)."""
+    dice = tuple(sorted(dice))
+    pmf = _dice_pmfs.get(dice)
+    if pmf is None:
+        rest = dice_pmf(dice[1:])
+        sides = dice[0]
+        pmf = {}
+        for total, p in rest.items():
+            for face in range(1, sides + 1):
+                pmf[total + face] = pmf.get(total + face, 0.0) + p / sides
+        _dice_pmfs[dice] = pmf
+    return pmf
+
+
+def damage_pmf(power, mitigation, dice=(4,), bonus=0):
+    """Distribution of max(0, power + bonus + dice - mitigation), as it
+    reaches damage()."""
+    key = (power + bonus - mitigation, tuple(sorted(dice)))
+    pmf = _damage_pmfs.get(key)
+    if pmf is None:
+        flat = key[0]
+        pmf = {}
+        for total, p in dice_pmf(key[1]).items():
+            amount = max(0, flat + total)
+            pmf[amount] = pmf.get(amount, 0.0) + p
+        _damage_pmfs[key] = pmf
+    return pmf
+
+
+def expected(pmf):
+    return sum(amount * p for amount, p in pmf.items())
+
+
+def attack_pmf(adder, difficulty, power, mitigation, action="fight", extra_dice=()):
+    """Odds of one attack. `adder` and `difficulty` are the modified test
+    values (see h_actions.check_combat_modifiers) before the action's own
+    adjustment, `mitigation` is what the target subtracts from the damage
+    and `extra_dice` are charge or ambush dice.
+
+    Returns a dict with the failure/success/critical probabilities, the
+    damage distribution of a success and of a critical, and "damage", the
+    overall distribution with misses counted as 0."""
+    attack = ATTACKS[action]
+    failure, success, critical = test_odds(adder + attack["adder"], difficulty)
+    base_dice = attack["dice"] + tuple(extra_dice)
+    if not attack["power"]:
+        power = 0
+
+    bonus, dice = attack["success"]
+    on_success = damage_pmf(power, mitigation, base_dice + dice, bonus)
+    bonus, dice = attack["critical"]
+    on_critical = damage_pmf(power, mitigation, base_dice + dice, bonus)
+
+    overall = {0: failure} if failure else {}
+    for pmf, weight in ((on_success, success), (on_critical, critical)):
+        if weight:
+            for amount, p in pmf.items():
+                overall[amount] = overall.get(amount, 0.0) + p * weight
+
+    return {
+        "failure": failure,
+        "success": success,
+        "critical": critical,
+        "on_success": on_success,
+        "on_critical": on_critical,
+        "damage": overall,
+        "expected": expected(overall),
+    }
+
+
+def fate_chance(fortune, amount):
+    """Chance to be spared by fortune when `amount` damage would knock an
+    actor out (the fate check in h_actions.damage)."""
+    return pass_chance(fortune, 10 + amount)
+
+
+def ko_chance(stamina, fortune, pmf):
+    """Chance that damage drawn from `pmf` knocks out an actor with
+    `stamina` left, fate check included."""
+    chance = 0.0
+    for amount, p in pmf.items():
+        if amount >= stamina:
+            chance += p * (1 - fate_chance(fortune, amount))
+    return chance
+
+
+def attack_odds(actor, encounter_state, target, action="fight"):
+    """attack_pmf for `actor` attacking `target` right now: status
+    modifiers, charge and ambush dice, diabolic weapon and the target's
+    current mitigation are all taken into account. Adds "ko", the chance
+    the attack knocks the target out."""
+    attack = ATTACKS[action]
+    adder, difficulty = h_actions.check_combat_modifiers(actor, encounter_state, target)
+
+    table = encounter_state["table"]
+    actor_status = table.status[table.slot[actor]]
+    if actor_status & h_state.MOMENTUM and not attack["momentum"]:
+        adder -= h_actions.combat_modifiers(h_state.MOMENTUM, 0)[0]
+    actor_melee = actor_status & h_state.MELEE
+    target_melee = table.status[table.slot[target]] & h_state.MELEE
+    extra_dice = ()
+    if attack["charge"] and not actor_melee and actor.features.mask & h_features.CHARGE and not target.features.mask & h_features.REACH:
+        extra_dice = (4,)
+    elif action == "prowl" and target_melee and not actor_melee:
+        extra_dice = (4,)
+
+    default_mitigation = target.current_reduction if attack["mitigation"] else 0
+    mitigation = h_actions.get_attack_mitigation(actor, target, encounter_state, default_mitigation)
+
+    odds = attack_pmf(adder, difficulty, actor.current_power, mitigation, action, extra_dice)
+    odds["ko"] = ko_chance(target.current_stamina, target.current_fortune, odds["damage"])
+    return odds
+
+
+# imported last, see h_effects
+import h_actions
+import h_features
+import h_state
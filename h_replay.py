@@ -0,0 +1,272 @@
+import os
+
+# ---------------------------------------------------------------------------
+# Replays
+# ---------------------------------------------------------------------------
+#
+# Everything random in an encounter or campaign comes from the seeded
+# streams in h_rng, so a session is fully described by its seed, the stats
+# rolled for the enemies when h_actors was imported, and the choices the
+# player made. Every prompt that decides something goes through choose()
+# or confirm(), which record the answer while a recording is running and
+# answer from the log while one is being played back.
+#
+# A log is a small dict:
+#
+#   {"seed": ..., "start": "100", "roster": [...], "enemies": {...},
+#    "decisions": [["option", 2], ["target", 1], ["route", 3], ...]}
+#
+# Playback can fast-forward: nothing is rendered until the session's Nth
+# turn, after which the normal sink takes over again.
+
+# Stats of the enemy templates, which are rolled at import time. Current
+# values are saved too, as logs from before templates were refreshed at
+# import hold them.
+ROLLED_STATS = (
+    "stamina", "skill", "defense", "fortune", "power", "reduction", "insulation",
+    "current_stamina", "current_skill", "current_defense", "current_fortune",
+    "current_power", "current_reduction", "current_insulation",
+)
+
+
+class ReplayError(Exception):
+    pass
+
+
+class Recording:
+    def __init__(self, seed, enemies, start=None):
+        self.seed = seed
+        self.enemies = enemies
+        self.start = start
+        self.roster = None
+        self.decisions = []
+
+    def to_dict(self):
+        return {
+            "seed": self.seed,
+            "start": self.start,
+            "roster": self.roster,
+            "enemies": self.enemies,
+            "decisions": [list(decision) for decision in self.decisions],
+        }
+
+    def save(self, path):
+        import json
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, separators=(",", ":"))
+
+
+recording = None
+turns = 0
+_playback = None
+_position = 0
+_fast_forward = None
+_saved_sink = None
+
+
+def new_seed():
+    return int.from_bytes(os.urandom(8), "big")
+
+
+def load(path):
+    import json
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def rolled_enemies():
+    import h_actors
+    enemies = {}
+    for name, template in h_actors.ENEMY_TEMPLATES.items():
+        enemies[name] = [getattr(template, stat) for stat in ROLLED_STATS]
+    return enemies
+
+
+def restore_enemies(enemies):
+    import h_actors
+    for name, stats in enemies.items():
+        actor = h_actors.ENEMY_TEMPLATES[name]
+        for stat, value in zip(ROLLED_STATS, stats):
+            if stat in h_actors.STATS:
+                actor.set_stat(stat, value)
+            else:
+                setattr(actor, stat, value)
+
+
+# ---------------------------------------------------------------------------
+# Recording and playback
+# ---------------------------------------------------------------------------
+
+
+def start_recording(seed=None, start=None):
+    """Seed the campaign streams and record every decision from here on."""
+    global recording, turns
+    import h_actors
+    if seed is None:
+        seed = new_seed()
+    h_rng.seed_campaign(seed)
+    # the seed rolls the enemies too, so every game meets its own
+    h_actors.roll_templates(seed)
+    recording = Recording(seed, rolled_enemies(), start)
+    turns = 0
+    return recording
+
+
+def stop_recording():
+    global recording
+    finished = recording
+    recording = None
+    return finished
+
+
+def start_playback(log, until_turn=None, sink=None):
+    """Reseed from `log` and answer prompts from its decisions. With
+    `until_turn`, render nothing until that turn of the session, then hand
+    over to `sink` (by default the sink that was installed)."""
+    global _playback, _position, _fast_forward, _saved_sink, turns
+    h_rng.seed_campaign(log["seed"])
+    restore_enemies(log.get("enemies", {}))
+    _playback = [tuple(decision) for decision in log["decisions"]]
+    _position = 0
+    turns = 0
+    _saved_sink = h_events.current_sink()
+    if sink is None:
+        sink = _saved_sink
+    if until_turn is not None:
+        h_events.set_sink(h_events.NULL_SINK)
+        _fast_forward = (until_turn, sink)
+    else:
+        h_events.set_sink(sink)
+
+
+def stop_playback():
+    global _playback, _fast_forward, _saved_sink
+    h_events.set_sink(_saved_sink)
+    _playback = None
+    _fast_forward = None
+    _saved_sink = None
+
+
+def replaying():
+    return _playback is not None and _position < len(_playback)
+
+
+def turn_started():
+    """Count a turn of the session; ends a fast-forward."""
+    global turns, _fast_forward
+    turns += 1
+    if _fast_forward is not None and turns >= _fast_forward[0]:
+        h_events.set_sink(_fast_forward[1])
+        _fast_forward = None
+
+
+def _next_decision(point):
+    global _position
+    recorded_point, value = _playback[_position]
+    if recorded_point != point:
+        raise ReplayError(f"decision {_position}: log has {recorded_point!r}, game asks for {point!r}")
+    _position += 1
+    return value
+
+
+def _record(point, value):
+    if recording is not None:
+        recording.decisions.append((point, value))
+    return value
+
+
+def show(menu):
+    """Print a menu unless the answer comes from a log."""
+    if not replaying():
+        for line in menu:
+            print(line)
+
+
+def choose(point, count, prompt, menu=(), allow_zero=False, default=1, retry=False):
+    """Numbered choice between 1 and `count` (0 too with `allow_zero`).
+    Input that is not a number picks `default`. Out of range input is
+    clamped, or with `retry` the menu is shown and asked again."""
+    if replaying():
+        return _record(point, _next_decision(point))
+
+    show(menu)
+    while True:
+        try:
+            choice_index = int(input(prompt))
+        except ValueError:
+            choice_index = default
+
+        if (allow_zero and choice_index == 0) or 1 <= choice_index <= count:
+            break
+        if not retry:
+            choice_index = min(max(choice_index, 1), count)
+            break
+        show(menu)
+    return _record(point, choice_index)
+
+
+def confirm(point, prompt):
+    """y/n question; True for yes."""
+    if replaying():
+        return bool(_record(point, _next_decision(point)))
+    answer = input(prompt)
+    return bool(_record(point, int(answer.lower() == "y")))
+
+
+# ---------------------------------------------------------------------------
+# Sessions
+# ---------------------------------------------------------------------------
+
+
+def record_encounter(scene, party, seed=None):
+    """Play an encounter (interactively) and return (party, log)."""
+    start_recording(seed)
+    recording.roster = [actor.name for actor in scene.roster]
+    try:
+        party = h_encounter.run_encounter(scene, party)
+    finally:
+        log = stop_recording().to_dict()
+    return party, log
+
+
+def replay_encounter(log, scene, party, until_turn=None, sink=None):
+    """Re-run a recorded encounter at full speed, stopping once `until_turn`
+    turns have been taken (None runs it to the end, including the
+    post-encounter recovery). Nothing is rendered unless a sink is given.
+    Returns (encounter_phase, encounter_state)."""
+    roster = [actor.name for actor in scene.roster]
+    if log.get("roster") is not None and log["roster"] != roster:
+        raise ReplayError(f"recorded roster {log['roster']} does not match {roster}")
+
+    previous = h_events.set_sink(sink)
+    start_playback(log)
+    try:
+        encounter_state = h_encounter.begin_encounter(scene, party)
+        encounter_phase = h_encounter.play_encounter(encounter_state, until_turn=until_turn)
+        if encounter_phase == "END":
+            h_encounter.finish_encounter(scene, party, encounter_state)
+    finally:
+        stop_playback()
+        h_events.set_sink(previous)
+    return encounter_phase, encounter_state
+
+
+def replay_campaign(log, party, manage_party=None, until_turn=None, sink=None):
+    """Replay a recorded campaign from its start scene with the party it
+    started with; rendering resumes at turn `until_turn` of the session.
+    Pass the manage_party used when recording (h_main.manage_party) if the
+    log has party management in it. Returns the surviving party."""
+    import h_scenario
+    start_playback(log, until_turn, sink)
+    try:
+        party = h_scenario.run_campaign({"start_scene": log["start"]}, party, manage_party)
+    finally:
+        stop_playback()
+    return party
+
+
+# imported last, see h_effects; the content modules (h_actors, h_scenario)
+# are only imported when a session needs them
+import h_encounter
+import h_events
+import h_rng
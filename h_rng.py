@@ -0,0 +1,166 @@
+import random
+
+# ---------------------------------------------------------------------------
+# Random streams
+# ---------------------------------------------------------------------------
+#
+# Randomness is split into independent streams so that, say, an AI policy
+# drawing one extra number does not shift every later attack roll:
+#
+#   combat - attack, damage and test rolls, item and spell effects
+#   ai     - decisions taken by logic profiles
+#   loot   - boons, item rewards and other campaign rewards
+#   events - special events, rolled rosters and narration flavour
+#
+# Encounters read their streams from `encounter_state["rng"]`; the campaign
+# uses `campaign`. Unless seeded, every stream is the `random` module itself,
+# which keeps the game drawing exactly the numbers it always has.
+
+STREAMS = ("combat", "ai", "loot", "events")
+
+# Dice pools
+#
+# randint(1, n) for the dice the rules roll all the time is the most
+# frequent draw by far. A DicePool draws those in batches instead: one
+# getrandbits call gives up to DICE_BATCH random bytes, bytes.translate
+# drops the few that would bias the die and maps the rest onto its faces,
+# and rolls are popped from the batch. Any other call goes to the Mersenne
+# Twister as usual. The rolls differ from a plain `random.Random` with the
+# same seed, so pooled streams are opt-in (RngStreams(seed, pooled=True));
+# the balance pass in h_simulation uses them unless asked for plain dice.
+
+DICE = (4, 6, 20)
+FIRST_BATCH = 64
+DICE_BATCH = 4096
+
+
+def _faces(sides):
+    limit = 256 - 256 % sides
+    table = bytes(byte % sides + 1 for byte in range(256))
+    return table, bytes(range(limit, 256))
+
+
+FACES = {sides: _faces(sides) for sides in DICE}
+
+
+class DicePool(random.Random):
+    """`random.Random` serving d4, d6 and d20 rolls from pre-drawn batches."""
+
+    def seed(self, a=None, version=2):
+        super().seed(a, version)
+        self.pools = {sides: [] for sides in DICE}
+        self.batch = FIRST_BATCH
+
+    def randint(self, a, b):
+        if a == 1:
+            pool = self.pools.get(b)
+            if pool:
+                return pool.pop()
+            if pool is not None:
+                self.fill(b, pool)
+                return pool.pop()
+        return super().randint(a, b)
+
+    def fill(self, sides, pool):
+        # batches grow from FIRST_BATCH, so short-lived streams (one per
+        # simulated encounter) do not draw thousands of unused rolls
+        size = self.batch
+        self.batch = min(2 * size, DICE_BATCH)
+        table, biased = FACES[sides]
+        batch = self.getrandbits(8 * size).to_bytes(size, "little")
+        pool.extend(batch.translate(table, biased))
+
+    def getstate(self):
+        pools = {sides: tuple(pool) for sides, pool in self.pools.items()}
+        return super().getstate(), pools, self.batch
+
+    def setstate(self, state):
+        state, pools, self.batch = state
+        super().setstate(state)
+        self.pools = {sides: list(pool) for sides, pool in pools.items()}
+
+
+class RngStreams:
+    __slots__ = STREAMS
+
+    def __init__(self, seed=None, pooled=False):
+        """Independent `random.Random` streams derived from one seed; with
+        `pooled` they are DicePools."""
+        master = random.Random(seed)
+        kind = DicePool if pooled else random.Random
+        for name in STREAMS:
+            setattr(self, name, kind(master.getrandbits(64)))
+
+    @classmethod
+    def shared(cls, source):
+        """Streams that all draw from one generator."""
+        streams = cls.__new__(cls)
+        for name in STREAMS:
+            setattr(streams, name, source)
+        return streams
+
+    def getstate(self):
+        return tuple(getattr(self, name).getstate() for name in STREAMS)
+
+    def setstate(self, state):
+        for name, stream_state in zip(STREAMS, state):
+            getattr(self, name).setstate(stream_state)
+
+
+GLOBAL = RngStreams.shared(random)
+
+campaign = GLOBAL
+
+
+def make_streams(rng=None):
+    """Streams for a seed, a `random.Random` (seeding fresh streams from it)
+    or existing streams; None gives the shared global streams."""
+    if rng is None:
+        return GLOBAL
+    if isinstance(rng, RngStreams):
+        return rng
+    if isinstance(rng, random.Random):
+        return RngStreams(rng.getrandbits(64))
+    return RngStreams(rng)
+
+
+# Content
+#
+# Enemy templates roll their stats once, when they are built, from a stream
+# seeded with a content seed rather than from the `random` module, so the
+# same content seed gives the same enemies in every process, forked or not.
+# h_content.roll_templates(seed) rolls them again for another seed.
+
+CONTENT_SEED = 0
+
+
+def content_stream(seed=None):
+    """The stream enemy stats are rolled from; CONTENT_SEED by default."""
+    return random.Random(CONTENT_SEED if seed is None else seed)
+
+
+def seed_campaign(seed=None):
+    """Give the campaign its own streams; returns them."""
+    global campaign
+    campaign = make_streams(seed)
+    return campaign
+
+
+def streams(encounter_state):
+    return encounter_state.get("rng", campaign)
+
+
+def combat(encounter_state):
+    return encounter_state.get("rng", campaign).combat
+
+
+def ai(encounter_state):
+    return encounter_state.get("rng", campaign).ai
+
+
+def loot(encounter_state):
+    return encounter_state.get("rng", campaign).loot
+
+
+def events(encounter_state):
+    return encounter_state.get("rng", campaign).events
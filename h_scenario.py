@@ -1,8 +1,9 @@
 import types
-import random
+import h_rng
 import h_actors
 import h_encounter
 import h_actions
+import h_replay
 
 class Scene:
     def __init__(self, name):
@@ -11,7 +12,20 @@ class Scene:
         self.roster = []
         self.event = None
         self.aftermath = ""
-        self.roster_options = []
+        # returns the roster options; called the first time they are asked
+        # for, so importing the scenes does not build the enemy templates
+        self.rosters = None
+        self._roster_options = None
+
+    @property
+    def roster_options(self):
+        if self._roster_options is None:
+            self._roster_options = self.rosters() if self.rosters else []
+        return self._roster_options
+
+    @roster_options.setter
+    def roster_options(self, options):
+        self._roster_options = options
 
 
 # ---------------------------------------------------------------------------
@@ -106,24 +120,34 @@ v             ^
 # ---------------------------------------------------------------------------
 
 
+# Two of these join every rolled roster as reinforcements. Roster options
+# list enemy templates and this pool their names; roll_roster spawns the
+# actors that actually fight.
+extra_pool = [
+    "minion_disruptive",
+    "minion_aggressive",
+    "minion_defensive",
+    "minion_reactive",
+    "minion_cutthroat",
+    "minion_ravager",
+    "minion_banneret",
+    "minion_sentinel",
+    "minion_occultist",
+    "minion_dragoon",
+]
+
+
+def roll_roster(roster_option, rng=None):
+    rng = rng or h_rng.campaign.events
+    base_roster = list(roster_option)
+    base_roster.append(h_actors.ENEMY_TEMPLATES[rng.choice(extra_pool)])
+    base_roster.append(h_actors.ENEMY_TEMPLATES[rng.choice(extra_pool)])
+    return [template.spawn() for template in base_roster]
+
+
 def _resolve_encounter(scene, party, grant_rewards=True):
     if scene.roster_options:
-        base_roster = list(random.choice(scene.roster_options))
-        extra_pool = [
-            h_actors.minion_disruptive,
-            h_actors.minion_aggressive,
-            h_actors.minion_defensive,
-            h_actors.minion_reactive,
-            h_actors.minion_cutthroat,
-            h_actors.minion_ravager,
-            h_actors.minion_banneret,
-            h_actors.minion_sentinel,
-            h_actors.minion_occultist,
-            h_actors.minion_dragoon,
-        ]
-        base_roster.append(random.choice(extra_pool))
-        base_roster.append(random.choice(extra_pool))
-        scene.roster = base_roster
+        scene.roster = roll_roster(h_rng.campaign.events.choice(scene.roster_options))
 
     party = h_encounter.run_encounter(scene, party)
 
@@ -141,14 +165,15 @@ def _resolve_non_encounter(scene, party):
     return party
 
 
-def _post_encounter_rewards(party, guaranteed=False):
+def _post_encounter_rewards(party, guaranteed=False, rng=None):
     if not party:
         return
+    rng = rng or h_rng.campaign.loot
 
-    if guaranteed or random.randint(1, 4) == 1:
-        h_actors.apply_boon(party)
+    if guaranteed or rng.randint(1, 4) == 1:
+        h_actors.apply_boon(party, rng)
 
-    if guaranteed or random.randint(1, 4) == 1:
+    if guaranteed or rng.randint(1, 4) == 1:
         consumables = [
             h_actors.Elixir,
             h_actors.FireBomb,
@@ -156,7 +181,7 @@ def _post_encounter_rewards(party, guaranteed=False):
             h_actors.SaintsFlesh,
             h_actors.UnicornDust,
         ]
-        awarded = random.choice(consumables)
+        awarded = rng.choice(consumables)
         party_inventory = party[0].inventory if party else None
         if party_inventory and party_inventory.add_item(awarded):
             h_encounter.report(f"The party finds {awarded.name}.")
@@ -179,7 +204,7 @@ def start_call(game_state, party):
     if scene.aftermath:
         h_encounter.major_report(scene.aftermath)
 
-    h_actors.apply_boon(party)
+    h_actors.apply_boon(party, h_rng.campaign.loot)
 
     game_state = "last"
     return game_state, party
@@ -213,7 +238,7 @@ def choose_next(options):
         display = f"{label} - {desc}" if desc else label
         formatted[display] = next_scene
 
-    choice = h_actions.choose_options(formatted)
+    choice = h_actions.choose_options(formatted, point="route")
     return choice if choice else "END"
 
 
@@ -254,7 +279,7 @@ def scene_115_call(game_state, party):
     choice = h_actions.choose_options(prayer_options)
     if choice == "offer":
         h_encounter.report("A hush settles over the party. A boon stirs within the party.")
-        h_actors.apply_boon(party)
+        h_actors.apply_boon(party, h_rng.campaign.loot)
     else:
         h_encounter.report("You keep your steps light and move on.")
 
@@ -318,7 +343,7 @@ def scene_130_call(game_state, party):
     choice = h_actions.choose_options(sigil_options)
     if choice == "study":
         h_encounter.report("The patterns settle your nerves. A boon stirs within the party.")
-        h_actors.apply_boon(party)
+        h_actors.apply_boon(party, h_rng.campaign.loot)
     else:
         h_encounter.report("You leave the sigils undisturbed.")
 
@@ -551,12 +576,12 @@ def scene_250_call(game_state, party):
 
     if choice == "offer":
         h_encounter.report("The offering is accepted. A boon stirs within the party.")
-        h_actors.apply_boon(party)
+        h_actors.apply_boon(party, h_rng.campaign.loot)
     elif choice == "destroy":
         party_inventory = party[0].inventory if party else None
         items = party_inventory.get_items() if party_inventory else []
         if items:
-            lost_index = random.randint(0, len(items) - 1)
+            lost_index = h_rng.campaign.loot.randint(0, len(items) - 1)
             lost_item = items[lost_index]
             party_inventory.remove_item(lost_index)
             h_encounter.report(f"The shrine shatters. {lost_item.name} is lost in the ruin.")
@@ -774,7 +799,7 @@ def scene_350_call(game_state, party):
     choice = h_actions.choose_options(relic_options)
     if choice == "search":
         h_encounter.report("A relic of resolve lingers here. A boon stirs within the party.")
-        h_actors.apply_boon(party)
+        h_actors.apply_boon(party, h_rng.campaign.loot)
     else:
         h_encounter.report("You leave the relics untouched.")
 
@@ -909,7 +934,7 @@ last.aftermath = "Only the drip of water answers you now. The castle feels older
 
 scene_100 = Scene("Entering the gates")
 scene_100.description = "A sagging stone gate yawns open, its arch cracked and black with age in the lower hall."
-scene_100.roster_options = [
+scene_100.rosters = lambda: [
     [h_actors.minion_disruptive, h_actors.minion_aggressive, h_actors.minion_reactive],
     [h_actors.minion_disruptive_2, h_actors.minion_aggressive_2, h_actors.minion_reactive_2],
     [h_actors.minion_disruptive, h_actors.minion_reactive, h_actors.minion_cutthroat],
@@ -923,7 +948,7 @@ scene_100.aftermath = (
 
 scene_105 = Scene("The drowned trench")
 scene_105.description = "A once-grand corridor lies flooded where a skylight collapsed, mosaics submerged under rain." 
-scene_105.roster_options = [
+scene_105.rosters = lambda: [
     [h_actors.minion_cutthroat, h_actors.minion_reactive, h_actors.minion_disruptive_3],
     [h_actors.minion_disruptive_3, h_actors.minion_aggressive, h_actors.minion_reactive_3],
     [h_actors.minion_ravager, h_actors.minion_aggressive_3],
@@ -932,7 +957,7 @@ scene_105.aftermath = "Water sloshes in your boots, cold and heavy."
 
 scene_110 = Scene("The outer wards")
 scene_110.description = "A narrow ward of bare stone lies choked with rubble; torn banners cling to damp walls."
-scene_110.roster_options = [
+scene_110.rosters = lambda: [
     [h_actors.minion_cutthroat, h_actors.minion_aggressive, h_actors.minion_reactive],
     [h_actors.minion_disruptive, h_actors.minion_reactive, h_actors.minion_aggressive_2],
     [h_actors.minion_ravager, h_actors.minion_cutthroat],
@@ -958,7 +983,7 @@ scene_130.aftermath = "The runes feel like a stare you cannot return."
 
 scene_135 = Scene("The sigil crawl")
 scene_135.description = "A narrow service crawl winds beneath the upper hall, plaster cracked and gilding long faded." 
-scene_135.roster_options = [
+scene_135.rosters = lambda: [
     [h_actors.minion_occultist, h_actors.minion_reactive_2],
     [h_actors.minion_disruptive, h_actors.minion_cutthroat],
 ]
@@ -986,7 +1011,7 @@ scene_180.aftermath = "Someone fled through here, and they were not alone."
 
 scene_190 = Scene("The red tunnel")
 scene_190.description = "A low stone tunnel is streaked with rust and mineral bleed, the air metallic and stale."
-scene_190.roster_options = [
+scene_190.rosters = lambda: [
     [h_actors.minion_ravager, h_actors.minion_aggressive_2, h_actors.minion_reactive_2],
     [h_actors.minion_cutthroat, h_actors.minion_disruptive_2, h_actors.minion_aggressive],
 ]
@@ -994,7 +1019,7 @@ scene_190.aftermath = "The tunnel seems to remember old blood."
 
 scene_200 = Scene("The courtyard")
 scene_200.description = "The salt catacombs open into a hollow of pale rock, its floor strewn with broken weapons and bone."
-scene_200.roster_options = [
+scene_200.rosters = lambda: [
     [h_actors.minion_defensive, h_actors.minion_reactive, h_actors.minion_banneret],
     [h_actors.minion_defensive_2, h_actors.minion_reactive_2, h_actors.minion_sentinel],
     [h_actors.minion_defensive, h_actors.minion_aggressive, h_actors.minion_reactive_3],
@@ -1004,7 +1029,7 @@ scene_200.aftermath = "Half their gear was rust and bone, half was stolen steel.
 
 scene_205 = Scene("The ash square")
 scene_205.description = "A broad iron chamber flakes red rust, its floor ringed with corroded hooks and clamps."
-scene_205.roster_options = [
+scene_205.rosters = lambda: [
     [h_actors.minion_occultist, h_actors.minion_banneret],
     [h_actors.minion_disruptive_3, h_actors.minion_reactive_2],
 ]
@@ -1012,7 +1037,7 @@ scene_205.aftermath = "The ash coats your sleeves like winter."
 
 scene_210 = Scene("The sally port")
 scene_210.description = "A low iron throat narrows like a gatehouse, its lintels blistered and rust-slick."
-scene_210.roster_options = [
+scene_210.rosters = lambda: [
     [h_actors.minion_sentinel, h_actors.minion_reactive],
     [h_actors.minion_defensive, h_actors.minion_cutthroat],
     [h_actors.minion_defensive_2, h_actors.minion_disruptive],
@@ -1025,7 +1050,7 @@ scene_215.aftermath = "The wax smells faintly of herbs."
 
 scene_225 = Scene("The gatehouse ring")
 scene_225.description = "A ring corridor of iron ribs circles the vault, its plates buckled and bleeding rust."
-scene_225.roster_options = [
+scene_225.rosters = lambda: [
     [h_actors.minion_sentinel, h_actors.minion_aggressive_2],
     [h_actors.minion_banneret, h_actors.minion_reactive],
 ]
@@ -1037,7 +1062,7 @@ scene_220.aftermath = "The wind carries distant steel on stone."
 
 scene_230 = Scene("The broken arcade")
 scene_230.description = "Collapsed iron arches litter the floor, their rivets snapped and their edges corroded."
-scene_230.roster_options = [
+scene_230.rosters = lambda: [
     [h_actors.minion_aggressive, h_actors.minion_banneret],
     [h_actors.minion_reactive_2, h_actors.minion_ravager],
     [h_actors.minion_defensive_3, h_actors.minion_disruptive_3],
@@ -1058,7 +1083,7 @@ scene_245.aftermath = "The bones clack softly in the draft."
 
 scene_255 = Scene("The blooded culvert")
 scene_255.description = "A narrow culvert runs with rusty seep, the air sharp with metal and old blood."
-scene_255.roster_options = [
+scene_255.rosters = lambda: [
     [h_actors.minion_cutthroat, h_actors.minion_disruptive],
     [h_actors.minion_ravager, h_actors.minion_reactive_3],
 ]
@@ -1066,7 +1091,7 @@ scene_255.aftermath = "The culvert stinks of old rot and rust."
 
 scene_260 = Scene("The catacomb stair")
 scene_260.description = "Salt-stone steps spiral down into a stale dark, their edges worn to powder."
-scene_260.roster_options = [
+scene_260.rosters = lambda: [
     [h_actors.minion_occultist, h_actors.minion_reactive],
     [h_actors.minion_aggressive_2, h_actors.minion_defensive_2],
     [h_actors.minion_cutthroat, h_actors.minion_disruptive_3],
@@ -1075,7 +1100,7 @@ scene_260.aftermath = "The stair smells of dust, tallow, and old whispers."
 
 scene_265 = Scene("The tomb breach")
 scene_265.description = "A cracked iron seal yawns open, cold air spilling from a sealed chamber of rusted racks."
-scene_265.roster_options = [
+scene_265.rosters = lambda: [
     [h_actors.minion_occultist, h_actors.minion_disruptive_2],
     [h_actors.minion_defensive_2, h_actors.minion_reactive_2],
 ]
@@ -1099,7 +1124,7 @@ scene_285.aftermath = "You can feel the depth beneath every step."
 
 scene_300 = Scene("Around the walls")
 scene_300.description = "The upper hall opens into a once-lavish promenade, its gilding flaked and tapestries rotted."
-scene_300.roster_options = [
+scene_300.rosters = lambda: [
     [h_actors.minion_disruptive],
     [h_actors.minion_disruptive_2],
     [h_actors.minion_reactive],
@@ -1110,7 +1135,7 @@ scene_300.aftermath = "A single fighter held the line like a ritual, not a fight
 
 scene_305 = Scene("The ruined ward")
 scene_305.description = "A grand wardroom sits gutted, its carved doors sagging and its marble floor cracked."
-scene_305.roster_options = [
+scene_305.rosters = lambda: [
     [h_actors.minion_sentinel, h_actors.minion_aggressive],
     [h_actors.minion_defensive_3, h_actors.minion_cutthroat],
 ]
@@ -1118,7 +1143,7 @@ scene_305.aftermath = "The wardhouse smells of ash and damp leather."
 
 scene_310 = Scene("The overlook")
 scene_310.description = "A broken balustrade frames a rain-grey vista; salt-stained frescoes peel above it."
-scene_310.roster_options = [
+scene_310.rosters = lambda: [
     [h_actors.minion_ravager, h_actors.minion_aggressive_3],
     [h_actors.minion_dragoon],
     [h_actors.minion_defensive_2, h_actors.minion_cutthroat],
@@ -1136,7 +1161,7 @@ scene_320.aftermath = "A mosaic of a crowned figure has been scraped away."
 
 scene_330 = Scene("The broken studio")
 scene_330.description = "A painter's studio sits abandoned, canvases rotted and frames gilt with tarnish."
-scene_330.roster_options = [
+scene_330.rosters = lambda: [
     [h_actors.minion_occultist, h_actors.minion_banneret],
     [h_actors.minion_aggressive_3, h_actors.minion_defensive_3, h_actors.minion_reactive_3],
 ]
@@ -1144,7 +1169,7 @@ scene_330.aftermath = "The pigments smell of oil and rust."
 
 scene_340 = Scene("The broken loft")
 scene_340.description = "The loft above the studio groans underfoot, its velvet drapes reduced to ragged strips."
-scene_340.roster_options = [
+scene_340.rosters = lambda: [
     [h_actors.minion_dragoon, h_actors.minion_reactive_3],
     [h_actors.minion_ravager, h_actors.minion_disruptive_2],
 ]
@@ -1156,7 +1181,7 @@ scene_350.aftermath = "The relics feel too cold to touch."
 
 scene_360 = Scene("The iron stair")
 scene_360.description = "An ornate iron stair twists upward, rusted and groaning beneath faded heraldry."
-scene_360.roster_options = [
+scene_360.rosters = lambda: [
     [h_actors.minion_sentinel, h_actors.minion_aggressive_2],
     [h_actors.minion_dragoon, h_actors.minion_reactive_2],
     [h_actors.champion_1, h_actors.minion_defensive],
@@ -1165,7 +1190,7 @@ scene_360.aftermath = "The iron sings when struck, like a low warning."
 
 scene_370 = Scene("The cinder lift")
 scene_370.description = "A soot-stained lift hangs by a chain, its brass fittings dulled and blackened."
-scene_370.roster_options = [
+scene_370.rosters = lambda: [
     [h_actors.minion_banneret, h_actors.minion_defensive_2],
     [h_actors.minion_cutthroat, h_actors.minion_aggressive_3],
 ]
@@ -1173,7 +1198,7 @@ scene_370.aftermath = "The chain groans, but it holds."
 
 scene_400 = Scene("The derelict galleries")
 scene_400.description = "The rust vault opens into a flaking iron gallery, its beams bleeding red and streaked with rust."
-scene_400.roster_options = [
+scene_400.rosters = lambda: [
     [h_actors.minion_aggressive, h_actors.minion_defensive, h_actors.minion_reactive],
     [h_actors.minion_aggressive_2, h_actors.minion_defensive_2, h_actors.minion_reactive_2],
     [h_actors.minion_aggressive_3, h_actors.minion_defensive_3, h_actors.minion_reactive_3],
@@ -1184,7 +1209,7 @@ scene_400.aftermath = "Splintered shields, perfect formation. Discipline without
 
 scene_420 = Scene("The shattered bridge")
 scene_420.description = "A collapsed iron span leaves only a narrow girder to cross, pitted and flaking with rust."
-scene_420.roster_options = [
+scene_420.rosters = lambda: [
     [h_actors.minion_occultist, h_actors.minion_disruptive_2],
     [h_actors.minion_banneret, h_actors.minion_defensive, h_actors.minion_reactive_2],
     [h_actors.champion_4, h_actors.minion_cutthroat],
@@ -1193,7 +1218,7 @@ scene_420.aftermath = "The drop below eats every sound."
 
 scene_430 = Scene("The soot chapel")
 scene_430.description = "A morbid iron chapel holds corroded instruments on altars, the air metallic and bitter."
-scene_430.roster_options = [
+scene_430.rosters = lambda: [
     [h_actors.minion_ravager, h_actors.minion_defensive_3],
     [h_actors.minion_cutthroat, h_actors.minion_disruptive_2, h_actors.minion_reactive],
 ]
@@ -1205,7 +1230,7 @@ scene_450.aftermath = "The knowledge here has been burned away."
 
 scene_500 = Scene("Descending into the dark")
 scene_500.description = "The halls beneath are cold and damp, echoing with the noises of vermin scurrying in the darkness."
-scene_500.roster_options = [
+scene_500.rosters = lambda: [
     [h_actors.minion_disruptive, h_actors.minion_aggressive, h_actors.minion_defensive, h_actors.minion_reactive],
     [h_actors.minion_disruptive_2, h_actors.minion_aggressive_2, h_actors.minion_defensive_2, h_actors.minion_reactive_2],
     [h_actors.minion_disruptive_3, h_actors.minion_aggressive_3, h_actors.minion_defensive_3, h_actors.minion_reactive_3],
@@ -1217,7 +1242,7 @@ scene_500.aftermath = "They died shivering, not from the cold but from something
 
 scene_520 = Scene("The sinkhole")
 scene_520.description = "A yawning sinkhole opens into a chamber of broken stairs and hanging chains."
-scene_520.roster_options = [
+scene_520.rosters = lambda: [
     [h_actors.minion_dragoon, h_actors.minion_banneret],
     [h_actors.minion_ravager, h_actors.minion_occultist],
 ]
@@ -1225,7 +1250,7 @@ scene_520.aftermath = "Chains sway without wind, like a warning."
 
 scene_600 = Scene("Reaching the pinnacle")
 scene_600.description = "The pinnacle is a narrow spire of stone, overlooking the vast expanse of the mountain king's domain."
-scene_600.roster_options = [
+scene_600.rosters = lambda: [
     [h_actors.minion_aggressive, h_actors.minion_defensive, h_actors.minion_reactive],
     [h_actors.minion_aggressive_2, h_actors.minion_defensive_2, h_actors.minion_reactive_2],
     [h_actors.minion_aggressive_3, h_actors.minion_defensive_3, h_actors.minion_reactive_3],
@@ -1288,3 +1313,15 @@ scenario_list = {
     "600": scene_600_call,
     "last": last_call,
 }
+
+
+def run_campaign(game_state, party, manage_party=None):
+    """Play scenes from game_state["start_scene"] until the route ends,
+    offering party management between scenes when `manage_party` is given."""
+    current = game_state.get("start_scene", "100")
+    while current != "END":
+        if manage_party is not None:
+            if h_replay.confirm("manage", "Manage party before next scene? (y/n): "):
+                party = manage_party(party)
+        current, party = scenario_list[current](game_state, party)
+    return party
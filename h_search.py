@@ -0,0 +1,208 @@
+import math
+import time
+
+# ---------------------------------------------------------------------------
+# Lookahead search
+# ---------------------------------------------------------------------------
+#
+# The "mcts" logic profile picks actions by Monte Carlo tree search instead
+# of fixed weights. Each iteration restores the encounter from a snapshot
+# (h_snapshot), plays the rest of the actor's turn and then the following
+# turns headless, and scores the position it reaches for the actor's side.
+#
+# The tree is open loop: a node stands for a sequence of action names taken
+# by the searching side, whatever the dice and the other side did in
+# between. Inside the tree actions are picked by UCB1 and one new node is
+# added per iteration; past it every actor plays its own weighted profile
+# (ROLLOUT_LOGIC for actors without one). Rollouts stop at the end of the
+# encounter or after HORIZON turns.
+#
+# The budget is checked before every iteration and every rollout turn, so
+# a decision never takes much longer than TIME_BUDGET. A time budget makes
+# the number of iterations, and so the choice, depend on the host; set an
+# iteration budget only (set_budget(None, n)) when runs must be
+# reproducible, e.g. for replays and seeded simulations.
+
+TIME_BUDGET = 0.05
+ITERATION_BUDGET = 400
+HORIZON = 12
+EXPLORATION = 1.4
+ROLLOUT_LOGIC = "default"
+
+
+def set_budget(seconds=TIME_BUDGET, iterations=ITERATION_BUDGET):
+    """Per-decision limits; None lifts one of them (not both). Returns the
+    previous (seconds, iterations)."""
+    global TIME_BUDGET, ITERATION_BUDGET
+    if seconds is None and iterations is None:
+        raise ValueError("mcts needs a time or an iteration budget")
+    previous = (TIME_BUDGET, ITERATION_BUDGET)
+    TIME_BUDGET = seconds
+    ITERATION_BUDGET = iterations
+    return previous
+
+
+class Node:
+    __slots__ = ("visits", "value", "children")
+
+    def __init__(self):
+        self.visits = 0
+        self.value = 0.0
+        self.children = {}
+
+    def select(self, names):
+        """UCB1 over the legal action names; untried ones come first."""
+        best_name = None
+        best_score = -1.0
+        log_visits = math.log(self.visits or 1)
+        for name in names:
+            child = self.children.get(name)
+            if child is None or child.visits == 0:
+                return name
+            score = child.value / child.visits + EXPLORATION * math.sqrt(log_visits / child.visits)
+            if score > best_score:
+                best_name = name
+                best_score = score
+        return best_name
+
+
+class Search:
+    def __init__(self, actor, encounter_state):
+        self.actor = actor
+        self.encounter_state = encounter_state
+        table = encounter_state["table"]
+        self.side = table.party[table.slot[actor]]
+        self.root = Node()
+        self.node = None
+        self.path = []
+
+        # every actor needs a logic override or headless turns would
+        # prompt for party targets
+        logic = dict(encounter_state.get("logic") or {})
+        for other in table.actors:
+            if other not in logic:
+                logic[other] = other.logic or h_encounter.DEFAULT_LOGIC
+        self.logic = logic
+        self.rollout_logic = {}
+        for other in table.actors:
+            own = other.logic if logic[other] == "mcts" else logic[other]
+            self.rollout_logic[other] = own if own not in (None, "mcts") else ROLLOUT_LOGIC
+
+    def run(self, possible_actions):
+        encounter_state = self.encounter_state
+        deadline = None
+        if TIME_BUDGET is not None:
+            deadline = time.perf_counter() + TIME_BUDGET
+
+        saved = h_snapshot.snapshot(encounter_state)
+        position = h_snapshot.snapshot(encounter_state, rng=False)
+        previous_sink = h_events.set_sink(None)
+        iterations = 0
+        try:
+            while ITERATION_BUDGET is None or iterations < ITERATION_BUDGET:
+                if deadline is not None and time.perf_counter() >= deadline:
+                    break
+                h_snapshot.restore(encounter_state, position)
+                reward = self.rollout(deadline)
+                if reward is None:
+                    break
+                for node in self.path:
+                    node.visits += 1
+                    node.value += reward
+                iterations += 1
+        finally:
+            h_snapshot.restore(encounter_state, saved)
+            h_events.set_sink(previous_sink)
+
+        # most visited action, mean reward breaking ties
+        best = None
+        best_key = None
+        for name in possible_actions:
+            child = self.root.children.get(name)
+            if child is None or child.visits == 0:
+                continue
+            key = (child.visits, child.value / child.visits)
+            if best_key is None or key > best_key:
+                best, best_key = name, key
+        if best is None:
+            return h_actions.enemy_action_logic(self.actor, encounter_state, possible_actions, self.rollout_logic[self.actor])
+        return possible_actions[best]
+
+    def rollout(self, deadline):
+        """Play one iteration; its reward, or None when the budget ran out."""
+        encounter_state = self.encounter_state
+        encounter_state["search"] = self
+        encounter_state["headless"] = True
+        encounter_state["logic"] = self.logic
+        self.node = self.root
+        self.path = [self.root]
+
+        actor = self.actor
+        encounter_state = h_encounter.headless_turn(actor, encounter_state)
+        encounter_phase, encounter_state = h_encounter.end_turn(actor, encounter_state)
+
+        turns = 0
+        while encounter_phase != "END" and turns < HORIZON:
+            if deadline is not None and time.perf_counter() >= deadline:
+                return None
+            turn = encounter_state["turn"]
+            encounter_phase, encounter_state = h_encounter.PHASES[encounter_phase](encounter_phase, encounter_state)
+            turns += encounter_state["turn"] - turn
+
+        return self.score(encounter_phase)
+
+    def choose(self, actor, possible_actions):
+        """Action for `actor` during a rollout."""
+        encounter_state = self.encounter_state
+        table = encounter_state["table"]
+        node = self.node
+        if node is None or table.party[table.slot[actor]] != self.side:
+            return h_actions.enemy_action_logic(actor, encounter_state, possible_actions, self.rollout_logic[actor])
+
+        name = node.select(possible_actions)
+        child = node.children.get(name)
+        if child is None:
+            child = node.children[name] = Node()
+            # expanded one node, the rest of the rollout is off the tree
+            self.node = None
+        else:
+            self.node = child
+        self.path.append(child)
+        return possible_actions[name]
+
+    def score(self, encounter_phase):
+        """1 for a win of the searching side, 0 for a loss; unfinished
+        fights score by the share of stamina each side has left."""
+        table = self.encounter_state["table"]
+        if encounter_phase == "END":
+            for i in table.indexes:
+                if not table.ko[i]:
+                    return 1.0 if table.party[i] == self.side else 0.0
+            return 0.5
+
+        left = {True: 0, False: 0}
+        total = {True: 0, False: 0}
+        for i in table.indexes:
+            actor = table.actors[i]
+            own = table.party[i] == self.side
+            if not table.ko[i]:
+                left[own] += max(actor.current_stamina, 0)
+            total[own] += actor.stamina
+        own_share = left[True] / total[True] if total[True] else 0.0
+        other_share = left[False] / total[False] if total[False] else 0.0
+        return 0.5 + (own_share - other_share) / 2
+
+
+def mcts_action(actor, encounter_state, possible_actions):
+    """Entry point of the "mcts" logic profile (see enemy_action_logic)."""
+    search = encounter_state.get("search")
+    if search is not None:
+        return search.choose(actor, possible_actions)
+    return Search(actor, encounter_state).run(possible_actions)
+
+
+# imported last, see h_effects
+import h_actions
+import h_encounter
+import h_events
+import h_snapshot
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+
+import os
+
+import h_actors
+import h_encounter
+import h_rng
+import h_scenario
+
+# Pre-made characters that can be named in a simulated party.
+PREMADE_PARTY = {
+    "Valeria": "valeria",
+    "Sonja": "sonja",
+    "Bosh": "bosh",
+    "Atlantes": "atlantes",
+    "Sera": "sera",
+}
+
+# Shards handed to each worker; more shards smooth out uneven encounter
+# lengths at the cost of a little extra merging.
+SHARDS_PER_WORKER = 4
+
+
+def encounter_scenes():
+    """Scenes with roster options, keyed by their number ("100", "500", ...)."""
+    scenes = {}
+    for name, value in vars(h_scenario).items():
+        if name.startswith("scene_") and isinstance(value, h_scenario.Scene):
+            if value.roster_options:
+                scenes[name[len("scene_"):]] = value
+    return scenes
+
+
+def build_party(party_names=None):
+    if not party_names:
+        return h_actors.get_default_party()
+    return [getattr(h_actors, PREMADE_PARTY[name]) for name in party_names]
+
+
+# ---------------------------------------------------------------------------
+# Tallies
+# ---------------------------------------------------------------------------
+
+
+def new_tally():
+    return {
+        "trials": 0,
+        "party_wins": 0,
+        "enemy_wins": 0,
+        "draws": 0,
+        "rounds": 0,
+        "party_ko": {},
+        "actor_ko": {},
+    }
+
+
+def add_outcome(tally, outcome, party_names):
+    tally["trials"] += 1
+    tally["rounds"] += outcome["rounds"]
+    if outcome["winner"] == "party":
+        tally["party_wins"] += 1
+    elif outcome["winner"] == "enemy":
+        tally["enemy_wins"] += 1
+    else:
+        tally["draws"] += 1
+
+    survivors = outcome["survivors"]["party"]
+    knocked_out = [name for name in party_names if name not in survivors]
+    tally["party_ko"][len(knocked_out)] = tally["party_ko"].get(len(knocked_out), 0) + 1
+    for name in knocked_out:
+        tally["actor_ko"][name] = tally["actor_ko"].get(name, 0) + 1
+    return tally
+
+
+def merge_tallies(tallies):
+    merged = new_tally()
+    for tally in tallies:
+        for key in ("trials", "party_wins", "enemy_wins", "draws", "rounds"):
+            merged[key] += tally[key]
+        for key in ("party_ko", "actor_ko"):
+            for k, v in tally[key].items():
+                merged[key][k] = merged[key].get(k, 0) + v
+    return merged
+
+
+def summarize(tally):
+    trials = tally["trials"]
+    if not trials:
+        return {
+            "trials": 0,
+            "win_rate": 0.0,
+            "loss_rate": 0.0,
+            "draw_rate": 0.0,
+            "mean_rounds": 0.0,
+            "ko_distribution": {},
+            "actor_ko_rate": {},
+        }
+    return {
+        "trials": trials,
+        "win_rate": tally["party_wins"] / trials,
+        "loss_rate": tally["enemy_wins"] / trials,
+        "draw_rate": tally["draws"] / trials,
+        "mean_rounds": tally["rounds"] / trials,
+        "ko_distribution": {k: v / trials for k, v in sorted(tally["party_ko"].items())},
+        "actor_ko_rate": {k: v / trials for k, v in sorted(tally["actor_ko"].items())},
+    }
+
+
+# ---------------------------------------------------------------------------
+# Workers
+# ---------------------------------------------------------------------------
+
+
+def run_shard(task):
+    """Simulate seeds [seed_start, seed_stop) of one roster option.
+
+    The enemy templates are rolled from the task's content seed first, so
+    the content seed and a seed fully determine an encounter (extra
+    reinforcements included) whatever process runs it, and shards can be
+    merged in any order.
+    """
+    scene_key, roster_index, seed_start, seed_stop, options = task
+    content_seed = options.get("content_seed", h_rng.CONTENT_SEED)
+    if h_actors.content_seed != content_seed:
+        h_actors.roll_templates(content_seed)
+    scene = encounter_scenes()[scene_key]
+    roster_option = scene.roster_options[roster_index]
+    party = build_party(options.get("party"))
+    party_names = [actor.name for actor in party]
+
+    sim_scene = h_scenario.Scene(scene.name)
+    sim_scene.event = scene.event
+
+    tally = new_tally()
+    for seed in range(seed_start, seed_stop):
+        streams = h_rng.RngStreams(seed, pooled=options.get("pooled_dice", True))
+        if options.get("extras", True):
+            sim_scene.roster = h_scenario.roll_roster(roster_option, streams.events)
+        else:
+            sim_scene.roster = [template.spawn() for template in roster_option]
+        outcome = h_encounter.simulate_encounter(
+            sim_scene,
+            party,
+            rng=streams,
+            party_policy=options.get("party_policy"),
+            enemy_policy=options.get("enemy_policy"),
+            max_rounds=options.get("max_rounds", 100),
+        )
+        add_outcome(tally, outcome, party_names)
+
+    return scene_key, roster_index, tally
+
+
+def _shard_tasks(scene_key, roster_index, trials, seed, shards, options):
+    tasks = []
+    step = max(1, -(-trials // shards))
+    for start in range(seed, seed + trials, step):
+        stop = min(start + step, seed + trials)
+        tasks.append((scene_key, roster_index, start, stop, options))
+    return tasks
+
+
+def _executor(workers, start_method=None):
+    # Shards roll the enemies from their content seed, so any start method
+    # gives the same results; fork, where the platform has it, only spares
+    # the workers importing the game and building the content. Imported
+    # here: single-worker runs and the workers themselves never need a pool.
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    if start_method is None and "fork" in multiprocessing.get_all_start_methods():
+        start_method = "fork"
+    context = multiprocessing.get_context(start_method) if start_method else None
+    return ProcessPoolExecutor(max_workers=workers, mp_context=context)
+
+
+def balance_pass(scene_keys=None, trials=1000, workers=None, seed=0, content_seed=h_rng.CONTENT_SEED, start_method=None, **options):
+    """Estimate win rate, mean rounds and KO distribution for every roster
+    option of the given scenes (all encounter scenes by default).
+
+    Returns {scene_key: {roster_index: summary}}. The enemy templates are
+    rolled from `content_seed` (see h_content.roll_templates), so the same
+    seeds give the same results with any number of workers, any
+    `start_method` and in any process. Options are passed on to the
+    shards: `party` (pre-made names), `extras`, `party_policy`,
+    `enemy_policy`, `max_rounds` and `pooled_dice` (default True; False
+    rolls every die separately, reproducing results from before dice
+    pools).
+    """
+    options = dict(options, content_seed=content_seed)
+    scenes = encounter_scenes()
+    if scene_keys is None:
+        scene_keys = sorted(scenes)
+    workers = workers or os.cpu_count() or 1
+
+    tasks = []
+    for scene_key in scene_keys:
+        for roster_index in range(len(scenes[scene_key].roster_options)):
+            tasks += _shard_tasks(scene_key, roster_index, trials, seed, workers * SHARDS_PER_WORKER, options)
+
+    tallies = {}
+    if workers == 1:
+        # shards re-roll the templates here; leave them as they were
+        previous_seed = h_actors.content_seed
+        try:
+            for scene_key, roster_index, tally in map(run_shard, tasks):
+                tallies.setdefault((scene_key, roster_index), []).append(tally)
+        finally:
+            if h_actors.content_seed != previous_seed:
+                h_actors.roll_templates(previous_seed)
+    else:
+        with _executor(workers, start_method) as pool:
+            for scene_key, roster_index, tally in pool.map(run_shard, tasks):
+                tallies.setdefault((scene_key, roster_index), []).append(tally)
+
+    results = {}
+    for (scene_key, roster_index), parts in tallies.items():
+        results.setdefault(scene_key, {})[roster_index] = summarize(merge_tallies(parts))
+    return results
+
+
+def estimate_scene(scene_key, trials=1000, workers=None, seed=0, **options):
+    return balance_pass([scene_key], trials, workers, seed, **options)[scene_key]
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Monte Carlo win rates per scene roster.")
+    parser.add_argument("scenes", nargs="*", help="scene numbers (default: every encounter scene)")
+    parser.add_argument("--trials", type=int, default=1000, help="encounters per roster option")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--seed", type=int, default=0, help="first seed of the range")
+    parser.add_argument("--content-seed", type=int, default=h_rng.CONTENT_SEED, help="seed the enemy stats are rolled from")
+    parser.add_argument("--party", nargs="*", default=None, help="pre-made party members")
+    parser.add_argument("--no-extras", action="store_true", help="skip the two random reinforcements")
+    parser.add_argument("--plain-dice", action="store_true", help="roll dice one by one, as before dice pools")
+    args = parser.parse_args()
+
+    results = balance_pass(
+        args.scenes or None,
+        trials=args.trials,
+        workers=args.workers,
+        seed=args.seed,
+        content_seed=args.content_seed,
+        party=args.party,
+        extras=not args.no_extras,
+        pooled_dice=not args.plain_dice,
+    )
+    for scene_key in sorted(results):
+        for roster_index, summary in sorted(results[scene_key].items()):
+            ko = " ".join(f"{k}:{v:.2f}" for k, v in summary["ko_distribution"].items())
+            print(
+                f"scene {scene_key} roster {roster_index}: "
+                f"win {summary['win_rate']:.3f} | rounds {summary['mean_rounds']:.2f} | KO {ko}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+import operator
+
+# ---------------------------------------------------------------------------
+# Encounter snapshots
+# ---------------------------------------------------------------------------
+#
+# Lookahead search clones an encounter many times per decision, so
+# snapshot() copies only what combat can change, into flat tuples and
+# lists:
+#
+#   - the encounter table (KO, speed and status per slot, the wounded set
+#     and the initiative heap)
+#   - the actor fields actions and effects write to (current stats, stat
+#     layers and buffs, speed, features, wielded arms)
+#   - running timed effects, the party inventory and the random streams
+#   - the loose flags kept in encounter_state (round, turn, "rally_used"...)
+#
+# restore() writes a snapshot back into the same encounter_state; the
+# actors, the table and its views keep their identity, so references held
+# by the caller stay valid. Effect dicts are shared between snapshots since
+# nothing changes them once they are running; so are stat layers and buffs,
+# which actors replace rather than change.
+
+ACTOR_FIELDS = (
+    "current_stamina",
+    "current_skill",
+    "current_defense",
+    "current_fortune",
+    "current_power",
+    "current_reduction",
+    "current_insulation",
+    "layers",
+    "buffs",
+    "speed",
+    "damage_type",
+    "arms_slot1",
+    "arms_slot2",
+    "arms_actions",
+)
+
+_get_fields = operator.attrgetter(*ACTOR_FIELDS)
+
+# encounter_state entries that snapshot() handles itself or that never
+# change during an encounter
+STRUCTURE_KEYS = frozenset(("table", "actors", "party", "enemy", "rng", "effects", "party_inventory"))
+
+
+def snapshot(encounter_state, rng=True):
+    """Copy every piece of mutable combat state out of an encounter. With
+    rng=False the random streams are left out: restoring then replays the
+    position with fresh dice, and copying the generator states is by far
+    the most expensive part of a snapshot."""
+    table = encounter_state["table"]
+    actors = tuple(
+        (_get_fields(actor), actor.features.getstate())
+        for actor in table.actors
+    )
+
+    effects = encounter_state.get("effects")
+    if effects is not None:
+        effects = (
+            dict(effects["active"]),
+            {expires: list(wheel) for expires, wheel in effects["wheel"].items()},
+        )
+
+    inventory = encounter_state.get("party_inventory")
+    items = list(inventory.items) if inventory is not None else None
+
+    flags = {
+        key: value.copy() if isinstance(value, dict) else value
+        for key, value in encounter_state.items()
+        if key not in STRUCTURE_KEYS
+    }
+
+    streams = encounter_state.get("rng") if rng else None
+    return (
+        table.ko[:],
+        table.speed[:],
+        table.status[:],
+        set(table.wounded),
+        table.initiative[:],
+        actors,
+        effects,
+        items,
+        flags,
+        streams.getstate() if streams is not None else None,
+    )
+
+
+def restore(encounter_state, saved):
+    """Put an encounter back into the state `saved` was taken in."""
+    ko, speed, status, wounded, initiative, actors, effects, items, flags, rng_state = saved
+
+    table = encounter_state["table"]
+    table.ko[:] = ko
+    table.speed[:] = speed
+    table.status[:] = status
+    table.wounded = set(wounded)
+    table.initiative = initiative[:]
+    table.recount()
+
+    for actor, (fields, features) in zip(table.actors, actors):
+        layers = actor.layers
+        for name, value in zip(ACTOR_FIELDS, fields):
+            setattr(actor, name, value)
+        if actor.layers is not layers:
+            actor.invalidate_stats()
+        actor.features.setstate(features)
+
+    if effects is None:
+        encounter_state.pop("effects", None)
+    else:
+        active, wheel = effects
+        encounter_state["effects"] = {
+            "active": dict(active),
+            "wheel": {expires: list(entries) for expires, entries in wheel.items()},
+        }
+
+    if items is not None:
+        encounter_state["party_inventory"].items[:] = items
+
+    for key in [key for key in encounter_state if key not in STRUCTURE_KEYS and key not in flags]:
+        del encounter_state[key]
+    for key, value in flags.items():
+        encounter_state[key] = value.copy() if isinstance(value, dict) else value
+
+    if rng_state is not None:
+        encounter_state["rng"].setstate(rng_state)
+    return encounter_state
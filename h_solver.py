@@ -0,0 +1,457 @@
+# ---------------------------------------------------------------------------
+# Exact solver for small fights
+# ---------------------------------------------------------------------------
+#
+# A fight between a couple of actors who only fight, stab or guard is a
+# Markov chain over (whose turn it is, everyone's stamina, momentum / guard
+# / vulnerable / melee flags). solve() computes its outcome exactly instead
+# of sampling it, with the rules of h_actions:
+#
+#   - soft statuses (guard, vulnerable) end when their owner's turn starts
+#   - attacks roll stat_test with the combat modifiers and the action's own
+#     adjustment; a hit gives the attacker momentum and takes the target's,
+#     a miss loses momentum and, against a guarding target, leaves the
+#     attacker vulnerable and open to a riposte
+#   - charge adds a die when the attacker is not yet in melee, fight keeps
+#     reach wielders out of melee, attackers in melee only reach targets
+#     in melee, melee ends when one side has nobody left in it
+#   - damage that would knock an actor out triggers the fate check
+#
+# The opening event (h_encounter.SPECIAL_EVENTS) is averaged over: it can
+# start a side with a status or slow it for the first round. Other
+# features, items and spells are not modelled, so past the first round the
+# turn order is fixed (speed, then roster order).
+#
+# Stamina never goes up, so states are solved one stamina vector ("block")
+# at a time, lower blocks first. Inside a block turns can loop forever
+# (misses, guarding, a fate check at 1 stamina), so the block is solved by
+# Gauss-Seidel sweeps to float precision. Blocks nobody can leave (both
+# sides only guarding) count as stalemates.
+
+import h_actions
+import h_encounter
+import h_odds
+import h_state
+
+TOLERANCE = 1e-15
+MAX_SWEEPS = 100000
+
+ATTACK_ACTIONS = ("fight", "stab")
+
+MOMENTUM = h_state.MOMENTUM
+GUARD = h_state.GUARD
+VULNERABLE = h_state.VULNERABLE
+MELEE = h_state.MELEE
+
+
+class Fighter:
+    """The numbers the solver needs from an actor, taken when solving starts."""
+
+    __slots__ = (
+        "name", "party", "stamina", "max_stamina", "adder", "defense", "power",
+        "reduction", "fortune", "speed", "charge", "reach", "riposte", "plan",
+    )
+
+    def __init__(self, actor, party, plan):
+        self.name = actor.name
+        self.party = party
+        self.stamina = actor.current_stamina
+        self.max_stamina = max(1, actor.stamina)
+        self.adder = actor.fortune if "mystic aim" in actor.features else actor.skill
+        self.defense = actor.defense
+        self.power = actor.current_power
+        self.reduction = actor.current_reduction
+        self.fortune = actor.current_fortune
+        self.speed = h_state.SPEED_RANK.get(actor.speed, h_state.NORMAL_SPEED)
+        self.charge = "charge" in actor.features
+        self.reach = "reach" in actor.features
+        self.riposte = "riposte" in actor.features
+        self.plan = plan
+
+
+def _plan(action):
+    # "fight" or {"fight": 0.75, "guard": 0.25}
+    if isinstance(action, str):
+        action = {action: 1.0}
+    for name in action:
+        if name not in ATTACK_ACTIONS and name != "guard":
+            raise ValueError(f"the solver only knows fight, stab and guard, not {name!r}")
+    return tuple(action.items())
+
+
+class Solver:
+    def __init__(self, fighters, targeting):
+        self.fighters = fighters
+        self.targeting = targeting
+        self.sides = [[i for i, f in enumerate(fighters) if f.party == side] for side in (True, False)]
+        # turn orders: the usual one, then round one with the party or the
+        # enemy slowed by the opening event
+        self.orders = [self._order(None), self._order(True), self._order(False)]
+        self.values = {}
+        self.solved_blocks = 0
+        self._outcomes = {}
+        self._winners = {}
+        self._fates = {}
+        self._after_ko = {}
+
+    def _order(self, slowed):
+        fighters = self.fighters
+        def rank(i):
+            if fighters[i].party == slowed:
+                return (h_state.SPEED_RANK["slow"], i)
+            return (fighters[i].speed, i)
+        return sorted(range(len(fighters)), key=rank)
+
+    # -- turn mechanics ----------------------------------------------------
+
+    def _damage(self, target, stamina, amount):
+        """[(probability, new stamina)] for `amount` damage; 0 is a KO."""
+        if amount < stamina:
+            return ((1.0, stamina - amount),)
+        key = (target, amount)
+        outcomes = self._fates.get(key)
+        if outcomes is None:
+            spared = h_odds.fate_chance(self.fighters[target].fortune, amount)
+            if spared >= 1.0:
+                outcomes = ((1.0, 1),)
+            elif spared <= 0.0:
+                outcomes = ((1.0, 0),)
+            else:
+                outcomes = ((spared, 1), (1.0 - spared, 0))
+            self._fates[key] = outcomes
+        return outcomes
+
+    def _targets(self, actor, stamina, flags):
+        side = self.sides[1] if self.fighters[actor].party else self.sides[0]
+        candidates = [j for j in side if stamina[j] > 0]
+        if flags[actor] & MELEE:
+            candidates = [j for j in candidates if flags[j] & MELEE]
+        if not candidates:
+            return ()
+        if self.targeting[actor] == "weakest":
+            fighters = self.fighters
+            weakest = min(candidates, key=lambda j: stamina[j] / fighters[j].max_stamina)
+            return ((1.0, weakest),)
+        share = 1.0 / len(candidates)
+        return tuple((share, j) for j in candidates)
+
+    def _hit(self, attacker, target, action, attacker_flags, target_flags):
+        """Attack outcomes: (probability, "hit" or "miss", damage pmf)."""
+        key = (attacker, target, action, attacker_flags & (MOMENTUM | MELEE), target_flags & (GUARD | VULNERABLE))
+        outcomes = self._outcomes.get(key)
+        if outcomes is not None:
+            return outcomes
+
+        a = self.fighters[attacker]
+        t = self.fighters[target]
+        attack = h_odds.ATTACKS[action]
+        adder_change, difficulty_change = h_actions.combat_modifiers(attacker_flags, target_flags)
+        failure, success, critical = h_odds.test_odds(
+            a.adder + adder_change + attack["adder"], t.defense + difficulty_change
+        )
+        dice = attack["dice"]
+        if attack["charge"] and a.charge and not attacker_flags & MELEE and not t.reach:
+            dice = dice + (4,)
+        mitigation = t.reduction if attack["mitigation"] else 0
+
+        outcomes = []
+        if failure:
+            outcomes.append((failure, "miss", None))
+        for weight, (bonus, extra) in ((success, attack["success"]), (critical, attack["critical"])):
+            if weight:
+                outcomes.append((weight, "hit", h_odds.damage_pmf(a.power, mitigation, dice + extra, bonus)))
+        self._outcomes[key] = outcomes
+        return outcomes
+
+    def _after_attack(self, results, p, stamina, flags, attacker, target, hit, pmf, action):
+        a_flags = flags[attacker]
+        t_flags = flags[target]
+        if action == "stab" or not self.fighters[attacker].reach:
+            a_flags |= MELEE
+            t_flags |= MELEE
+
+        if hit:
+            a_flags |= MOMENTUM
+            t_flags &= ~MOMENTUM
+            flags = _set2(flags, attacker, a_flags, target, t_flags)
+            knocked_out = None
+            for amount, q in pmf.items():
+                for r, left in self._damage(target, stamina[target], amount):
+                    if left:
+                        results.append((p * q * r, _set(stamina, target, left), flags))
+                        continue
+                    if knocked_out is None:
+                        knocked_out = self._knock_out(flags, target)
+                    results.append((p * q * r, _set(stamina, target, 0), knocked_out))
+            return
+
+        a_flags &= ~MOMENTUM
+        if not t_flags & GUARD:
+            results.append((p, stamina, _set2(flags, attacker, a_flags, target, t_flags)))
+            return
+
+        a_flags |= VULNERABLE
+        flags = _set2(flags, attacker, a_flags, target, t_flags)
+        if not self.fighters[target].riposte:
+            results.append((p, stamina, flags))
+            return
+
+        # riposte: the guarding target counter-attacks like a fight
+        for q, outcome, counter in self._hit(target, attacker, "fight", t_flags | MELEE, a_flags):
+            if outcome == "miss":
+                results.append((p * q, stamina, flags))
+                continue
+            countered = _set(flags, attacker, a_flags & ~MOMENTUM)
+            knocked_out = None
+            for amount, s in counter.items():
+                for r, left in self._damage(attacker, stamina[attacker], amount):
+                    if left:
+                        results.append((p * q * s * r, _set(stamina, attacker, left), countered))
+                        continue
+                    if knocked_out is None:
+                        knocked_out = self._knock_out(countered, attacker)
+                    results.append((p * q * s * r, _set(stamina, attacker, 0), knocked_out))
+
+    def turn(self, order, position, stamina, flags):
+        """[(probability, stamina, flags)] after the actor at `position` of
+        turn order `order` takes its turn."""
+        actor = self.orders[order][position]
+        flags = _set(flags, actor, flags[actor] & ~(GUARD | VULNERABLE))
+        results = []
+        for action, p in self.fighters[actor].plan:
+            if action == "guard":
+                results.append((p, stamina, _set(flags, actor, flags[actor] | GUARD)))
+                continue
+            targets = self._targets(actor, stamina, flags)
+            if not targets:
+                results.append((p, stamina, flags))
+                continue
+            for q, target in targets:
+                for r, outcome, pmf in self._hit(actor, target, action, flags[actor], flags[target]):
+                    self._after_attack(results, p * q * r, stamina, flags, actor, target, outcome == "hit", pmf, action)
+        return results
+
+    def _knock_out(self, flags, i):
+        # a KO clears the actor's statuses; melee ends with a side's last
+        # actor in it (it only ever starts for both sides at once)
+        flags = _set(flags, i, 0)
+        for side in self.sides:
+            if not any(flags[j] & MELEE for j in side):
+                return tuple(f & ~MELEE for f in flags)
+        return flags
+
+    def _next(self, order, position, stamina):
+        """(order, position, new round) of the next actor standing. A new
+        round always uses the usual turn order."""
+        sequence = self.orders[order]
+        for position in range(position + 1, len(sequence)):
+            if stamina[sequence[position]] > 0:
+                return order, position, 0
+        for position, i in enumerate(self.orders[0]):
+            if stamina[i] > 0:
+                return 0, position, 1
+        return 0, 0, 1
+
+    def _winner(self, stamina):
+        winners = self._winners
+        if stamina not in winners:
+            winners[stamina] = self._decide(stamina)
+        return winners[stamina]
+
+    def _decide(self, stamina):
+        party_up = any(stamina[i] > 0 for i in self.sides[0])
+        enemy_up = any(stamina[i] > 0 for i in self.sides[1])
+        if party_up and enemy_up:
+            return None
+        return party_up
+
+    # -- solving -----------------------------------------------------------
+
+    def transitions(self, state):
+        """[(probability, next state or winner, new round)] for a state."""
+        order, position, stamina, flags = state
+        merged = {}
+        # who acts next only changes with a KO
+        down = stamina.count(0)
+        usual = self._next(order, position, stamina)
+        for p, new_stamina, new_flags in self.turn(order, position, stamina, flags):
+            if new_stamina.count(0) == down:
+                next_order, next_position, wrapped = usual
+            else:
+                winner = self._winner(new_stamina)
+                if winner is not None:
+                    key = (winner, 0)
+                    merged[key] = merged.get(key, 0.0) + p
+                    continue
+                after = (order, position, new_stamina)
+                if after not in self._after_ko:
+                    self._after_ko[after] = self._next(*after)
+                next_order, next_position, wrapped = self._after_ko[after]
+            key = ((next_order, next_position, new_stamina, new_flags), wrapped)
+            merged[key] = merged.get(key, 0.0) + p
+        return [(p, target, wrapped) for (target, wrapped), p in merged.items()]
+
+    def value(self, state):
+        """(party win chance, enemy win chance, expected new rounds)."""
+        known = self.values.get(state)
+        if known is None:
+            self._solve_block(state)
+            known = self.values[state]
+        return known
+
+    def _solve_block(self, entry):
+        values = self.values
+        stamina = entry[2]
+
+        # states of this block reachable from the entry; exits to lower
+        # blocks are solved (recursively) first
+        block = {}
+        pending = [entry]
+        while pending:
+            state = pending.pop()
+            if state in block or state in values:
+                continue
+            win = loss = rounds = 0.0
+            inside = []
+            for p, target, wrapped in self.transitions(state):
+                rounds += p * wrapped
+                if target is True:
+                    win += p
+                elif target is False:
+                    loss += p
+                elif target[2] == stamina and target not in values:
+                    inside.append((p, target))
+                    pending.append(target)
+                else:
+                    known = self.value(target)
+                    win += p * known[0]
+                    loss += p * known[1]
+                    rounds += p * known[2]
+            block[state] = (win, loss, rounds, inside)
+
+        # states that can never leave the block are stalemates
+        leaves = {state for state, row in block.items() if sum(p for p, _ in row[3]) < 1.0 - 1e-12}
+        grew = True
+        while grew:
+            grew = False
+            for state, row in block.items():
+                if state not in leaves and any(target in leaves for _, target in row[3]):
+                    leaves.add(state)
+                    grew = True
+
+        states = list(block)
+        index = {state: k for k, state in enumerate(states)}
+        rows = [
+            (k, block[state][:3], [(p, index[target]) for p, target in block[state][3]])
+            for k, state in enumerate(states)
+            if state in leaves
+        ]
+        wins = [0.0] * len(states)
+        losses = [0.0] * len(states)
+        rounds = [0.0] * len(states)
+        for _ in range(MAX_SWEEPS):
+            moved = False
+            for k, (win, loss, turns), inside in rows:
+                for p, other in inside:
+                    win += p * wins[other]
+                    loss += p * losses[other]
+                    turns += p * rounds[other]
+                if not moved:
+                    moved = (
+                        abs(win - wins[k]) > TOLERANCE
+                        or abs(loss - losses[k]) > TOLERANCE
+                        or abs(turns - rounds[k]) > TOLERANCE * (1.0 + turns)
+                    )
+                wins[k] = win
+                losses[k] = loss
+                rounds[k] = turns
+            if not moved:
+                break
+
+        for k, state in enumerate(states):
+            turns = rounds[k]
+            if state not in leaves or wins[k] + losses[k] < 1.0 - 1e-9:
+                turns = float("inf")
+            values[state] = (wins[k], losses[k], turns)
+        self.solved_blocks += 1
+
+
+def _set(values, i, value):
+    values = list(values)
+    values[i] = value
+    return tuple(values)
+
+
+def _set2(values, i, value, j, other):
+    values = list(values)
+    values[i] = value
+    values[j] = other
+    return tuple(values)
+
+
+# opening event effects (h_encounter.SPECIAL_EVENTS): (turn order of the
+# first round, side, status the side starts with)
+OPENINGS = {
+    "party_slow_first_round": (1, True, 0),
+    "enemy_slow_first_round": (2, False, 0),
+    "party_momentum": (0, True, MOMENTUM),
+    "enemy_momentum": (0, False, MOMENTUM),
+    "party_guard": (0, True, GUARD),
+    "enemy_guard": (0, False, GUARD),
+    "party_vulnerable": (0, True, VULNERABLE),
+    "enemy_vulnerable": (0, False, VULNERABLE),
+}
+
+
+def solve(party, enemies, actions=None, targeting=None, events=True):
+    """Exact outcome of `party` against `enemies` (one or two actors a side
+    is the intended size) from their current stamina.
+
+    `actions` maps actors to "fight", "stab", "guard" or a dict of those
+    to probabilities (default "fight"). `targeting` maps actors to
+    "random" (the default) or "weakest", the aggressive profile's pick.
+    With `events` the result is averaged over the opening events every
+    encounter starts with, as in simulate_encounter; without, everyone
+    starts with no statuses.
+
+    Returns a dict with `win` and `loss` (party win / enemy win chances),
+    `stalemate`, `rounds` (expected rounds, as simulate_encounter counts
+    them; inf when a stalemate is possible) and `states` solved."""
+    actions = actions or {}
+    targeting = targeting or {}
+    fighters = []
+    aims = []
+    for side, actors in ((True, party), (False, enemies)):
+        for actor in actors:
+            fighters.append(Fighter(actor, side, _plan(actions.get(actor, "fight"))))
+            aims.append(targeting.get(actor, "random"))
+
+    solver = Solver(fighters, aims)
+    stamina = tuple(max(0, f.stamina) for f in fighters)
+    winner = solver._winner(stamina)
+    if winner is not None:
+        return {"win": float(winner), "loss": float(not winner), "stalemate": 0.0, "rounds": 1.0, "states": 0}
+
+    if events:
+        openings = [OPENINGS.get(event["effect"], (0, None, 0)) for event in h_encounter.SPECIAL_EVENTS]
+    else:
+        openings = [(0, None, 0)]
+
+    win = loss = rounds = 0.0
+    share = 1.0 / len(openings)
+    for order, side, status in openings:
+        flags = tuple(status if f.party == side and left > 0 else 0 for f, left in zip(fighters, stamina))
+        position = 0
+        while stamina[solver.orders[order][position]] <= 0:
+            position += 1
+        result = solver.value((order, position, stamina, flags))
+        win += share * result[0]
+        loss += share * result[1]
+        rounds += share * result[2]
+    return {
+        "win": win,
+        "loss": loss,
+        "stalemate": max(0.0, 1.0 - win - loss),
+        "rounds": 1.0 + rounds,
+        "states": len(solver.values),
+    }
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+# ---------------------------------------------------------------------------
+# Startup time
+# ---------------------------------------------------------------------------
+#
+# Short-lived processes (simulation workers, replays, tools) pay for the
+# imports every time they start, so importing the game has to stay cheap:
+# h_main only runs the game when started as a script, h_actors builds the
+# equipment, archetypes, enemies and pre-made actors (h_content) the first
+# time one of them is looked up, scenes build their roster options the
+# first time they are asked for, and pickle, json, argparse and
+# multiprocessing are imported by the functions that use them.
+#
+# This reports the import time of every game module, taken from
+# `python -X importtime` in a fresh interpreter, and how long each content
+# table takes to build once something asks for it. It exits with 1 when
+# importing the entry point takes longer than the budget.
+#
+#     python h_startup.py --budget 30
+#
+# Importing h_main took about 26 ms when everything was built at import;
+# now it takes about 17, and building the content about 2 ms more.
+
+BUDGET_MS = 30
+ENTRY_POINT = "h_main"
+
+_here = os.path.dirname(os.path.abspath(__file__))
+
+
+def import_times(module=ENTRY_POINT):
+    """Milliseconds spent importing each module `module` pulls in, as
+    {name: (self, cumulative)}, measured in a fresh interpreter."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        cwd=_here,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = (int(own) / 1000, int(cumulative) / 1000)
+    return times
+
+
+def table_times():
+    """Milliseconds each content table takes to build, in this process.
+    Only meaningful before anything here has touched the content."""
+    import h_actors
+    import h_scenario
+
+    if "h_content" in sys.modules:
+        raise RuntimeError("the content is already built")
+    h_actors.ENEMY_TEMPLATES
+    times = {name: seconds * 1000 for name, seconds in sys.modules["h_content"].BUILD_TIMES.items()}
+
+    start = time.perf_counter()
+    for value in vars(h_scenario).values():
+        if isinstance(value, h_scenario.Scene):
+            value.roster_options
+    times["scene rosters"] = (time.perf_counter() - start) * 1000
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import and content build times against a budget.")
+    parser.add_argument("--budget", type=float, default=BUDGET_MS, help="milliseconds allowed to import the entry point")
+    parser.add_argument("--module", default=ENTRY_POINT, help="entry point to import")
+    args = parser.parse_args()
+
+    modules = import_times(args.module)
+    print("module                 self ms  cumulative ms")
+    for name, (own, cumulative) in modules.items():
+        if name.startswith("h_") or name == args.module:
+            print(f"{name:<22} {own:7.2f}  {cumulative:13.2f}")
+
+    tables = table_times()
+    print("\ncontent table          build ms")
+    for name, milliseconds in tables.items():
+        print(f"{name:<22} {milliseconds:8.2f}")
+
+    total = modules[args.module][1]
+    print(f"\nimport {args.module}: {total:.2f} ms (budget {args.budget:g} ms)")
+    print(f"content: {sum(tables.values()):.2f} ms on first use")
+    if total > args.budget:
+        print("over budget")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,352 @@
+import enum
+import heapq
+
+# ---------------------------------------------------------------------------
+# Compact encounter state
+# ---------------------------------------------------------------------------
+#
+# Every actor in an encounter gets a small integer slot. Side, KO and speed
+# live in parallel lists indexed by slot and the remaining flags are packed
+# into one status word per slot. `encounter_state["actors"]` maps each actor
+# to an `ActorState` view over its slot, so existing action code that reads
+# and writes `encounter_state["actors"][actor]["melee"]` keeps working.
+#
+# Turn order comes from a heap of (speed rank, slot) entries built once per
+# round. Speed changes push a fresh entry and stale ones are skipped when
+# they reach the top, so picking the next actor is O(log n).
+#
+# The table also keeps, per side, the sets of slots still standing, in
+# melee, blocking and hidden, so the end and melee checks after every turn
+# are O(1) and targets come from set intersections. The sets follow KO and
+# status changes made through set_ko, set_status, clear_status or the
+# views; code that rewrites the lists wholesale calls recount().
+
+class Status(enum.IntFlag):
+    ACTIVE = 1 << 0
+    WAITING = 1 << 1
+    DONE = 1 << 2
+    MELEE = 1 << 3
+    MOMENTUM = 1 << 4
+    GUARD = 1 << 5
+    BLOCK = 1 << 6
+    HIDE = 1 << 7
+    VULNERABLE = 1 << 8
+    DAZE = 1 << 9
+    BLIND = 1 << 10
+    PIN = 1 << 11
+    DISABLE = 1 << 12
+    ROOT = 1 << 13
+    ENRAGED = 1 << 14
+    HIDE_BLOCKED = 1 << 15
+
+
+# Status words are stored as plain ints; `Status` operators go through the
+# enum machinery, which is far too slow for per-turn checks.
+ACTIVE = Status.ACTIVE.value
+WAITING = Status.WAITING.value
+DONE = Status.DONE.value
+MELEE = Status.MELEE.value
+MOMENTUM = Status.MOMENTUM.value
+GUARD = Status.GUARD.value
+BLOCK = Status.BLOCK.value
+HIDE = Status.HIDE.value
+VULNERABLE = Status.VULNERABLE.value
+DAZE = Status.DAZE.value
+BLIND = Status.BLIND.value
+PIN = Status.PIN.value
+DISABLE = Status.DISABLE.value
+ROOT = Status.ROOT.value
+ENRAGED = Status.ENRAGED.value
+HIDE_BLOCKED = Status.HIDE_BLOCKED.value
+
+# Cleared at the start of an actor's turn and after it, respectively.
+SOFT_STATUS = GUARD | BLOCK | HIDE | VULNERABLE
+HARD_STATUS = DAZE | DISABLE | PIN | BLIND
+
+# Flags with a per-side slot set on the table, by attribute name.
+TRACKED = (("in_melee", MELEE), ("blocking", BLOCK), ("hidden", HIDE))
+TRACKED_BITS = MELEE | BLOCK | HIDE
+
+STATUS_BITS = {
+    "active": ACTIVE,
+    "waiting": WAITING,
+    "done": DONE,
+    "melee": MELEE,
+    "momentum": MOMENTUM,
+    "guard": GUARD,
+    "block": BLOCK,
+    "hide": HIDE,
+    "vulnerable": VULNERABLE,
+    "daze": DAZE,
+    "blind": BLIND,
+    "pin": PIN,
+    "disable": DISABLE,
+    "root": ROOT,
+    "enraged": ENRAGED,
+    "hide_blocked": HIDE_BLOCKED,
+}
+
+# Key order of the old per-actor dict; status lines are rendered in it.
+STATE_KEYS = (
+    "party",
+    "active",
+    "waiting",
+    "done",
+    "KO",
+    "melee",
+    "momentum",
+    "guard",
+    "block",
+    "hide",
+    "speed",
+    "vulnerable",
+    "daze",
+    "blind",
+    "pin",
+    "disable",
+    "root",
+    "enraged",
+)
+
+# Status flags rendered in status lines; "active" and "party" are never shown.
+_SHOWN_FLAGS = tuple(
+    (key, STATUS_BITS.get(key)) for key in STATE_KEYS + ("hide_blocked",)
+    if key not in ("party", "active", "speed")
+)
+
+_status_names = {}
+_status_tags = {}
+
+
+def status_names(word, ko=False):
+    """Names of the flags set in a status word, in status-line order.
+    Rendered once per flag combination and cached."""
+    key = (word, ko)
+    names = _status_names.get(key)
+    if names is None:
+        names = tuple(
+            name for name, bit in _SHOWN_FLAGS
+            if (ko if bit is None else word & bit)
+        )
+        _status_names[key] = names
+    return names
+
+
+def status_tags(word, ko=False):
+    """Status line fragment such as "(melee)(guard)" for a status word."""
+    key = (word, ko)
+    tags = _status_tags.get(key)
+    if tags is None:
+        tags = "".join(f"({name})" for name in status_names(word, ko))
+        _status_tags[key] = tags
+    return tags
+
+
+def set_status(table, index, mask):
+    """Set every flag in `mask` and return the flags that were newly set."""
+    old = table.status[index]
+    table.status[index] = old | mask
+    added = mask & ~old
+    if added & TRACKED_BITS:
+        table.track(index, added, True)
+    return added
+
+
+def clear_status(table, index, mask):
+    """Clear every flag in `mask` and return the flags that were set."""
+    old = table.status[index]
+    table.status[index] = old & ~mask
+    removed = old & mask
+    if removed & TRACKED_BITS:
+        table.track(index, removed, False)
+    return removed
+
+
+SPEEDS = ("fast", "normal", "slow")
+SPEED_RANK = {"fast": 0, "normal": 1, "slow": 2}
+NORMAL_SPEED = SPEED_RANK["normal"]
+
+
+class EncounterTable:
+    def __init__(self, party, enemies):
+        self.actors = []
+        self.slot = {}
+        for actor in list(party) + list(enemies):
+            if actor not in self.slot:
+                self.slot[actor] = len(self.actors)
+                self.actors.append(actor)
+
+        size = len(self.actors)
+        self.indexes = range(size)
+        self.party = [actor in party for actor in self.actors]
+        self.ko = [False] * size
+        self.speed = [SPEED_RANK.get(actor.speed, NORMAL_SPEED) for actor in self.actors]
+        self.status = [0] * size
+        # slots whose stamina dropped since savagery was last checked
+        self.wounded = set(self.indexes)
+        self.recount()
+        self.start_round()
+
+        self.views = [ActorState(self, i) for i in self.indexes]
+        self.by_actor = dict(zip(self.actors, self.views))
+
+    def __len__(self):
+        return len(self.actors)
+
+    def recount(self):
+        """Rebuild the per-side slot sets from the KO and status lists. Each
+        is a pair of sets indexed by side (True for the party)."""
+        self.alive = [set(), set()]
+        for name, bit in TRACKED:
+            setattr(self, name, [set(), set()])
+        for i in self.indexes:
+            if not self.ko[i]:
+                self.alive[self.party[i]].add(i)
+            if self.status[i] & TRACKED_BITS:
+                self.track(i, self.status[i], True)
+        # h_actions.TacticalView per actor, for the current turn
+        self.tactics = {}
+        # target_views dicts, by sorted slots
+        self.targets = {}
+
+    def track(self, index, bits, on):
+        side = self.party[index]
+        for name, bit in TRACKED:
+            if bits & bit:
+                slots = getattr(self, name)[side]
+                if on:
+                    slots.add(index)
+                else:
+                    slots.discard(index)
+
+    def set_ko(self, index, ko):
+        ko = bool(ko)
+        if self.ko[index] != ko:
+            self.ko[index] = ko
+            if ko:
+                self.alive[self.party[index]].discard(index)
+            else:
+                self.alive[self.party[index]].add(index)
+
+    def target_views(self, slots):
+        """{actor: view} for a set of slots, in roster order. The dicts are
+        cached per set of slots and shared, so callers must not change them."""
+        key = tuple(sorted(slots))
+        views = self.targets.get(key)
+        if views is None:
+            views = self.targets[key] = {self.actors[j]: self.views[j] for j in key}
+        return views
+
+    def start_round(self):
+        ko = self.ko
+        self.initiative = [(self.speed[i], i) for i in self.indexes if not ko[i]]
+        heapq.heapify(self.initiative)
+
+    def set_speed(self, index, rank):
+        if self.speed[index] != rank:
+            self.speed[index] = rank
+            heapq.heappush(self.initiative, (rank, index))
+
+    def next_ready(self):
+        """Slot of the next actor to act this round, or None once everyone
+        has acted: fast before normal before slow, roster order within a speed."""
+        queue = self.initiative
+        speed = self.speed
+        ko = self.ko
+        status = self.status
+        while queue:
+            rank, i = queue[0]
+            if rank == speed[i] and not ko[i] and not status[i] & DONE:
+                return i
+            heapq.heappop(queue)
+        return None
+
+    def side_indexes(self, party):
+        return [i for i in self.indexes if self.party[i] == party]
+
+
+class ActorState:
+    """Dict-like view over one slot of an `EncounterTable`."""
+
+    __slots__ = ("table", "index")
+
+    def __init__(self, table, index):
+        self.table = table
+        self.index = index
+
+    def __getitem__(self, key):
+        bit = STATUS_BITS.get(key)
+        if bit is not None:
+            return self.table.status[self.index] & bit != 0
+        if key == "KO":
+            return self.table.ko[self.index]
+        if key == "party":
+            return self.table.party[self.index]
+        if key == "speed":
+            return SPEEDS[self.table.speed[self.index]]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        bit = STATUS_BITS.get(key)
+        if bit is not None:
+            if value:
+                set_status(self.table, self.index, bit)
+            else:
+                clear_status(self.table, self.index, bit)
+        elif key == "KO":
+            self.table.set_ko(self.index, value)
+        elif key == "party":
+            self.table.party[self.index] = bool(value)
+            self.table.recount()
+        elif key == "speed":
+            self.table.set_speed(self.index, SPEED_RANK.get(value, NORMAL_SPEED))
+        else:
+            raise KeyError(key)
+
+    def __contains__(self, key):
+        # "hide_blocked" is only a key while it is set, as in keys()
+        if key == "hide_blocked":
+            return self.table.status[self.index] & HIDE_BLOCKED != 0
+        return key in STATE_KEYS
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def pop(self, key, *default):
+        if key not in self:
+            if default:
+                return default[0]
+            raise KeyError(key)
+        value = self[key]
+        if key in STATUS_BITS:
+            self[key] = False
+        return value
+
+    def keys(self):
+        if self.table.status[self.index] & HIDE_BLOCKED:
+            return STATE_KEYS + ("hide_blocked",)
+        return STATE_KEYS
+
+    def values(self):
+        return [self[key] for key in self.keys()]
+
+    def items(self):
+        return [(key, self[key]) for key in self.keys()]
+
+    def status_names(self):
+        return status_names(self.table.status[self.index], self.table.ko[self.index])
+
+    def status_tags(self):
+        return status_tags(self.table.status[self.index], self.table.ko[self.index])
+
+    def __repr__(self):
+        return repr(dict(self.items()))
@@ -0,0 +1,384 @@
+import builtins
+
+def no_input(*a, **k):
+    raise RuntimeError("headless simulation must not read stdin")
+
+builtins.input = no_input
+
+import h_actors, h_encounter, h_scenario
+
+# Headless encounters need no monkeypatching at all
+party = h_actors.get_default_party()
+scene = h_scenario.Scene("smoke")
+scene.roster = list(h_scenario.scene_500.roster_options[0])
+
+print('Starting headless encounter test...')
+outcome = h_encounter.simulate_encounter(scene, party, rng=1)
+print('Encounter finished:', outcome)
+
+assert outcome["winner"] in ("party", "enemy", None)
+assert outcome == h_encounter.simulate_encounter(scene, party, rng=1)
+
+# Snapshots rewind an encounter exactly
+import h_events, h_snapshot
+
+print('Starting snapshot test...')
+h_events.set_sink(None)
+for actor in party + scene.roster:
+    actor.refresh()
+encounter_state = h_encounter.new_encounter(scene, party, rng=2)
+encounter_state["headless"] = True
+encounter_state["logic"] = {actor: actor.logic or h_encounter.DEFAULT_LOGIC for actor in party + scene.roster}
+phase = h_encounter.play_encounter(encounter_state, until_turn=4)
+saved = h_snapshot.snapshot(encounter_state)
+
+def finish():
+    h_encounter.play_encounter(encounter_state, phase, until_turn=1000)
+    return [(actor.name, actor.current_stamina) for actor in encounter_state["table"].actors], encounter_state["turn"]
+
+first = finish()
+h_snapshot.restore(encounter_state, saved)
+assert finish() == first
+print('Snapshot replayed to:', first)
+
+# Monte Carlo tree search logic: reproducible under an iteration budget
+import h_search
+
+print('Starting mcts test...')
+previous_budget = h_search.set_budget(None, 20)
+outcome = h_encounter.simulate_encounter(scene, party, enemy_policy="mcts", rng=3)
+assert outcome == h_encounter.simulate_encounter(scene, party, enemy_policy="mcts", rng=3)
+h_search.set_budget(*previous_budget)
+print('Encounter finished:', outcome)
+
+# Exact odds agree with the d20 rules
+import h_odds
+
+print('Starting odds test...')
+assert h_odds.TEST_COUNTS[0] == (9, 10, 1)
+assert h_odds.test_odds(0, 40) == (1.0, 0.0, 0.0)
+fight_odds = h_odds.attack_pmf(12, 10, 3, 2)
+assert abs(sum(fight_odds["damage"].values()) - 1) < 1e-9
+print('Fight odds:', fight_odds["failure"], fight_odds["success"], fight_odds["critical"], fight_odds["expected"])
+
+# Exact solver for a 1v1 fight
+import h_solver
+
+print('Starting solver test...')
+hero, foe = party[0], scene.roster[0]
+hero.refresh()
+foe.refresh()
+odds = h_solver.solve([hero], [foe])
+assert abs(odds["win"] + odds["loss"] + odds["stalemate"] - 1) < 1e-9
+assert odds["rounds"] >= 1
+print('Solved:', odds)
+
+# Pooled dice: seeded, restorable, and only the dice are pooled
+import h_rng
+
+print('Starting dice pool test...')
+pool = h_rng.DicePool(11)
+state = pool.getstate()
+rolls = [pool.randint(1, 20) for _ in range(500)] + [pool.randint(1, 4) for _ in range(500)]
+assert set(rolls) == set(range(1, 21))
+pool.setstate(state)
+assert rolls == [pool.randint(1, 20) for _ in range(500)] + [pool.randint(1, 4) for _ in range(500)]
+outcome = h_encounter.simulate_encounter(scene, party, rng=h_rng.RngStreams(4, pooled=True), fresh=True)
+assert outcome == h_encounter.simulate_encounter(scene, party, rng=h_rng.RngStreams(4, pooled=True), fresh=True)
+print('Pooled encounter finished:', outcome)
+
+# Per-side slot sets stay in step with the table
+print('Starting counter test...')
+encounter_state = h_encounter.new_encounter(scene, party, rng=5)
+encounter_state["headless"] = True
+encounter_state["logic"] = {actor: actor.logic or h_encounter.DEFAULT_LOGIC for actor in party + scene.roster}
+h_encounter.play_encounter(encounter_state, until_turn=6)
+table = encounter_state["table"]
+tracked = [[set(slots) for slots in sides] for sides in (table.alive, table.in_melee, table.blocking, table.hidden)]
+table.recount()
+assert tracked == [table.alive, table.in_melee, table.blocking, table.hidden]
+print('Standing and in melee after 6 turns:', tracked[:2])
+
+# Tactical views are shared within a turn and dropped at the next one
+import h_actions
+
+print('Starting tactical view test...')
+actor = scene.roster[0]
+view = h_actions.tactical_view(actor, encounter_state)
+assert h_actions.tactical_view(actor, encounter_state) is view
+assert actor not in view.allies()
+h_encounter.play_encounter(encounter_state, until_turn=7)
+assert h_actions.tactical_view(actor, encounter_state) is not view
+print('Allies seen:', [ally.name for ally in view.allies()])
+
+# Logic profiles are data: a new one works without code changes
+import h_behaviours
+
+print('Starting behaviour test...')
+h_behaviours.register_profile(
+    "cautious",
+    rules=[((("melee", "not momentum"),), ["retreat"])],
+    weights=[(1, ["guard"])],
+    fallback=["fight"],
+)
+profile = h_behaviours.PROFILES["cautious"]
+assert profile["table"][h_behaviours.SITUATION["melee"]] == ("retreat",)
+assert profile["table"][h_behaviours.SITUATION["melee"] | h_behaviours.SITUATION["momentum"]] == ()
+outcome = h_encounter.simulate_encounter(scene, party, enemy_policy="cautious", rng=6, fresh=True)
+print('Cautious enemies:', outcome["winner"], outcome["rounds"])
+
+# Legal actions are looked up per status, not rebuilt
+import h_state
+
+print('Starting legality test...')
+actions = h_actions.base_actions | actor.special_actions | actor.arms_actions
+legal = h_actions.filter_actions(actor, encounter_state, actions)
+assert h_actions.filter_actions(actor, encounter_state, dict(actions)) is legal
+in_melee = h_actions.legal_actions(actions, h_state.MELEE)
+assert "retreat" in in_melee and "skirmish" not in in_melee
+print('Legal now:', list(legal))
+
+# Merged action tables live on the actor until its weapon or archetype changes
+print('Starting action table test...')
+fighter = party[0]
+menu = fighter.action_table()
+assert fighter.action_table() is menu
+assert list(menu) == list(h_actions.base_actions | fighter.special_actions | fighter.arms_actions)
+assert list(fighter.action_table(party_menu=True)) == list(fighter.special_actions | fighter.arms_actions | h_actions.base_actions)
+fighter.equip_weapons(fighter.arms_slot1)
+assert fighter.action_table() is not menu and dict(fighter.action_table()) == dict(menu)
+print('Action table:', list(menu))
+
+# Features granted by several sources survive losing one of them
+import h_features
+
+print('Starting feature test...')
+features = h_features.Features(["reach", "charge"])
+features.update(["reach"])
+features.remove("reach")
+assert features.mask & h_features.REACH and "reach" in features
+features.remove("reach")
+assert not features.mask & h_features.REACH and "reach" not in features
+features.remove("riposte")
+assert list(features) == ["charge"]
+print('Features left:', features)
+
+# Stats are summed from layers; buffs undo cleanly even across a refresh
+print('Starting stat layer test...')
+defense = fighter.defense
+fighter.wear_armor(h_actors.suit_of_plate)
+assert fighter.layers["armor"] == {"reduction": 3, "skill": -2, "insulation": -2}
+fighter.add_buff("evil eye", defense=-2)
+fighter.add_buff("diabolic weapon", current_power=3)
+assert fighter.defense == defense - 2
+fighter.refresh()
+fighter.remove_buff("diabolic weapon")
+fighter.remove_buff("evil eye")
+assert fighter.defense == defense and fighter.current_power == fighter.power
+assert fighter.layers["buffs"] == {}
+print('Stat layers:', {layer: stats for layer, stats in fighter.layers.items() if stats})
+
+# Actors and equipment are slotted
+import h_memory
+
+print('Starting memory test...')
+assert not hasattr(fighter, "__dict__") and not hasattr(fighter.arms_slot1, "__dict__")
+usage = h_memory.measure(5)
+assert usage["bytes per session, deep-copied enemies, no __slots__"] > usage["bytes per session, deep-copied enemies"]
+assert usage["actor, no __slots__"] > usage["actor"]
+print('Bytes per session:', usage["bytes per session"], 'deep-copied enemies:', usage["bytes per session, deep-copied enemies"], 'no __slots__:', usage["bytes per session, deep-copied enemies, no __slots__"])
+
+# Rosters fight spawned copies, never the enemy templates
+print('Starting spawn test...')
+template = h_actors.ENEMY_TEMPLATES["minion_aggressive"]
+rolled = h_scenario.roll_roster([template, template])
+assert len({id(actor) for actor in rolled}) == len(rolled) and template not in rolled
+stamina, features = template.current_stamina, list(template.features)
+clone = h_actors.spawn("minion_aggressive")
+clone.current_stamina = 0
+clone.features.add("riposte")
+assert template.current_stamina == stamina and list(template.features) == features
+assert clone.layers is template.layers and clone.skill == template.skill
+print('Spawned:', [actor.name for actor in rolled])
+
+# Importing the game runs nothing and builds no content
+import subprocess
+import sys
+import h_startup
+
+print('Starting startup test...')
+probe = "import sys, h_main; print(sorted(m for m in ('h_content', 'pickle', 'json', 'multiprocessing') if m in sys.modules))"
+loaded = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True, stdin=subprocess.DEVNULL, check=True)
+assert loaded.stdout.strip() == "[]", loaded.stdout
+scene = h_scenario.Scene("lazy")
+scene.rosters = lambda: [[template]]
+assert scene.roster_options == [[template]] and scene.roster_options is scene.roster_options
+times = h_startup.import_times()
+print('Import h_main (ms):', round(times["h_main"][1], 2), 'budget', h_startup.BUDGET_MS)
+
+# Devil's dust wears off back to the speed the actor had
+print('Starting devil\'s dust test...')
+import h_effects
+party = h_actors.get_default_party()
+encounter_state = h_encounter.new_encounter(h_scenario.Scene("dust"), party, rng=3)
+bosh = party[2]
+h_actions.set_speed(bosh, encounter_state, "slow")
+h_actors.DevilsDust.use(bosh, encounter_state)
+assert encounter_state["actors"][bosh]["speed"] == "fast"
+h_effects.clear_effects(encounter_state)
+assert encounter_state["actors"][bosh]["speed"] == "slow" and bosh.speed == bosh.arms_slot1.speed
+print('Speed after the dust:', encounter_state["actors"][bosh]["speed"])
+
+# The party menu asks again on bad input
+print('Starting party menu test...')
+import h_main, h_replay
+import contextlib, io
+answers = iter(["7", "0", "-1", "2"])
+builtins.input = lambda prompt="": next(answers)
+shown = io.StringIO()
+with contextlib.redirect_stdout(shown):
+    assert h_replay.choose("manage option", 4, "Choose option: ", ["menu"], default=4, retry=True) == 2
+assert shown.getvalue().count("menu") == 4
+answers = iter(["x"])
+assert h_replay.choose("manage option", 4, "Choose option: ", default=4, retry=True) == 4
+# pressing Enter still leaves the party menu
+answers = iter(["9", ""])
+with contextlib.redirect_stdout(io.StringIO()):
+    assert h_main.manage_party(party) == party
+builtins.input = no_input
+print('Party menu: done after bad input')
+
+# Cached legal actions are read-only and the plain-dict cache is bounded
+print('Starting legal cache test...')
+legal = h_actions.filter_actions(bosh, encounter_state, bosh.action_table())
+try:
+    legal["retreat"] = h_actions.retreat
+except TypeError:
+    pass
+else:
+    raise AssertionError("cached legal actions can be changed")
+for size in range(h_actions.LEGAL_CACHE_SIZE + 10):
+    h_actions.filter_actions(bosh, encounter_state, {f"move {size}": h_actions.retreat})
+assert len(h_actions._legal_actions) <= h_actions.LEGAL_CACHE_SIZE
+print('Legal cache entries:', len(h_actions._legal_actions))
+
+# recount() drops the cached target views
+print('Starting target views test...')
+table = encounter_state["table"]
+table.target_views(table.alive[True])
+assert table.targets
+table.recount()
+assert not table.targets
+print('Target views after recount:', len(table.targets))
+
+# A second archetype stacks on the first
+print('Starting archetype stacking test...')
+import h_content
+dual = h_actors.Righteous("Dual")
+stamina, skill = dual.stamina, dual.skill
+dual.give_archetype(h_content.gendarme)
+dual.give_archetype(h_content.furioso)
+assert dual.stamina == stamina + 6 + 12 and dual.skill == skill + 4 + 2
+assert "riposte" in dual.features and "savagery" in dual.features
+assert dual.archetype is h_content.furioso
+print('Stacked archetype layer:', dual.layers["archetype"])
+
+# Enemy stats come from the content seed, never from the global random
+print('Starting content seed test...')
+import random
+probe = "import h_actors; print([h_actors.minion_disruptive.skill, h_actors.champion_1.stamina])"
+fresh = [subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True, check=True).stdout for _ in range(2)]
+assert fresh[0] == fresh[1], fresh
+rolled = {name: template.layers["rolled"] for name, template in h_actors.ENEMY_TEMPLATES.items()}
+random.seed(12345)
+h_content.roll_templates(h_content.content_seed)
+assert {name: template.layers["rolled"] for name, template in h_actors.ENEMY_TEMPLATES.items()} == rolled
+h_content.roll_templates(h_content.content_seed + 1)
+assert {name: template.layers["rolled"] for name, template in h_actors.ENEMY_TEMPLATES.items()} != rolled
+h_content.roll_templates(h_content.content_seed - 1)
+print('Template stats in a fresh process:', fresh[0].strip())
+
+# A seed and the content seed decide a balance pass wherever it runs
+print('Starting reproducible balance pass test...')
+import json
+import h_simulation
+stats = [template.stamina for template in h_actors.ENEMY_TEMPLATES.values()]
+single = json.dumps(h_simulation.balance_pass(["100"], trials=8, workers=1), sort_keys=True)
+assert [template.stamina for template in h_actors.ENEMY_TEMPLATES.values()] == stats
+assert json.dumps(h_simulation.balance_pass(["100"], trials=8, workers=2), sort_keys=True) == single
+probe = (
+    "import json, h_simulation\n"
+    "if __name__ == '__main__':\n"
+    "    for workers, method in ((1, None), (2, 'spawn')):\n"
+    "        print(json.dumps(h_simulation.balance_pass(['100'], trials=8, workers=workers, start_method=method), sort_keys=True))\n"
+)
+# earlier tests here changed the pre-made party, so fresh processes are
+# compared with each other
+separate = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True, check=True).stdout.splitlines()
+again = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True, check=True).stdout.splitlines()
+assert len(separate) == 2 and separate[0] == separate[1] and again == separate
+other = json.dumps(h_simulation.balance_pass(["100"], trials=8, workers=1, content_seed=7), sort_keys=True)
+assert other != single
+assert set(h_simulation.summarize(h_simulation.new_tally())) == set(json.loads(single)["100"]["0"])
+print('Balance pass agrees across workers and processes:', json.loads(single)["100"]["0"]["win_rate"])
+
+# Saves from before Features gain the features their headgear grants
+print('Starting old save features test...')
+wearer = h_actors.Confident("Topknot")
+wearer.wear_headgear(h_content.flaming_topknot)
+state = {name: getattr(wearer, name) for name in h_actors.Actor.__slots__ if name not in ("layers", "buffs", "_stats_clean", "_action_tables")}
+state["features"] = []
+loaded = object.__new__(h_actors.Confident)
+loaded.__setstate__(state)
+assert list(loaded.features) == ["resist pin"] and loaded.defense == wearer.defense
+print('Old save features:', list(loaded.features))
+
+# "hide_blocked" is a key of an actor's view only while it is set
+print('Starting hide_blocked view test...')
+view = encounter_state["actors"][bosh]
+assert "hide_blocked" not in view and "hide_blocked" not in view.keys()
+assert view.pop("hide_blocked", None) is None
+view["hide_blocked"] = True
+assert "hide_blocked" in view and "hide_blocked" in view.keys()
+assert view.pop("hide_blocked") is True and "hide_blocked" not in view
+print('View keys:', len(view.keys()))
+
+# Encounters running in threads at the same time keep their own sinks
+import copy, io, threading
+
+print('Starting threaded sinks test...')
+
+class LockstepSink(h_events.JsonlSink):
+    # the threads take turns for the first events of their encounters
+    def handle(self, event):
+        if meeting is not None and getattr(steps, "count", 0) < 20:
+            steps.count = getattr(steps, "count", 0) + 1
+            meeting.wait(timeout=60)
+        super().handle(event)
+
+def narrate(seed):
+    stream = io.StringIO()
+    sink = LockstepSink(stream)
+    h_encounter.simulate_encounter(scene_copies[seed], party_copies[seed], rng=seed, sink=sink)
+    sink.close()
+    return stream.getvalue()
+
+seeds = (11, 12)
+party_copies = {seed: copy.deepcopy(party) for seed in seeds}
+scene_copies = {}
+for seed in seeds:
+    scene_copies[seed] = h_scenario.Scene("threads")
+    scene_copies[seed].roster = copy.deepcopy(list(h_scenario.scene_500.roster_options[0]))
+meeting = None
+steps = threading.local()
+alone = {seed: narrate(seed) for seed in seeds}
+meeting = threading.Barrier(len(seeds))
+together = {}
+threads = [threading.Thread(target=lambda seed=seed: together.__setitem__(seed, narrate(seed))) for seed in seeds]
+for thread in threads:
+    thread.start()
+for thread in threads:
+    thread.join()
+assert alone[seeds[0]] != alone[seeds[1]] and together == alone
+assert h_events.current_sink() is h_events.sink
+print('Events per threaded encounter:', [alone[seed].count("\n") for seed in seeds])